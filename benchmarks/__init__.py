@@ -0,0 +1,57 @@
+# FABGen - The FABulous binding Generator for CPython and Lua
+#	Copyright (C) 2018 Emmanuel Julien
+
+import subprocess
+import tempfile
+import os
+
+import gen
+
+
+# benchmarks run by 'python -m benchmarks', each module outputs a description, an add_arguments(parser) and a run(args) function
+benchmark_names = ['generator_scaling', 'type_tag_cast', 'overload_cache', 'nogil']
+
+
+def create_work_path():
+	work_path = tempfile.mkdtemp()
+	print('Working directory is ' + work_path)
+	return work_path
+
+
+def build_cpython_module(work_path, module_name, generator, bind):
+	"""Generate a CPython extension module using bind(generator, module_name) and build it in the working directory."""
+	generator.verbose = False
+
+	sources = []
+	for path, src in bind(generator, module_name).items():
+		with open(os.path.join(work_path, path), 'w') as file:
+			file.write(src)
+		if path[-2:] != '.h':
+			sources.append(path)
+
+	with open(os.path.join(work_path, 'fabgen.h'), 'w') as file:
+		file.write(gen.get_fabgen_api())
+
+	cflags = subprocess.check_output('python3-config --cflags', shell=True).decode('utf-8').strip().replace('\n', ' ')
+	ldflags = subprocess.check_output('python3-config --ldflags', shell=True).decode('utf-8').strip().replace('\n', ' ')
+
+	subprocess.check_output('g++ %s -O2 -fPIC -std=c++14 -c %s' % (cflags, ' '.join(sources)), shell=True, stderr=subprocess.STDOUT, cwd=work_path)
+	subprocess.check_output('g++ -shared %s %s -o %s.so' % (' '.join([source.replace('.cpp', '.o') for source in sources]), ldflags, module_name), shell=True, stderr=subprocess.STDOUT, cwd=work_path)
+
+
+def build_program(work_path, name, src, cxx, std='c++11'):
+	"""Build a standalone C++ program in the working directory, return the path to its executable."""
+	src_path = os.path.join(work_path, name + '.cpp')
+	exe_path = os.path.join(work_path, name)
+
+	with open(src_path, 'w') as file:
+		file.write(src)
+
+	subprocess.check_call([cxx, '-O2', '-std=' + std, src_path, '-o', exe_path])
+	return exe_path
+
+
+def run_python_script(work_path, script):
+	"""Run a script in the working directory, return the fields of its ';' separated output lines."""
+	output = subprocess.check_output(['python3', '-c', script], cwd=work_path).decode('utf-8')
+	return [line.split(';') for line in output.splitlines()]
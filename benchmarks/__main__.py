@@ -0,0 +1,25 @@
+# FABGen - The FABulous binding Generator for CPython and Lua
+#	Copyright (C) 2018 Emmanuel Julien
+
+import importlib
+import argparse
+import sys
+
+import benchmarks
+
+
+parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run a FABGen benchmark from the repository root.')
+subparsers = parser.add_subparsers(dest='benchmark', metavar='benchmark')
+
+modules = {}
+for name in benchmarks.benchmark_names:
+	modules[name] = importlib.import_module('benchmarks.' + name)
+	modules[name].add_arguments(subparsers.add_parser(name, help=modules[name].description, description=modules[name].description))
+
+args = parser.parse_args()
+
+if args.benchmark is None:
+	parser.print_help()
+	sys.exit(1)
+
+sys.exit(modules[args.benchmark].run(args))
@@ -0,0 +1,180 @@
+# FABGen - The FABulous binding Generator for CPython and Lua
+#	Copyright (C) 2018 Emmanuel Julien
+
+import tracemalloc
+import json
+import math
+import time
+import lib
+
+import gen
+import lang.cpython
+import lang.lua
+import lang.go
+import lang.xml
+
+
+description = 'Measure the generator scaling on synthetic binding scripts.'
+
+
+def add_arguments(parser):
+	parser.add_argument('--classes', help='Comma-separated list of class counts to generate', default='25,50,100,200')
+	parser.add_argument('--methods', type=int, help='Number of methods per class', default=8)
+	parser.add_argument('--overloads', type=int, help='Number of overloads per method', default=3)
+	parser.add_argument('--depth', type=int, help='Depth of the inheritance chains', default=4)
+	parser.add_argument('--generators', help='Comma-separated list of generators to benchmark (CPython, Lua, Go, API)', default='CPython,Lua,Go,API')
+	parser.add_argument('--no_memory', help='Do not measure the peak and retained memory usage (saves a second generation per run)', action='store_true')
+	parser.add_argument('--save', help='Save the results to a JSON file')
+	parser.add_argument('--compare', help='Compare the results against a JSON file saved by a previous run')
+	parser.add_argument('--tolerance', type=float, help='Time ratio to the compared results above which a run is reported as a regression', default=1.25)
+
+
+generator_classes = {
+	'CPython': lang.cpython.CPythonGenerator,
+	'Lua': lang.lua.LuaGenerator,
+	'Go': lang.go.GoGenerator,
+	'API': lang.xml.XMLGenerator
+}
+
+
+# -- synthetic binding script
+def bind_synthetic(gen, classes, methods, overloads, depth):
+	"""Bind classes in inheritance chains of the given depth, each class declares overloaded methods, members and static members."""
+	gen.start('bench')
+
+	lib.bind_defaults(gen)
+
+	types = ['int', 'float', 'const char *', 'bool']
+
+	base_conv = None
+	for i in range(classes):
+		conv = gen.begin_class('class_%d' % i)
+		if i % depth != 0:
+			gen.add_base(conv, base_conv)
+
+		gen.bind_constructor_overloads(conv, [([], []), (['int v'], [])])
+
+		for j in range(methods):
+			protos = [('int', ['%s a%d' % (types[(j + a) % len(types)], a) for a in range(k)], []) for k in range(overloads)]
+			gen.bind_method_overloads(conv, 'method_%d_%d' % (i, j), protos)
+		gen.bind_static_method(conv, 'create_%d' % i, 'class_%d' % i, ['int v'])
+
+		gen.bind_members(conv, ['int u_%d' % i, 'float v_%d' % i])
+		gen.bind_static_members(conv, ['int count_%d' % i])
+
+		if i % depth != 0:
+			gen.bind_comparison_ops(conv, ['==', '!='], ['const class_%d &o' % i])
+
+		gen.end_class(conv)
+
+		gen.bind_function('make_class_%d' % i, 'class_%d' % i, ['int v'])
+		base_conv = conv
+
+	gen.finalize()
+	return gen.get_output()
+
+
+# -- measurement
+def run_benchmark(args, language, classes):
+	def generate():
+		gen.clear_ctype_parse_cache()
+		generator = generator_classes[language]()
+		generator.verbose = False
+		return generator, bind_synthetic(generator, classes, args.methods, args.overloads, args.depth)
+
+	t_start = time.perf_counter()
+	generator, output = generate()
+	result = {'classes': classes, 'time': time.perf_counter() - t_start, 'output_size': sum([len(src) for src in output.values()])}
+	del generator, output
+
+	if not args.no_memory:
+		tracemalloc.start()
+		generator, output = generate()
+		result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+		del output  # the retained memory is the generator state once its output is released
+		result['retained_memory'] = tracemalloc.get_traced_memory()[0]
+		tracemalloc.stop()
+
+	return result
+
+
+def get_scaling_exponent(a, b):
+	"""Exponent of the time growth between two runs, 1 is linear."""
+	if a['time'] <= 0 or b['classes'] == a['classes']:
+		return 0
+	return math.log(b['time'] / a['time']) / math.log(b['classes'] / a['classes'])
+
+
+def compare_results(args, results, reference):
+	regressions = []
+
+	for language, runs in results.items():
+		reference_runs = {run['classes']: run for run in reference.get(language, [])}
+
+		for run in runs:
+			ref = reference_runs.get(run['classes'])
+			if ref is None:
+				continue
+
+			ratio = run['time'] / ref['time']
+			print(' - %s %d classes: %f sec. (%.2fx)' % (language, run['classes'], run['time'], ratio))
+
+			if ratio > args.tolerance:
+				regressions.append('%s %d classes is %.2fx slower' % (language, run['classes'], ratio))
+			if 'retained_memory' in run and 'retained_memory' in ref:
+				print('   retained memory %.1f MB (%.2fx)' % (run['retained_memory'] / (1024 * 1024), run['retained_memory'] / ref['retained_memory']))
+			if run['output_size'] != ref['output_size']:
+				print('   output size changed from %d to %d bytes' % (ref['output_size'], run['output_size']))
+
+	return regressions
+
+
+# --
+def run(args):
+	parameters = {'methods': args.methods, 'overloads': args.overloads, 'depth': args.depth}
+	sizes = [int(n) for n in args.classes.split(',')]
+	languages = args.generators.split(',')
+
+	print('Synthetic binding: %d methods with %d overloads per class, inheritance depth %d' % (args.methods, args.overloads, args.depth))
+
+	results = {}
+	for language in languages:
+		print('%s:' % language)
+
+		runs = results[language] = []
+		for classes in sizes:
+			result = run_benchmark(args, language, classes)
+
+			out = ' - %d classes: %f sec., %d bytes output' % (classes, result['time'], result['output_size'])
+			if 'peak_memory' in result:
+				out += ', %.1f MB peak memory, %.1f MB retained' % (result['peak_memory'] / (1024 * 1024), result['retained_memory'] / (1024 * 1024))
+			if len(runs) > 0:
+				out += ', scaling x^%.2f' % get_scaling_exponent(runs[-1], result)
+			print(out)
+
+			runs.append(result)
+
+	if args.save:
+		with open(args.save, mode='w', encoding='utf-8') as f:
+			json.dump({'parameters': parameters, 'results': results}, f, indent=4)
+		print('Results saved to %s' % args.save)
+
+	if args.compare:
+		with open(args.compare, mode='r', encoding='utf-8') as f:
+			reference = json.load(f)
+
+		if reference['parameters'] != parameters:
+			print('Compared results were produced using different parameters: %s' % reference['parameters'])
+
+		print('Comparison to %s:' % args.compare)
+		regressions = compare_results(args, results, reference['results'])
+
+		if len(regressions) > 0:
+			print('Regressions:')
+			for regression in regressions:
+				print(' - %s' % regression)
+			return 1
+
+		print('No regression')
+
+	return 0
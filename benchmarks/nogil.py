@@ -0,0 +1,87 @@
+# FABGen - The FABulous binding Generator for CPython and Lua
+#	Copyright (C) 2018 Emmanuel Julien
+
+import lib
+import lang.cpython
+import benchmarks
+
+
+description = 'Measure how CPython threads calling native functions scale when the functions hold or release the GIL.'
+
+
+def add_arguments(parser):
+	parser.add_argument('--threads', help='Comma-separated list of thread counts to measure', default='1,2,4,8')
+	parser.add_argument('--ms', type=int, help='Duration of each native call in milliseconds', default=50)
+
+
+def bind_spin(generator, module_name):
+	generator.start(module_name)
+
+	lib.bind_defaults(generator)
+
+	generator.insert_code('''\
+#include <chrono>
+
+// busy wait, keeps a core busy for the given duration
+static int spin(int ms) {
+	int count = 0;
+	auto t_end = std::chrono::steady_clock::now() + std::chrono::milliseconds(ms);
+	while (std::chrono::steady_clock::now() < t_end)
+		++count;
+	return ms;
+}
+
+static int spin_locked(int ms) { return spin(ms); }
+
+struct worker {
+	int run(int ms) const { return spin(ms); }
+};
+''', True, False)
+
+	worker = generator.begin_class('worker')
+	generator.bind_constructor(worker, [])
+	generator.bind_method(worker, 'run', 'int', ['int ms'], {'nogil': True})
+	generator.end_class(worker)
+
+	generator.bind_function('spin', 'int', ['int ms'], {'nogil': True})
+	generator.bind_function('spin_locked', 'int', ['int ms'])
+
+	generator.finalize()
+	return generator.get_output()
+
+
+measure_script = '''\
+import threading
+import time
+from %s import *
+
+def measure(func, thread_count):
+	threads = [threading.Thread(target=func, args=(%d,)) for i in range(thread_count)]
+	t_start = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return time.perf_counter() - t_start
+
+for thread_count in %s:
+	print('%%d;%%f;%%f;%%f' %% (thread_count, measure(spin_locked, thread_count), measure(spin, thread_count), measure(worker().run, thread_count)))
+'''
+
+
+def measure(work_path, module_name, ms, thread_counts):
+	script = measure_script % (module_name, ms, repr(thread_counts))
+	return [(int(count), float(locked), float(nogil), float(method)) for count, locked, nogil, method in benchmarks.run_python_script(work_path, script)]
+
+
+# --
+def run(args):
+	work_path = benchmarks.create_work_path()
+
+	benchmarks.build_cpython_module(work_path, 'nogil_spin', lang.cpython.CPythonGenerator(), bind_spin)
+
+	print('Threads each making a %d ms native call (wall-clock time):' % args.ms)
+	for count, locked, nogil, method in measure(work_path, 'nogil_spin', args.ms, [int(count) for count in args.threads.split(',')]):
+		print(' - %d threads: %.1f ms holding the GIL, %.1f ms releasing it (%.1f ms for methods)' % (count, locked * 1000, nogil * 1000, method * 1000))
+
+	return 0
@@ -0,0 +1,108 @@
+# FABGen - The FABulous binding Generator for CPython and Lua
+#	Copyright (C) 2018 Emmanuel Julien
+
+import lib
+import lang.cpython
+import benchmarks
+
+
+description = 'Measure the argument checks performed by overloaded CPython proxies with and without the overload cache.'
+
+
+def add_arguments(parser):
+	parser.add_argument('--calls', type=int, help='Number of calls per measure', default=1000000)
+
+
+# math types and an overloaded function in the style of an engine math API, returning a float to measure the dispatch rather than the return value allocation
+types = ['vec2', 'vec3', 'vec4', 'quat', 'mat3', 'mat4']
+
+protos = [
+	['const vec2 &a', 'const vec2 &b'],
+	['const vec2 &a', 'float k'],
+	['const vec3 &a', 'const vec3 &b'],
+	['const vec3 &a', 'float k'],
+	['const mat3 &m', 'const vec3 &v'],
+	['const mat4 &m', 'const vec3 &v'],
+	['const quat &q', 'const vec3 &v'],
+	['const vec4 &a', 'const vec4 &b'],
+	['const mat4 &m', 'const vec4 &v'],
+	['const quat &a', 'const quat &b'],
+	['const mat3 &a', 'const mat3 &b'],
+	['const mat4 &a', 'const mat4 &b']
+]
+
+# calls measured, the arguments select the first, a middle and the last prototype
+calls = [('vec2 * vec2', 'vec2(), vec2()'), ('mat4 * vec3', 'mat4(), vec3()'), ('mat4 * mat4', 'mat4(), mat4()')]
+
+
+class CountingClassConverter(lang.cpython.PythonClassTypeDefaultConverter):
+	"""Class converter counting the calls to its check functions."""
+	def get_type_glue(self, gen, module_name):
+		glue = super().get_type_glue(gen, module_name)
+		return glue.replace('	wrapped_Object *w = cast_to_wrapped_Object_safe(o);\n', '	++check_calls;\n	wrapped_Object *w = cast_to_wrapped_Object_safe(o);\n')
+
+
+def bind_overloads(generator, module_name):
+	generator.start(module_name)
+
+	lib.bind_defaults(generator)
+
+	code = 'static size_t check_calls = 0;\nstatic size_t get_check_calls() { return check_calls; }\n\n'
+	for type in types:
+		code += 'struct %s { float v[16]; };\n' % type
+	for args in protos:
+		code += 'float mul(%s) { return 1.f; }\n' % ', '.join(args)
+	generator.insert_code(code, True, False)
+
+	for type in types:
+		conv = generator.begin_class(type, CountingClassConverter)
+		generator.bind_constructor(conv, [])
+		generator.end_class(conv)
+
+	generator.bind_function('get_check_calls', 'size_t', [])
+	generator.bind_function_overloads('mul', [('float', args, []) for args in protos])
+
+	generator.finalize()
+	return generator.get_output()
+
+
+def build_module(work_path, module_name, overload_cache):
+	generator = lang.cpython.CPythonGenerator()
+	generator.overload_cache = overload_cache
+	benchmarks.build_cpython_module(work_path, module_name, generator, bind_overloads)
+
+
+measure_script = '''\
+import timeit
+from %s import *
+
+for name, args in %s:
+	a, b = eval(args)
+	mul(a, b)  # the first call selects the prototype to cache
+	calls = get_check_calls()
+	mul(a, b)
+	checks = get_check_calls() - calls
+	t = min(timeit.repeat('mul(a, b)', globals=globals(), number=%d, repeat=5))
+	print('%%s;%%d;%%f' %% (name, checks, t * 1e9 / %d))
+'''
+
+
+def measure(work_path, module_name, call_count):
+	script = measure_script % (module_name, repr(calls), call_count, call_count)
+	return {name: (int(checks), float(ns)) for name, checks, ns in benchmarks.run_python_script(work_path, script)}
+
+
+# --
+def run(args):
+	work_path = benchmarks.create_work_path()
+
+	build_module(work_path, 'overloads_nocache', False)
+	build_module(work_path, 'overloads_cache', True)
+
+	results = {'without cache': measure(work_path, 'overloads_nocache', args.calls), 'with cache': measure(work_path, 'overloads_cache', args.calls)}
+
+	print('Overloaded function with %d prototypes (class argument checks and ns per call):' % len(protos))
+	for name, _ in calls:
+		print(' - %s: %s' % (name, ', '.join(['%s %d checks %.1f ns' % (mode, result[name][0], result[name][1]) for mode, result in results.items()])))
+
+	return 0
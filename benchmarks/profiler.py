@@ -0,0 +1,141 @@
+# FABGen - The FABulous binding Generator for CPython and Lua
+#	Copyright (C) 2018 Emmanuel Julien
+
+import os
+import sys
+import time
+import json
+
+
+# generator entry points timed by the profiler
+profiled_prefixes = ('start', 'begin_', 'end_', 'bind_', 'add_', 'insert_', 'typedef', 'rbind_', 'finalize')
+profiled_private_methods = ('_bind_proxy', '_build_protos', '_FABGen__prepare_protos', '_FABGen__expand_protos')
+
+
+class GenerationProfiler:
+	"""Time the generator entry points and aggregate them by binding script call site.
+
+	A call site is the innermost frame of a call stack that does not belong to FABGen itself.
+	"""
+	def __init__(self):
+		root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+		self.internal_files = [os.path.join(root, name) for name in ['gen.py', os.path.join('benchmarks', 'profiler.py'), 'bind.py']]
+		self.internal_folders = [os.path.join(root, name) + os.sep for name in ['lang', 'lib']]
+
+		self.sites = {}  # (file, line, function) -> {'time': top-level time, 'entries': {name: [count, time, self time]}}
+		self.__stack = []  # time spent in nested entry points, one per active entry point
+		self.__internal_file_cache = {}
+		self.__type_glue_originals = {}  # converter class -> its own get_type_glue before profiling, None if inherited
+
+	def __is_internal_file(self, file):
+		internal = self.__internal_file_cache.get(file)
+		if internal is None:
+			path = os.path.abspath(file)
+			internal = path in self.internal_files or any([path.startswith(folder) for folder in self.internal_folders])
+			self.__internal_file_cache[file] = internal
+		return internal
+
+	def __get_call_site(self):
+		frame = sys._getframe(2)
+		while frame is not None:
+			if not self.__is_internal_file(frame.f_code.co_filename):
+				return (frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+			frame = frame.f_back
+		return ('<fabgen>', 0, '<internal>')
+
+	def __timed(self, name, func):
+		def call(*args, **kwargs):
+			site = self.__get_call_site()
+
+			self.__stack.append(0)
+			t_start = time.perf_counter()
+			try:
+				return func(*args, **kwargs)
+			finally:
+				elapsed = time.perf_counter() - t_start
+				nested = self.__stack.pop()
+
+				if len(self.__stack) > 0:
+					self.__stack[-1] += elapsed
+
+				if site not in self.sites:
+					self.sites[site] = {'time': 0, 'entries': {}}
+				entry = self.sites[site]['entries'].setdefault(name, [0, 0, 0])
+				entry[0] += 1
+				entry[1] += elapsed
+				entry[2] += elapsed - nested
+
+				if len(self.__stack) == 0:
+					self.sites[site]['time'] += elapsed
+		return call
+
+	def __get_type_glue(self, cls):
+		"""Return the unprofiled get_type_glue method of a converter class."""
+		for base in cls.__mro__:
+			if base in self.__type_glue_originals:
+				if self.__type_glue_originals[base] is not None:
+					return self.__type_glue_originals[base]
+			elif 'get_type_glue' in base.__dict__:
+				return base.__dict__['get_type_glue']
+
+	def __profile_type_glue(self, conv):
+		cls = type(conv)
+		if cls not in self.__type_glue_originals:
+			get_type_glue = self.__get_type_glue(cls)
+			self.__type_glue_originals[cls] = cls.__dict__.get('get_type_glue')  # None when inherited
+			cls.get_type_glue = self.__timed('%s.get_type_glue' % cls.__name__, get_type_glue)
+
+	def attach(self, generator):
+		"""Time the entry points of a generator instance."""
+		for name in dir(generator):
+			if not (name.startswith(profiled_prefixes) or name in profiled_private_methods):
+				continue
+			method = getattr(generator, name)
+			if callable(method):
+				setattr(generator, name, self.__timed(name, method))
+
+		begin_type = generator.begin_type
+
+		def profiled_begin_type(conv, *args, **kwargs):
+			self.__profile_type_glue(conv)
+			return begin_type(conv, *args, **kwargs)
+
+		generator.begin_type = profiled_begin_type
+		return generator
+
+	def detach(self):
+		"""Restore the converter classes patched while profiling, the report is kept."""
+		for cls, get_type_glue in self.__type_glue_originals.items():
+			if get_type_glue is None:
+				del cls.get_type_glue
+			else:
+				cls.get_type_glue = get_type_glue
+		self.__type_glue_originals = {}
+
+	def get_report(self):
+		"""Return the call sites sorted by decreasing generation time."""
+		report = []
+		for (file, line, function), site in self.sites.items():
+			entries = [{'name': name, 'count': count, 'time': t, 'self_time': self_t} for name, (count, t, self_t) in site['entries'].items()]
+			entries.sort(key=lambda e: e['self_time'], reverse=True)
+			report.append({'file': file, 'line': line, 'function': function, 'time': site['time'], 'entries': entries})
+
+		report.sort(key=lambda s: s['time'], reverse=True)
+		return report
+
+	def format_report(self, max_sites=25):
+		report = self.get_report()
+
+		out = 'Generation profile, %d call sites (%f sec.):\n' % (len(report), sum([site['time'] for site in report]))
+		for site in report[:max_sites]:
+			out += '%10.6f sec. %s:%d (%s)\n' % (site['time'], site['file'], site['line'], site['function'])
+			for entry in site['entries']:
+				out += '		%10.6f sec. self %10.6f sec. x%d %s\n' % (entry['time'], entry['self_time'], entry['count'], entry['name'])
+
+		if len(report) > max_sites:
+			out += '... %d more call sites\n' % (len(report) - max_sites)
+		return out
+
+	def save_report(self, path):
+		with open(path, mode='w', encoding='utf-8') as f:
+			json.dump(self.get_report(), f, indent=4)
@@ -0,0 +1,157 @@
+# FABGen - The FABulous binding Generator for CPython and Lua
+#	Copyright (C) 2018 Emmanuel Julien
+
+import subprocess
+import random
+import os
+
+import gen
+import lang.cpython
+import benchmarks
+
+
+description = 'Measure the cost of the generated type tag cast functions on deep class hierarchies.'
+
+
+def add_arguments(parser):
+	parser.add_argument('--depths', help='Comma-separated list of inheritance chain depths to measure', default='4,16,64')
+	parser.add_argument('--chains', type=int, help='Number of inheritance chains', default=4)
+	parser.add_argument('--lookups', type=int, help='Number of lookups per measure', default=10000000)
+	parser.add_argument('--cxx', help='C++ compiler', default=os.environ.get('CXX', 'c++'))
+
+
+# reference implementation, the if/else chains output by previous versions of the generator
+def get_legacy_type_tag_cast_function(generator):
+	def output_type_tag_cast_tree(expr):
+		out = []
+
+		i = 0
+		for conv in generator._bound_types:
+			if len(conv._casts) == 0:
+				continue
+
+			out.append('	' if i == 0 else ' else ')
+			out.append('if (in_type_tag == %s) {\n' % conv.type_tag)
+
+			for j, cast in enumerate(conv._casts):
+				out.append('	' if j == 0 else ' else ')
+				out.append('if (out_type_tag == %s) {\n' % cast[0].type_tag)
+				out.append(expr(cast))
+				out.append('}\n')
+
+			out.append('}\n')
+			i += 1
+
+		return ''.join(out)
+
+	return '''\
+static bool _type_tag_can_cast(uint32_t in_type_tag, uint32_t out_type_tag) {
+	if (out_type_tag == in_type_tag)
+		return true;
+
+	%s
+	return false;
+}
+
+static void *_type_tag_cast(void *in_ptr, uint32_t in_type_tag, uint32_t out_type_tag) {
+	if (out_type_tag == in_type_tag)
+		return in_ptr;
+
+	void *out_ptr = NULL;
+	%s
+
+	return out_ptr;
+}\n\n''' % (output_type_tag_cast_tree(lambda cast: '	return true;\n'), output_type_tag_cast_tree(lambda cast: cast[1]('in_ptr', 'out_ptr')))
+
+
+# -- benchmark program
+def bind_chains(generator, chains, depth):
+	"""Bind inheritance chains of the given depth, return the declaration of the bound classes."""
+	generator.start('bench')
+
+	decl = ''
+	for i in range(chains):
+		base_conv = None
+		for j in range(depth):
+			name = 'class_%d_%d' % (i, j)
+			decl += 'struct %s%s { int v_%d_%d; };\n' % (name, ' : class_%d_%d' % (i, j - 1) if base_conv else '', i, j)
+
+			conv = generator.begin_class(name)
+			if base_conv is not None:
+				generator.add_base(conv, base_conv)
+			generator.end_class(conv)
+			base_conv = conv
+
+	return decl
+
+
+def get_benchmark_program(chains, depth, lookups):
+	generator = lang.cpython.CPythonGenerator()
+	generator.verbose = False
+
+	src = '#include <chrono>\n#include <cstdint>\n#include <cstdio>\n#include <cstddef>\n\n'
+	src += bind_chains(generator, chains, depth) + '\n'
+
+	for conv in generator._bound_types:
+		src += 'static uint32_t %s = %s;\n' % (conv.type_tag, hex(gen.get_type_tag_value(conv)))
+
+	src += '\nnamespace legacy {\n' + get_legacy_type_tag_cast_function(generator) + '}\n\n'
+	src += 'namespace table {\n' + generator.get_type_tag_cast_function() + '}\n\n'
+
+	# queries: leaf to ancestor casts and casts across chains (failing)
+	rng = random.Random(depth)
+	queries = []
+	for k in range(256):
+		i, j = rng.randrange(chains), rng.randrange(depth)
+		if k % 2 == 0:
+			queries.append(('class_%d_%d' % (i, j), 'class_%d_%d' % (i, rng.randrange(j + 1))))
+		else:
+			queries.append(('class_%d_%d' % (i, j), 'class_%d_%d' % ((i + 1) % chains, rng.randrange(depth))))
+
+	src += 'static uint32_t queries[%d][2];\n\n' % len(queries)
+
+	src += '''\
+template <typename F> double measure(F can_cast) {
+	size_t count = 0;
+	auto t_start = std::chrono::steady_clock::now();
+	for (size_t i = 0; i < %d; ++i)
+		count += can_cast(queries[i & %d][0], queries[i & %d][1]) ? 1 : 0;
+	auto t_end = std::chrono::steady_clock::now();
+	if (count == 0)
+		printf("unexpected\\n");
+	return std::chrono::duration<double, std::nano>(t_end - t_start).count() / %d;
+}
+
+int main() {
+''' % (lookups, len(queries) - 1, len(queries) - 1, lookups)
+
+	for k, (src_name, dst_name) in enumerate(queries):
+		src += '	queries[%d][0] = type_tag_%s; queries[%d][1] = type_tag_%s;\n' % (k, src_name, k, dst_name)
+
+	src += '''
+	for (int k = 0; k < 256; ++k)
+		if (legacy::_type_tag_can_cast(queries[k][0], queries[k][1]) != table::_type_tag_can_cast(queries[k][0], queries[k][1])) {
+			printf("mismatch\\n");
+			return 1;
+		}
+
+	printf("%f %f\\n", measure(legacy::_type_tag_can_cast), measure(table::_type_tag_can_cast));
+	return 0;
+}
+'''
+	return src
+
+
+# --
+def run(args):
+	work_path = benchmarks.create_work_path()
+
+	print('Type tag cast lookup, %d inheritance chains (ns per lookup):' % args.chains)
+
+	for depth in [int(n) for n in args.depths.split(',')]:
+		exe_path = benchmarks.build_program(work_path, 'cast_%d' % depth, get_benchmark_program(args.chains, depth, args.lookups), args.cxx)
+		legacy, table = [float(v) for v in subprocess.check_output([exe_path]).decode().split()]
+
+		print(' - depth %d (%d types): if/else chain %.2f ns, hash table %.2f ns (%.1fx)' % (depth, args.chains * depth, legacy, table, legacy / table))
+
+	return 0
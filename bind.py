@@ -5,10 +5,16 @@ import os
 import sys
 import importlib
 import time
+import hashlib
+import pickle
+import json
+import subprocess
+import concurrent.futures
 
 import argparse
 
 import gen
+from benchmarks import profiler
 import lang.lua
 import lang.go
 import lang.cpython
@@ -18,11 +24,6 @@ import lib.std
 import lib.stl
 import lib
 
-print('''FABGen Copyright (C) 2018 Emmanuel Julien
-This program comes with ABSOLUTELY NO WARRANTY.
-This is free software, and you are welcome to redistribute it
-under certain conditions.''')
-
 parser = argparse.ArgumentParser(description='FABGen')
 parser.add_argument('script', nargs=1)
 parser.add_argument('--lua', help='Bind to Lua 5.2+', action='store_true')
@@ -34,50 +35,255 @@ parser.add_argument('--out_prefix', help='Prefix to append to output generated f
 parser.add_argument('--prefix', help='Prefix to append to all public symbols')
 parser.add_argument('--embedded', help='Specify that the generated binding is for embedding and not expanding the target language', action='store_true')
 parser.add_argument('--doc_md_folder', type=str, help='Retrieve symbol documentation using its bound name from a folder containing an MD file for each documented symbol')
+parser.add_argument('--fastcall', help='Generate METH_FASTCALL/METH_O/METH_NOARGS proxies for CPython (requires CPython 3.10+)', action='store_true')
 parser.add_argument('--no_fabgen_api', help='Do not generate the fabgen.h API file', action='store_true')
+parser.add_argument('--shards', type=int, help='Split the generated source over several translation units (CPython and Lua only)', default=1)
+parser.add_argument('--cache', type=str, help='Folder to cache the generated output in, generation is skipped when the binding script, its dependencies and the arguments did not change')
+parser.add_argument('--jobs', type=int, help='Number of worker processes used to generate several languages in parallel', default=1)
+parser.add_argument('--profile', help='Time the generator entry points per binding script call site, the report is saved to the output folder', action='store_true')
 parser.add_argument('--defines', type=str, help='Comma-separated list of strings that can be queried by the user binding script', default='')
-args = parser.parse_args()
 
 
-# prepare output directory
-os.makedirs(args.out, exist_ok=True)
+# output writer, files are only written when their content changes and a manifest of the changes is output
+def load_manifest():
+	try:
+		with open(manifest_path, mode='r', encoding='utf-8') as f:
+			return json.load(f)['files']
+	except (IOError, ValueError, KeyError):
+		return {}
 
 
-def output_binding(generator):
-	t_start = time.perf_counter()
+def write_output_file(name, src):
+	"""Write a generated file, return False if the file already holds this content."""
+	path = os.path.join(args.out, name)
+
+	data = src.replace('\n', os.linesep).encode('utf-8')
+	digest = hashlib.sha1(data).hexdigest()
+
+	output_files[name] = digest
+
+	if os.path.exists(path):
+		disk_digest = get_file_digest(path)
+		entry = previous_manifest.get(name)
+		# post-processed files (eg. Go formatting) are compared using the digest recorded before post-processing
+		if disk_digest == digest or (entry is not None and entry['generated'] == digest and entry['disk'] == disk_digest):
+			print('File unchanged %s' % path)
+			return False
+
+	with open(path, mode='wb') as f:
+		f.write(data)
+	print('File written to %s' % path)
+
+	changed_files.append(name)
+	return True
+
+
+def save_manifest():
+	files = {}
+	for name, digest in output_files.items():
+		files[name] = {'generated': digest, 'disk': get_file_digest(os.path.join(args.out, name))}
+
+	with open(manifest_path, mode='w', encoding='utf-8') as f:
+		json.dump({'files': files, 'changed': changed_files, 'unchanged': [name for name in output_files if name not in changed_files]}, f, indent=4, sort_keys=True)
+
+
+# output cache
+def get_file_digest(file):
+	with open(file, mode='rb') as f:
+		return hashlib.sha1(f.read()).hexdigest()
+
+
+def get_binding_dependencies():
+	"""Return the digest of the files the generated output depends on: modules loaded from FABGen or from the binding script folder and documentation files."""
+	roots = [os.path.dirname(os.path.abspath(__file__)), path]
+
+	files = set()
+	for module in list(sys.modules.values()):
+		file = getattr(module, '__file__', None)
+		if file is not None and any([os.path.abspath(file).startswith(root + os.sep) for root in roots]):
+			files.add(os.path.abspath(file))
+
+	if args.doc_md_folder:
+		for name in os.listdir(args.doc_md_folder):
+			if name.endswith('.md'):
+				files.add(os.path.abspath(os.path.join(args.doc_md_folder, name)))
+
+	return {file: get_file_digest(file) for file in sorted(files)}
+
+
+# arguments the generated code depends on, others (output folder, jobs, profiling, ...) do not invalidate the cache
+output_cache_key_args = ['lua', 'cpython', 'go', 'xml', 'out_prefix', 'prefix', 'embedded', 'doc_md_folder', 'fastcall', 'shards', 'defines']
+
+
+def get_output_cache_path():
+	key = repr([(name, getattr(args, name)) for name in output_cache_key_args]) + os.path.abspath(args.script[0])
+	return os.path.abspath(os.path.join(args.cache, 'fabgen_%s.cache' % hashlib.sha1(key.encode()).hexdigest()))
+
+
+def load_output_cache():
+	try:
+		with open(output_cache_path, mode='rb') as f:
+			cache = pickle.load(f)
+	except (IOError, EOFError, pickle.UnpicklingError):
+		return None
+
+	for file, digest in cache['dependencies'].items():
+		try:
+			if get_file_digest(file) != digest:
+				return None
+		except IOError:
+			return None
+
+	return cache['outputs']
+
+
+def save_output_cache(outputs, dependencies):
+	os.makedirs(os.path.dirname(output_cache_path), exist_ok=True)
+	with open(output_cache_path, mode='wb') as f:
+		pickle.dump({'dependencies': dependencies, 'outputs': outputs}, f)
+
+
+# the generator calls of the binding script are logged on the first run and replayed on the following generators,
+# scripts depending on the target language are run again for the other languages
+binding_record = None
+
+
+def setup_binding_script():
+	"""Make the binding script importable, it is only loaded when the output is not cached."""
+	global path, mod, script
+
+	split = os.path.split(args.script[0])
+	path = os.path.abspath(split[0])
+	mod = os.path.splitext(split[1])[0]
+
+	sys.path.append(path)
+	script = None
+
+	if args.prefix:
+		gen.api_prefix = args.prefix
+
+
+def load_binding_script():
+	global script
+
+	if script is None:
+		script = importlib.import_module(mod)
+
+
+def run_binding_script(generator):
+	global binding_record
+
+	load_binding_script()
+
+	if binding_record is None:
+		recorder = gen.BindingRecorder(generator)
+		script.bind(recorder)
+		binding_record = recorder.finish()
+	elif binding_record.can_replay(generator):
+		print("Replaying recorded binding declarations")
+		binding_record.replay(generator)
+	else:
+		print("Binding script depends on the target language, running it again")
+		script.bind(generator)
+
+
+def create_generator(language):
+	generator = setup_generator(generator_classes[language]())
 
 	if args.embedded:
 		print("Generating embedded binding code")
 		generator.embedded = args.embedded
 
+	if language == 'CPython' and args.fastcall:
+		print("Generating METH_FASTCALL proxies")
+		generator.fastcall = True
+
+	return generator
+
+
+def output_binding(language, name, output):
+	"""Write the output of a generator, start its post-processing if any of its files changed."""
+	changed = False
+	for path, src in output.items():
+		if write_output_file(args.out_prefix + path, src):
+			changed = True
+
+	if language == 'Go' and changed:
+		start_go_post_processing(name)
+
+
+def generate_binding(language):
+	t_start = time.perf_counter()
+
+	if cached_outputs is not None:
+		print("Using cached %s output" % language)
+		name, output = cached_outputs[language]
+	else:
+		generator = create_generator(language)
+
+		if args.profile:
+			# the binding script is run directly so that calls are attributed to its source lines
+			generation_profiler = profiler.GenerationProfiler()
+			load_binding_script()
+			try:
+				script.bind(generation_profiler.attach(generator))
+			finally:
+				generation_profiler.detach()
+		else:
+			run_binding_script(generator)
+
+		name, output = generator._name, generator.get_output()
+		generated_outputs[language] = (name, output)
+
+		if args.profile:
+			print(generation_profiler.format_report())
+			profile_path = os.path.join(args.out, '%sfabgen_profile_%s.json' % (args.out_prefix, language.lower()))
+			generation_profiler.save_report(profile_path)
+			print('Profile written to %s' % profile_path)
+
+	output_binding(language, name, output)
+
+	timings[language] = time.perf_counter() - t_start
+	print('Done in %f sec.' % timings[language])
+
+
+def generate_binding_job(job_args, language):
+	"""Generate the binding for a single language in a worker process."""
+	global args
+
+	args = job_args
+	setup_binding_script()
+
+	t_start = time.perf_counter()
+
+	generator = create_generator(language)
+	load_binding_script()
 	script.bind(generator)
 
-	for path, src in generator.get_output().items():
-		path = os.path.join(args.out, args.out_prefix + path)
-		with open(path, mode='w', encoding='utf-8') as f:
-			f.write(src)
-		print('File written to %s' % path)
+	return generator._name, generator.get_output(), get_binding_dependencies(), time.perf_counter() - t_start
 
-	print('Done in %f sec.' % (time.perf_counter() - t_start))
 
+# external formatters, run concurrently with the generation of the other languages
+formatters = concurrent.futures.ThreadPoolExecutor()
+formatter_jobs = []
 
-# load binding script
-split = os.path.split(args.script[0])
-path = split[0]
-mod = os.path.splitext(split[1])[0]
 
-sys.path.append(path)
-script = importlib.import_module(mod)
+def run_formatter_commands(commands):
+	for command in commands:
+		if subprocess.call(command, shell=True, cwd=args.out) != 0:
+			print("'%s' failed" % command)
 
 
-# set prefix
-if args.prefix:
-	gen.api_prefix = args.prefix
+def start_go_post_processing(name):
+	formatter_jobs.append(formatters.submit(run_formatter_commands, [f"go mod init {name}", "go fmt bind.go", "goimports -w bind.go"]))
+	formatter_jobs.append(formatters.submit(run_formatter_commands, ["clang-format -i wrapper.cpp wrapper.h"]))
 
 
 # setup documentation hook
 def setup_generator(generator):
 	generator.defines = args.defines.split(',')
+	generator.shards = args.shards
+	generator.out_prefix = args.out_prefix
 
 	if args.doc_md_folder:
 		def md_doc_hook(name):
@@ -96,35 +302,79 @@ def setup_generator(generator):
 	return generator
 
 
+generator_classes = {
+	'CPython': lang.cpython.CPythonGenerator,
+	'Lua': lang.lua.LuaGenerator,
+	'Go': lang.go.GoGenerator,
+	'API': lang.xml.XMLGenerator
+}
+
+
 # execute through generators
-if args.cpython:
-	output_binding(setup_generator(lang.cpython.CPythonGenerator()))
+if __name__ == '__main__':
+	print('''FABGen Copyright (C) 2018 Emmanuel Julien
+This program comes with ABSOLUTELY NO WARRANTY.
+This is free software, and you are welcome to redistribute it
+under certain conditions.''')
 
-if args.lua:
-	output_binding(setup_generator(lang.lua.LuaGenerator()))
+	args = parser.parse_args()
 
-if args.go:
-	go_gen = lang.go.GoGenerator()
-	output_binding(setup_generator(go_gen))
-	os.chdir(args.out)
-	os.system(f"go mod init {go_gen._name}")
-	os.system("go fmt bind.go")
-	os.system("goimports -w bind.go")
+	args.out = os.path.abspath(args.out)
+	if args.doc_md_folder:
+		args.doc_md_folder = os.path.abspath(args.doc_md_folder)
 
-	try:
-		os.system("clang-format -i wrapper.cpp wrapper.h")
-	except:
-		print("clang-format was not found, ideally use to have beautiful .h file")
-
-if args.xml:
-	output_binding(setup_generator(lang.xml.XMLGenerator()))
-
-
-# output Fabgen API
-if not args.no_fabgen_api:
-	path = os.path.join(args.out, 'fabgen.h')
-	with open(path, mode='w', encoding='utf-8') as f:
-		f.write(gen.get_fabgen_api())
-	print('FABgen API written to %s' % path)
-else:
-	print('FABgen API not written')
+	# prepare output directory
+	os.makedirs(args.out, exist_ok=True)
+
+	manifest_path = os.path.join(args.out, args.out_prefix + 'fabgen_manifest.json')
+	previous_manifest = load_manifest()
+	output_files, changed_files = {}, []
+
+	setup_binding_script()
+
+	# lookup output cache
+	cached_outputs, generated_outputs, dependencies = None, {}, {}
+
+	if args.cache and not args.profile:
+		output_cache_path = get_output_cache_path()
+		cached_outputs = load_output_cache()
+
+	languages = [language for language, enabled in [('CPython', args.cpython), ('Lua', args.lua), ('Go', args.go), ('API', args.xml)] if enabled]
+	timings = {}
+
+	if args.jobs > 1 and len(languages) > 1 and cached_outputs is None and not args.profile:
+		with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+			jobs = {executor.submit(generate_binding_job, args, language): language for language in languages}
+
+			for job in concurrent.futures.as_completed(jobs):
+				language = jobs[job]
+				name, output, job_dependencies, timings[language] = job.result()
+				print('%s generated in %f sec.' % (language, timings[language]))
+
+				generated_outputs[language] = (name, output)
+				dependencies.update(job_dependencies)
+				output_binding(language, name, output)
+	else:
+		for language in languages:
+			generate_binding(language)
+
+	# store output cache
+	if args.cache and not args.profile and cached_outputs is None:
+		dependencies.update(get_binding_dependencies())
+		save_output_cache(generated_outputs, dependencies)
+
+	# output Fabgen API
+	if not args.no_fabgen_api:
+		write_output_file('fabgen.h', gen.get_fabgen_api())
+	else:
+		print('FABgen API not written')
+
+	# wait for the external formatters
+	for job in formatter_jobs:
+		job.result()
+
+	save_manifest()
+
+	print('Generation time per language:')
+	for language in languages:
+		print(' - %s: %f sec.' % (language, timings[language]))
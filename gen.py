@@ -119,9 +119,7 @@ def ctype_to_plain_string(ctype):
 
 
 def get_ctype_default_bound_name(ctype):
-	ctype = copy.deepcopy(ctype)
-	ctype.scoped_typename.explicit_global = False
-	return ctype_to_plain_string(ctype)
+	return ctype_to_plain_string(ctype)  # only considers the last type in the scope chain, explicit global scope is ignored
 
 
 #
@@ -180,6 +178,13 @@ def get_symbol_default_bound_name(name):
 	return get_clean_symbol_name(name)
 
 
+# arithmetic C types a vectorized function can map over
+vectorizable_ctypes = [
+	'char', 'signed char', 'unsigned char', 'short', 'unsigned short', 'int', 'unsigned int', 'long', 'unsigned long', 'long long', 'unsigned long long',
+	'int8_t', 'uint8_t', 'int16_t', 'uint16_t', 'int32_t', 'uint32_t', 'int64_t', 'uint64_t', 'size_t', 'float', 'double'
+]
+
+
 def clean_name_with_title(name):
 	new_name = ""
 	if "_" in name:
@@ -213,20 +218,73 @@ ref_re = re.compile(r"[&*]+")
 
 
 #
-class _CType:
+class _ImmutableNode:
+	"""Parsed nodes are shared through the parse cache, they are frozen as soon as the parser is done with them."""
+	__slots__ = ('_frozen',)
+
+	def polish(self):
+		object.__setattr__(self, '_frozen', True)
+
+	def __setattr__(self, name, value):
+		if getattr(self, '_frozen', False):
+			raise AttributeError("cannot modify immutable %s" % type(self).__name__)
+		object.__setattr__(self, name, value)
+
+	def __delattr__(self, name):
+		if getattr(self, '_frozen', False):
+			raise AttributeError("cannot modify immutable %s" % type(self).__name__)
+		object.__delattr__(self, name)
+
+	def __copy__(self):
+		return self  # immutable
+
+	def __deepcopy__(self, memo):
+		return self  # immutable
+
+
+class _CType(_ImmutableNode):
+	"""C type value. Instances are immutable and hashable, derived types are built once then cached on the instance."""
+	__slots__ = ('const', 'signed', 'unsigned', 'scoped_typename', 'ref', 'const_ref', '_repr', '_variants')
+
+	def polish(self):
+		object.__setattr__(self, '_repr', None)
+		object.__setattr__(self, '_variants', {})
+		super().polish()
+
 	def __repr__(self):
-		return get_fully_qualified_ctype_name(self)
+		if self._repr is None:
+			object.__setattr__(self, '_repr', get_fully_qualified_ctype_name(self))
+		return self._repr
+
+	def __eq__(self, other):
+		return isinstance(other, _CType) and repr(self) == repr(other)
+
+	def __hash__(self):
+		return hash(repr(self))
+
+	def __derive(self, key, const, ref):
+		t = self._variants.get(key)
+
+		if t is None:
+			t = _CType.__new__(_CType)
+			object.__setattr__(t, 'const', const)
+			object.__setattr__(t, 'signed', self.signed)
+			object.__setattr__(t, 'unsigned', self.unsigned)
+			object.__setattr__(t, 'scoped_typename', self.scoped_typename)  # shared, never modified
+			if ref != '':
+				object.__setattr__(t, 'ref', ref)
+			object.__setattr__(t, 'const_ref', self.const_ref)
+			t.polish()
+
+			self._variants[key] = t
+
+		return t
 
 	def get_ref(self):
 		return (self.ref if hasattr(self, 'ref') else '')
 
 	def add_ref(self, ref):
-		t = copy.deepcopy(self)
-		if hasattr(self, 'ref'):
-			t.ref += ref
-		else:
-			setattr(t, 'ref', ref)
-		return t
+		return self.__derive(('add_ref', ref), self.const, self.get_ref() + ref)
 
 	def is_pointer(self):
 		return self.get_ref() == '*'
@@ -237,23 +295,13 @@ class _CType:
 		return self.const_ref
 
 	def non_const(self):
-		t = copy.deepcopy(self)
-		t.const = False
-		return t
+		return self.__derive('non_const', False, self.get_ref())
 
 	def dereference_once(self):
-		t = copy.deepcopy(self)
-		if hasattr(t, 'ref'):
-			t.ref = t.ref[:-1]
-			if t.ref == '':
-				delattr(t, 'ref')
-		return t
+		return self.__derive('dereference_once', self.const, self.get_ref()[:-1])
 
 	def ref_stripped(self):  # pragma: no cover
-		t = copy.deepcopy(self)
-		if hasattr(t, 'ref'):
-			delattr(t, 'ref')
-		return t
+		return self.__derive('ref_stripped', self.const, '')
 
 
 class _FunctionSignature:
@@ -296,6 +344,9 @@ class _ScopedTypename:
 	def __eq__(self, other):
 		return repr(self) == repr(other)
 
+	def __hash__(self):
+		return hash(repr(self))
+
 	def __repr__(self):
 		out = ''
 		if self.explicit_global:
@@ -313,13 +364,53 @@ _CType.grammar = flag("const"), flag("signed"), flag("unsigned"), attr("scoped_t
 
 
 #
-class _NamedCType:
+class _NamedCType(_ImmutableNode):
+	__slots__ = ('ctype', 'name')
+
 	grammar = attr("ctype", _CType), attr("name", _ScopedTypename)
 
 	def __repr__(self):  # pragma: no cover
 		return ' '.join([repr(self.ctype), self.name.naked_name()])
 
 
+# parse cache, the same type strings are parsed over and over again during a binding
+_ctype_parse_cache = {}
+ctype_parse_stats = {'hits': 0, 'misses': 0}
+
+
+def normalize_type_string(type):
+	return ' '.join(type.split())
+
+
+def _parse_cached(type, grammar):
+	key = (grammar, normalize_type_string(type))
+
+	obj = _ctype_parse_cache.get(key)
+	if obj is None:
+		obj = _ctype_parse_cache[key] = parse(key[1], grammar)
+		ctype_parse_stats['misses'] += 1
+	else:
+		ctype_parse_stats['hits'] += 1
+
+	return obj
+
+
+def clear_ctype_parse_cache():
+	"""Drop all parsed C types, eg. to measure a cold generation."""
+	_ctype_parse_cache.clear()
+	ctype_parse_stats.update(hits=0, misses=0)
+
+
+def parse_ctype(type):
+	"""Parse a C type declaration. The returned object is shared and immutable."""
+	return _parse_cached(type, _CType)
+
+
+def parse_named_ctype(type):
+	"""Parse a named C type declaration (eg. 'const char *name'). The returned object is shared and immutable."""
+	return _parse_cached(type.replace('* *', '**'), _NamedCType)
+
+
 #
 def ctype_ref_to(src_ref, dst_ref):
 	i = 0
@@ -360,27 +451,160 @@ def transform_var_ref_to(var, from_ref, to_ref):
 	return ctype_ref_to(from_ref, to_ref) + var
 
 
-def add_list_unique(lst, val, dlg):
-	for ent in lst:
-		if dlg(val, ent):
-			return
-	lst.append(val)
-
-
-def collect_attr_from_conv_recursive(out, conv, attr, dlg):
+def collect_attr_from_conv_recursive(out, conv, attr, key, seen):
 	for entry in getattr(conv, attr):
-		add_list_unique(out, entry, dlg)
+		k = entry[key]
+		if k not in seen:
+			seen.add(k)
+			out.append(entry)
 	for base in conv._bases:
-		collect_attr_from_conv_recursive(out, base, attr, dlg)
+		collect_attr_from_conv_recursive(out, base, attr, key, seen)
 	return out
 
 
+# type tags identify the type of a wrapped object at runtime
+def get_type_tag_value(conv):
+	return zlib.crc32(conv.bound_name.encode()) & 0xffffffff
+
+
+type_tag_hash_multiplier = 0x9e3779b1
+
+
+def get_type_tag_cast_slot(in_type_tag, out_type_tag, size):
+	"""Slot of a cast in the type tag cast hash table, this must match the lookup in the generated code."""
+	return (in_type_tag ^ ((out_type_tag * type_tag_hash_multiplier) & 0xffffffff)) & (size - 1)
+
+
+#
+class Record:
+	"""Slotted record describing a bound symbol or prototype.
+
+	Records can be used as the dictionaries they replace, a slot that was never assigned behaves as a missing key.
+	Keys other than the record slots (eg. attached by a binding script) are stored in a dictionary created on first use.
+	"""
+	__slots__ = ('_extra',)
+
+	def __init__(self, **kwargs):
+		for key, value in kwargs.items():
+			self[key] = value
+
+	def __getitem__(self, key):
+		try:
+			return getattr(self, key) if key in self.__slots__ else self._extra[key]
+		except (AttributeError, KeyError):
+			raise KeyError(key)
+
+	def __setitem__(self, key, value):
+		if key in self.__slots__:
+			setattr(self, key, value)
+		elif hasattr(self, '_extra'):
+			self._extra[key] = value
+		else:
+			self._extra = {key: value}
+
+	def __delitem__(self, key):
+		try:
+			if key in self.__slots__:
+				delattr(self, key)
+			else:
+				del self._extra[key]
+		except (AttributeError, KeyError):
+			raise KeyError(key)
+
+	def __contains__(self, key):
+		if key in self.__slots__:
+			return hasattr(self, key)
+		return hasattr(self, '_extra') and key in self._extra
+
+	def __iter__(self):
+		return iter(self.keys())
+
+	def __len__(self):
+		return len(self.keys())
+
+	def __eq__(self, other):
+		if not isinstance(other, (Record, dict)):
+			return NotImplemented
+		return dict(self.items()) == dict(other.items())
+
+	__hash__ = None  # mutable, as a dictionary
+
+	def __repr__(self):
+		return '%s(%s)' % (type(self).__name__, ', '.join(['%s=%r' % (key, value) for key, value in self.items()]))
+
+	def __copy__(self):
+		record = type(self).__new__(type(self))
+		for key, value in self.items():
+			record[key] = value  # extra keys are not shared with the copy
+		return record
+
+	def get(self, key, default=None):
+		try:
+			return self[key]
+		except KeyError:
+			return default
+
+	def keys(self):
+		keys = [key for key in self.__slots__ if hasattr(self, key)]
+		if hasattr(self, '_extra'):
+			keys += list(self._extra.keys())
+		return keys
+
+	def values(self):
+		return [self[key] for key in self.keys()]
+
+	def items(self):
+		return [(key, self[key]) for key in self.keys()]
+
+	def copy(self):
+		return copy.copy(self)
+
+
+class ProtoArg(Record):
+	__slots__ = ('carg', 'conv', 'check_var')
+
+
+class ProtoRval(Record):
+	__slots__ = ('storage_ctype', 'conv')
+
+
+class Proto(Record):
+	__slots__ = ('rval', 'args', 'argsin', 'features', 'suggested_suffix')
+
+
+class FunctionRecord(Record):
+	"""Function, method, static method or constructor (no name)."""
+	__slots__ = ('name', 'bound_name', 'proxy_name', 'protos', 'prepared_protos')
+
+
+class OperatorRecord(Record):
+	__slots__ = ('op', 'proxy_name', 'protos', 'prepared_protos')
+
+
+class MemberRecord(Record):
+	"""Member or static member (no is_bitfield)."""
+	__slots__ = ('name', 'ctype', 'getter', 'setter', 'is_bitfield')
+
+
+class VariableRecord(Record):
+	__slots__ = ('name', 'bound_name', 'ctype', 'getter', 'setter', 'group')
+
+
+#
 class TypeConverter:
+	__slots__ = (
+		'ctype', 'to_c_storage_ctype', 'bound_name', 'from_c_storage_ctype', 'c_storage_class', 'type_tag',
+		'constructor', 'members', 'static_members', 'methods', 'static_methods', 'arithmetic_ops', 'comparison_ops',
+		'_non_copyable', '_moveable', '_inline', '_supports_deep_compare', '_is_pointer',
+		'_features', '_casts', '_bases', '_declaration_version', '_collections', 'nobind', 'check_func', 'to_c_func', 'from_c_func', 'check_to_c_func',
+		'__weakref__'
+	)
+
 	def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
-		self.ctype = parse(type, _CType)
-		self.to_c_storage_ctype = parse(to_c_storage_type, _CType) if to_c_storage_type is not None else self.ctype.non_const()
+		self.ctype = parse_ctype(type)
+		self.to_c_storage_ctype = parse_ctype(to_c_storage_type) if to_c_storage_type is not None else self.ctype.non_const()
 		self.bound_name = get_ctype_default_bound_name(self.ctype) if bound_name is None else bound_name
-		self.from_c_storage_ctype = parse(from_c_storage_type, _CType) if from_c_storage_type is not None else None  # if None the prototype return value type will be used to determine adequate storage at binding time
+		self.from_c_storage_ctype = parse_ctype(from_c_storage_type) if from_c_storage_type is not None else None  # if None the prototype return value type will be used to determine adequate storage at binding time
 
 		if needs_c_storage_class:
 			self.c_storage_class = 'storage_%s' % self.bound_name
@@ -406,16 +630,27 @@ class TypeConverter:
 		self._features = {}
 		self._casts = []  # valid casts
 		self._bases = []  # bases
+		self._declaration_version = 0  # bumped each time a base, member or method is declared
+		self._collections = (None, {})  # memoized collections through the class hierarchy, keyed on its declaration version
 
 		self.nobind = False
 
 		self.check_func = apply_api_prefix('check_%s' % self.bound_name)
 		self.to_c_func = apply_api_prefix('to_c_%s' % self.bound_name)
 		self.from_c_func = apply_api_prefix('from_c_%s' % self.bound_name)
+		self.check_to_c_func = apply_api_prefix('check_to_c_%s' % self.bound_name)
 
 	def is_type_class(self):
 		return False
 
+	def has_check_to_c(self):
+		"""Return True if the converter outputs a function to check and convert a value in a single call."""
+		return False
+
+	def check_depends_on_value(self, gen):
+		"""Return True if the argument check is not decided by the overload cache key of the value alone, overloads taking such an argument do not cache their selection."""
+		return False
+
 	def get_operator(self, op):
 		for arithmetic_op in self.arithmetic_ops:
 			if arithmetic_op['op'] == op:
@@ -424,6 +659,13 @@ class TypeConverter:
 	def get_type_api(self, module_name):
 		return ''
 
+	def get_type_internal_api(self, module_name):
+		"""Declarations shared between the translation units of a sharded output."""
+		return ''
+
+	def get_c_storage_class_definition(self):
+		return ''
+
 	def finalize_type(self):
 		return ''
 
@@ -431,6 +673,9 @@ class TypeConverter:
 		assert 'not implemented in this converter'  # pragma: no cover
 	def from_c_call(self, out_var, expr, ownership):
 		assert 'not implemented in this converter'  # pragma: no cover
+	def check_to_c_call(self, in_var, out_var_p):
+		"""Return the conversion storage declaration and the expression converting in_var if it has the expected type."""
+		assert 'not implemented in this converter'  # pragma: no cover
 
 	def prepare_var_for_conv(self, var, input_ref):
 		"""Transform a variable for use with the converter from_c/to_c methods."""
@@ -439,19 +684,72 @@ class TypeConverter:
 		"""Transform a converted variable back to its ctype reference."""
 		return transform_var_ref_to(var, self.to_c_storage_ctype.get_ref(), target_ref)
 
+	def invalidate_collections(self):
+		"""Flag a change to the class declaration, invalidates the memoized collections of the class and of the classes deriving from it."""
+		self._declaration_version += 1
+
+	def get_hierarchy_declaration_version(self):
+		return (self._declaration_version, tuple([base.get_hierarchy_declaration_version() for base in self._bases]))
+
+	def __collect_all(self, attr, key):
+		version, collections = self._collections
+		hierarchy_version = self.get_hierarchy_declaration_version()
+		if version != hierarchy_version:
+			collections = {}
+			self._collections = (hierarchy_version, collections)
+
+		entries = collections.get(attr)
+		if entries is None:
+			entries = collections[attr] = collect_attr_from_conv_recursive([], self, attr, key, set())
+		return list(entries)
+
 	def get_all_members(self):
-		return collect_attr_from_conv_recursive([], self, 'members', lambda a,b: a['name'] == b['name'])
+		return self.__collect_all('members', 'name')
 	def get_all_static_members(self):
-		return collect_attr_from_conv_recursive([], self, 'static_members', lambda a,b: a['name'] == b['name'])
+		return self.__collect_all('static_members', 'name')
 	def get_all_methods(self):
-		return collect_attr_from_conv_recursive([], self, 'methods', lambda a,b: a['bound_name'] == b['bound_name'])
+		return self.__collect_all('methods', 'bound_name')
 	def get_all_static_methods(self):
-		return collect_attr_from_conv_recursive([], self, 'static_methods', lambda a,b: a['bound_name'] == b['bound_name'])
+		return self.__collect_all('static_methods', 'bound_name')
 
 	def add_feature(self, key, val):
 		self._features[key] = val
 
 
+class PreparedProtos(list):
+	"""Prototypes prepared for a bound symbol, they are shared as is by copies of the record holding them."""
+	def __copy__(self):
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
+
+
+class OutputBuffer:
+	"""Accumulate output as a list of fragments joined once when the output is requested.
+
+	Named placeholders reserve a fragment that can be filled at any time before the buffer is joined.
+	"""
+	def __init__(self):
+		self.__fragments = []
+		self.__placeholders = {}
+
+	def __iadd__(self, text):
+		self.__fragments.append(text)  # str or OutputBuffer
+		return self
+
+	def add_placeholder(self, name):
+		self.__placeholders[name] = len(self.__fragments)
+		self.__fragments.append('')
+
+	def set_placeholder(self, name, text):
+		if name in self.__placeholders:
+			self.__fragments[self.__placeholders[name]] = text
+
+	def __str__(self):
+		return ''.join([fragment if isinstance(fragment, str) else str(fragment) for fragment in self.__fragments])
+
+
 def format_list_for_comment(lst):
 	ln = len(lst)
 
@@ -471,7 +769,10 @@ class FABGen:
 		self.verbose = True
 		self.embedded = False
 		self.check_self_type_in_ops = False
+		self.overload_cache = True  # overloaded proxies try the prototype selected by their previous call first
 		self.defines = []
+		self.shards = 1
+		self.out_prefix = ''
 
 	def apply_api_prefix(self, symbol):
 		return apply_api_prefix(symbol)
@@ -480,11 +781,14 @@ class FABGen:
 		assert 'not implemented in this generator'  # pragma: no cover
 
 	def parse_ctype(self, type):
-		return parse(type, _CType)
+		return parse_ctype(type)
 
 	def parse_named_ctype(self, type):
-		type = type.replace('* *', '**')
-		return parse(type, _NamedCType)
+		return parse_named_ctype(type)
+
+	def get_ctype_parse_stats(self):
+		"""Return the C type parse cache hit/miss counters."""
+		return dict(ctype_parse_stats)
 
 	def ctype_to_plain_string(self, ctype):
 		return ctype_to_plain_string(ctype)
@@ -494,12 +798,46 @@ class FABGen:
 	def get_symbol_doc(self, name):
 		return self.get_symbol_doc_hook(name)
 
+	# sharded output
+	supports_shards = False
+
+	# classes are spread by hashing their bound name, a shard may receive no class at all (eg. more shards than classes)
+	get_class_shard_hook = lambda gen, conv: zlib.crc32(conv.bound_name.encode()) % gen.shards
+
+	def get_shard_count(self):
+		return self.shards if self.supports_shards else 1
+
+	def get_shared_linkage(self):
+		"""Linkage of the generated symbols referenced from more than one translation unit."""
+		return '' if self.get_shard_count() > 1 else 'static '
+
+	def get_internal_header_name(self):
+		return 'bind_%s_internal.h' % self.get_language()
+
+	def __enter_class_segment(self, conv):
+		self.__class_segments.append((conv, self._source))
+		if len(self._shard_sources) > 0:
+			self._source = self._shard_sources[self.get_class_shard_hook(conv) % len(self._shard_sources)]
+
+	def __exit_class_segment(self, conv):
+		if len(self.__class_segments) > 0 and self.__class_segments[-1][0] is conv:
+			self._source = self.__class_segments.pop()[1]
+
+	#
 	def output_header(self):
 		common = "// This file is automatically generated, do not modify manually!\n\n"
 
-		self._source += "// FABgen output .cpp\n"
-		self._source += common
-		self._source += '#include "fabgen.h"\n\n'
+		for source in [self._source] + self._shard_sources:
+			source += "// FABgen output .cpp\n"
+			source += common
+			if len(self._shard_sources) > 0:
+				source += '#include "%s%s"\n\n' % (self.out_prefix, self.get_internal_header_name())
+
+		if len(self._shard_sources) > 0:
+			self._internal_header += '// FABgen output internal .h\n'
+			self._internal_header += common
+			self._internal_header += '#pragma once\n\n'
+		self._internal_header += '#include "fabgen.h"\n\n'
 
 		self._header += '// FABgen output .h\n'
 		self._header += common
@@ -512,17 +850,33 @@ class FABGen:
 		self.add_include('cassert', True)
 		self.add_include('map', True)
 
-		self._source += '{{{__WRAPPER_INCLUDES__}}}\n'
+		self._internal_header.add_placeholder('WRAPPER_INCLUDES')
+		self._internal_header += '\n'
 
 	def start(self, name):
 		self._name = name
-		self._header, self._source = "", ""
+		self._header, self._source = OutputBuffer(), OutputBuffer()
+
+		# when sharded, class segments are spread over several translation units sharing an internal header,
+		# otherwise the internal header is the source itself
+		if self.get_shard_count() > 1:
+			self._internal_header = OutputBuffer()
+			self._shard_sources = [OutputBuffer() for i in range(self.get_shard_count())]
+		else:
+			self._internal_header = self._source
+			self._shard_sources = []
+
+		self.__class_segments = []
 
 		self.__system_includes, self.__user_includes = [], []
 
 		self.__type_convs = {}
 		self.__function_declarations = {}
 
+		# secondary indexes on the declared types
+		self.__bound_name_convs = {}  # bound name -> first declared converter with this bound name
+		self.__bound_types_by_ctype = {}  # C type -> bound converters for this C type
+
 		self._bound_types = []  # list of bound types
 		self._bound_functions = []  # list of bound functions
 		self._bound_variables = []  # list of bound variables
@@ -536,8 +890,9 @@ class FABGen:
 		self.output_header()
 		self.output_includes()
 
-		self._source += 'static bool _type_tag_can_cast(uint32_t in_type_tag, uint32_t out_type_tag);\n'
-		self._source += 'static void *_type_tag_cast(void *in_T0, uint32_t in_type_tag, uint32_t out_type_tag);\n\n'
+		self._internal_header += '%sbool _type_tag_can_cast(uint32_t in_type_tag, uint32_t out_type_tag);\n' % self.get_shared_linkage()
+		self._internal_header += '%svoid *_type_tag_cast(void *in_T0, uint32_t in_type_tag, uint32_t out_type_tag);\n' % self.get_shared_linkage()
+		self._internal_header += '%sbool _type_tag_try_cast(void *in_ptr, uint32_t in_type_tag, uint32_t out_type_tag, void **out_ptr);\n\n' % self.get_shared_linkage()
 
 	def add_include(self, path, is_system=False):
 		if is_system:
@@ -551,7 +906,7 @@ class FABGen:
 		if in_header:
 			self._header += code
 		if in_source:
-			self._source += code
+			self._internal_header += code
 
 	def insert_binding_code(self, code, comment=None):
 		parts = []
@@ -559,7 +914,7 @@ class FABGen:
 			parts.append('// %s\n' % comment)
 		parts.append(code)
 		parts.append('\n')
-		self._source += ''.join(parts)
+		self._internal_header += ''.join(parts)
 
 	def add_custom_init_code(self, code):
 		self._custom_init_code += code
@@ -579,16 +934,17 @@ class FABGen:
 
 		self._header += conv.get_type_api(self._name)
 
-		self._source += '// %s type tag\n' % conv.ctype
-		self._source += 'static uint32_t %s = %s;\n\n' % (conv.type_tag, hex(zlib.crc32(conv.bound_name.encode()) & 0xffffffff))
+		self._internal_header += '// %s type tag\n' % conv.ctype
+		self._internal_header += 'static uint32_t %s = %s;\n\n' % (conv.type_tag, hex(get_type_tag_value(conv)))
 
-		self._source += conv.get_type_api(self._name)
+		self._internal_header += conv.get_type_api(self._name)
 
 		conv.nobind = nobind
 		conv._features = copy.deepcopy(features)
 
 		self._bound_types.append(conv)
-		self.__type_convs[repr(conv.ctype)] = conv
+		self.__bound_types_by_ctype.setdefault(repr(conv.ctype), []).append(conv)
+		self.__register_type_conv(repr(conv.ctype), conv)
 
 		feats = list(conv._features.values())
 		for feat in feats:
@@ -598,9 +954,14 @@ class FABGen:
 		return conv
 
 	def end_type(self, conv):
+		self._internal_header += conv.get_c_storage_class_definition()
+
 		type_glue = conv.get_type_glue(self, self._name)
 		self._source += type_glue + '\n'
 
+		if len(self._shard_sources) > 0:
+			self._internal_header += conv.get_type_internal_api(self._name)
+
 	def bind_type(self, conv, features={}):
 		self.begin_type(conv, features)
 		self.end_type(conv)
@@ -614,10 +975,10 @@ class FABGen:
 
 		if bound_name is not None:
 			conv.bound_name=bound_name
-		conv.ctype = parse(type, _CType)
-		conv.to_c_storage_ctype = parse(default_arg_storage_type, _CType)
+		conv.ctype = parse_ctype(type)
+		conv.to_c_storage_ctype = parse_ctype(default_arg_storage_type)
 
-		self.__type_convs[type] = conv
+		self.__register_type_conv(type, conv)
 
 	#
 	def bind_named_enum(self, name, symbols, storage_type='int', bound_name=None, prefix='', namespace=None):
@@ -648,11 +1009,14 @@ class FABGen:
 
 		conv._non_copyable = noncopyable
 		conv._moveable = moveable
+
+		self.__enter_class_segment(conv)
 		return conv
 
 	def end_class(self, conv):
 		"""End a class declaration."""
 		self.end_type(conv)
+		self.__exit_class_segment(conv)
 
 	#
 	def bind_extern_type(self, type, bound_name=None, module=None):
@@ -668,12 +1032,15 @@ class FABGen:
 			print('Binding extern type %s (%s)' % (conv.bound_name, conv.ctype))
 
 		self._header += conv.get_type_api(self._name)
-		self._source += conv.get_type_api(self._name)
+		self._internal_header += conv.get_type_api(self._name)
 
 		self._extern_types.append(conv)
-		self.__type_convs[repr(conv.ctype)] = conv
+		self.__register_type_conv(repr(conv.ctype), conv)
 
 		self._source += conv.get_type_glue(self, self._name) + '\n'
+
+		if len(self._shard_sources) > 0:
+			self._internal_header += conv.get_type_internal_api(self._name)
 		return conv
 
 	#
@@ -700,6 +1067,7 @@ class FABGen:
 	def add_base(self, conv, base):
 		self.__add_upcast(conv, base)
 		conv._bases.append(base)
+		conv.invalidate_collections()
 
 	def add_bases(self, conv, bases):
 		for base in bases:
@@ -731,6 +1099,25 @@ class FABGen:
 	def get_conv(self, type):
 		return self.__type_convs[type]
 
+	def __register_type_conv(self, type, conv):
+		if type in self.__type_convs:
+			self.__type_convs[type] = conv
+			# a redeclared type replaces its converter in place, rebuild the index to pick the first declared converter for each bound name
+			self.__bound_name_convs = {}
+			for _conv in self.__type_convs.values():
+				self.__bound_name_convs.setdefault(_conv.bound_name, _conv)
+		else:
+			self.__type_convs[type] = conv
+			self.__bound_name_convs.setdefault(conv.bound_name, conv)
+
+	def get_conv_from_bound_name(self, bound_name):
+		"""Return the first declared converter with a bound name or None."""
+		return self.__bound_name_convs.get(bound_name)
+
+	def get_bound_types_from_ctype(self, ctype):
+		"""Return the bound converters for a C type in declaration order."""
+		return self.__bound_types_by_ctype.get(repr(ctype), [])
+
 	#
 	def decl_var(self, ctype, name, eol=';\n'):
 		return '%s %s%s' % (get_fully_qualified_ctype_name(ctype), name, eol)
@@ -747,9 +1134,17 @@ class FABGen:
 		assert 'not implemented in this generator'  # pragma: no cover
 
 	#
+	def prepare_proxy(self, name, arg_counts, ctx):
+		"""Called before a proxy is opened with the sorted list of argument counts its prototypes accept."""
+		pass
+
 	def proxy_call_error(self, msg, ctx):
 		assert 'not implemented in this generator'  # pragma: no cover
 
+	def get_overload_cache_key(self, idx, ctx):
+		"""Return an uintptr_t expression identifying the type of a proxy argument, None if overloaded proxies cannot cache their prototype selection."""
+		return None
+
 	#
 	def __ctype_to_ownership_policy(self, ctype):
 		return 'Copy' if ctype.get_ref() == '' else 'NonOwning'
@@ -782,7 +1177,7 @@ class FABGen:
 
 			rval_type, args, features = proto
 
-			rval_ctype = parse(rval_type, _CType)
+			rval_ctype = parse_ctype(rval_type)
 			rval_conv = self.select_ctype_conv(rval_ctype)
 
 			if rval_conv is not None and rval_conv.from_c_storage_ctype is not None:
@@ -792,7 +1187,7 @@ class FABGen:
 				if from_c_storage_ctype.get_ref() == '':
 					from_c_storage_ctype = from_c_storage_ctype.non_const()
 
-			_proto = {'rval': {'storage_ctype': from_c_storage_ctype, 'conv': rval_conv}, 'args': [], 'argsin': [], 'features': features}
+			_proto = Proto(rval=ProtoRval(storage_ctype=from_c_storage_ctype, conv=rval_conv), args=[], argsin=[], features=features)
 
 			if not type(args) is type([]):
 				args = [args]
@@ -800,7 +1195,7 @@ class FABGen:
 			for arg in args:
 				carg = self.parse_named_ctype(arg)
 				conv = self.select_ctype_conv(carg.ctype)
-				_proto['args'].append({'carg': carg, 'conv': conv, 'check_var': None})
+				_proto['args'].append(ProtoArg(carg=carg, conv=conv, check_var=None))
 
 			# prepare argsin, a list of arguments that should be provided by the caller
 			_proto['argsin'] = _proto['args']  # default to the full arg list
@@ -856,7 +1251,7 @@ class FABGen:
 
 				proto["suggested_suffix"] = suggested_suffix
 
-		return _protos
+		return PreparedProtos(_protos)
 
 	def __assert_conv_feature(self, conv, feature):
 		assert feature in conv._features, "Type converter for %s does not support the %s feature" % (conv.ctype, feature)
@@ -881,14 +1276,14 @@ class FABGen:
 		return self.decl_var(ctype, var)
 
 	def _convert_to_c_var(self, idx, conv, var, ctx='default', features=[]):
-		out = conv.to_c_call(self.get_var(idx, ctx), '&%s' % var)
+		return conv.to_c_call(self.get_var(idx, ctx), '&%s' % var) + self._validate_to_c_var(idx, var, ctx, features)
 
+	def _validate_to_c_var(self, idx, var, ctx='default', features=[]):
 		if 'validate_arg_in' in features:
 			validator = features['validate_arg_in'][idx]
 			if validator is not None:
-				out += validator(self, var, ctx)
-
-		return out
+				return validator(self, var, ctx)
+		return ''
 
 	def prepare_to_c_var(self, idx, conv, var, ctx='default', features=[]):
 		return self._declare_to_c_var(conv.to_c_storage_ctype, var) + self._convert_to_c_var(idx, conv, var, ctx, features)
@@ -927,7 +1322,65 @@ class FABGen:
 		return src
 
 	#
-	def _proto_call(self, self_conv, proto, expr_eval, ctx, fixed_arg_count=None):
+	def _is_stored_inline(self, conv):
+		"""Return True if the copied values of a type are constructed in its wrapper object, as are the objects its constructors return."""
+		return conv._inline
+
+	def _prepare_c_call(self, features):
+		"""Output the code to run before the native call, once all arguments are converted."""
+		return ''
+
+	def _clean_c_call(self, features):
+		"""Output the code to run after the native call, before its return values are converted."""
+		return ''
+
+	#
+	def _bind_vectorized_function(self, bound_name, proxy_name, proto, expr_eval):
+		"""Output a proxy mapping a function over batches of arguments, return False if the generator does not support it."""
+		return False
+
+	def _vectorized_batch_size(self, proto, desc):
+		"""Output the computation of the batch size of a vectorized call, batches of a single value are broadcast."""
+		error = self.proxy_call_error('batch arguments of different sizes passed to %s' % desc, 'function')
+
+		return '''\
+size_t size = 1;
+for (size_t arg_size : {%s}) {
+	if (arg_size != 1) {
+		if (size != 1 && arg_size != size) {
+%s		}
+		size = arg_size;
+	}
+}
+\n''' % (', '.join(['arg%d.size' % idx for idx in range(len(proto['args']))]), ''.join(['\t\t\t%s\n' % line for line in error.splitlines()]))
+
+	def _vectorized_call(self, proto, expr_eval):
+		"""Output the loop calling a vectorized function over the whole batch, results are stored to rvals."""
+		features = proto['features']
+
+		call = expr_eval(['arg%d[i]' % idx for idx in range(len(proto['args']))])
+		if proto['rval']['conv']:
+			call = 'rvals[i] = %s' % call
+
+		parts = []
+
+		if 'exception' in features:
+			parts.append('try {\n')
+
+		parts.append(self._prepare_c_call(features))
+		parts.append('for (size_t i = 0; i < size; ++i) {\n\t%s\n}\n' % call)
+		parts.append(self._clean_c_call(features))
+
+		if 'exception' in features:
+			parts.append('}\n')
+			parts.append('catch(...) {\n')
+			parts.append(self.proxy_call_error(features['exception'], 'function'))
+			parts.append('}\n')
+
+		return ''.join(parts)
+
+	def _proto_call(self, self_conv, proto, expr_eval, ctx, fixed_arg_count=None, converted_args=[]):
+		"""Output a prototype call, converted_args lists the input arguments already converted by the dispatching logic."""
 		parts = []
 
 		features = proto['features']
@@ -959,6 +1412,10 @@ class FABGen:
 			if arg_out is not None and arg['carg'].name.naked_name() in arg_out:
 				arg_ctype = conv.ctype
 				parts.append(self._declare_to_c_var(arg_ctype, var))
+			elif argin_idx in converted_args:
+				arg_ctype = conv.to_c_storage_ctype
+				parts.append(self._validate_to_c_var(argin_idx, var, ctx, features))
+				argin_idx += 1
 			else:
 				arg_ctype = conv.to_c_storage_ctype
 				parts.append(self._declare_to_c_var(conv.to_c_storage_ctype, var))
@@ -976,6 +1433,8 @@ class FABGen:
 		if 'exception' in features:
 			parts.append('try {\n')
 
+		parts.append(self._prepare_c_call(features))
+
 		# declare return value
 		rvals = []
 		rvals_prepare_args = []
@@ -1001,7 +1460,9 @@ class FABGen:
 					expr_eval = features['route']  # hijack the output expression
 					parts.append(expr_eval(c_call_args) + '\n')
 				else:
-					if rval_conv._inline:
+					is_inline = self._is_stored_inline(rval_conv)
+
+					if is_inline:
 						if len(c_call_args) > 0:
 							parts.append('%s _new_obj(%s);\n' % (rval_conv.ctype, ', '.join(c_call_args)))  # construct new inline object on the stack
 						else:
@@ -1010,7 +1471,7 @@ class FABGen:
 
 					parts.append(self.decl_var(from_c_storage_ctype, 'rval', ' = '))
 
-					if rval_conv._inline:
+					if is_inline:
 						parts.append('&_new_obj;\n')
 					else:
 						parts.append('new %s(%s);\n' % (rval_conv.ctype, ', '.join(c_call_args)))
@@ -1042,6 +1503,8 @@ class FABGen:
 				rvals_prepare_args.append({'conv': rval_conv, 'ctype': from_c_storage_ctype, 'var': 'rval', 'is_arg_in_out': False, 'ctx': ctx, 'ownership': ownership})
 				rvals.append('rval')
 
+		parts.append(self._clean_c_call(features))
+
 		# process arg_out
 		if arg_out is not None:
 			arg_in_out = features['arg_in_out'] if 'arg_in_out' in features else []
@@ -1101,12 +1564,16 @@ class FABGen:
 		protos_by_arg_count = get_protos_per_arg_count(protos)
 
 		# prepare proxy function
-		self.insert_code('// %s\n' % desc, True, False)
+		self._source += '// %s\n' % desc
 
 		max_arg_count = max(protos_by_arg_count.keys())
 
+		self.prepare_proxy(name, sorted(protos_by_arg_count.keys()), ctx)
 		parts.append(self.open_proxy(name, max_arg_count, ctx))
 
+		if len(self._shard_sources) > 0:
+			self._internal_header += self.get_proxy_signature(name, ctx) + ';\n'
+
 		# check self
 		if self.check_self_type_in_ops and ctx in ['arithmetic_op', 'inplace_arithmetic_op', 'comparison_op']:
 			parts.append('if (!%s) {\n' % self_conv.check_call(self.get_self(ctx)))
@@ -1124,30 +1591,73 @@ class FABGen:
 			return per_arg_conv
 			
 
+		# name of the variable holding an input argument converted during dispatch, None if it differs between the prototypes
+		def get_fused_arg_var(protos, arg_idx):
+			names = set()
+			for proto in protos:
+				argin = proto['argsin'][arg_idx]
+				names.add(next('arg%d' % idx for idx, arg in enumerate(proto['args']) if arg is argin))
+			return names.pop() if len(names) == 1 else None
+
 		has_fixed_argc = fixed_arg_count is not None
 
 		if has_fixed_argc:
 			assert len(protos_by_arg_count) == 1 and fixed_arg_count in protos_by_arg_count
 
+		# check of an input argument shared by prototypes, return the code declaring its converted value, the check condition and if it converts the argument
+		def get_arg_check(conv, protos, arg_idx):
+			var = get_fused_arg_var(protos, arg_idx) if conv.has_check_to_c() else None
+			if var is None:
+				return '', conv.check_call(self.get_var(arg_idx, ctx)), False
+
+			c_storage, check_to_c = conv.check_to_c_call(self.get_var(arg_idx, ctx), '&%s' % var)
+			return self._declare_to_c_var(conv.to_c_storage_ctype, var) + c_storage, check_to_c, True
+
 		for arg_count, protos_with_arg_count in protos_by_arg_count.items():
 			if not has_fixed_argc:
 				parts.append('	if (arg_count == %d) {\n' % arg_count)
 
-			def output_arg_check_and_dispatch(protos, arg_idx, arg_limit):
+			# inline cache of the prototype selected by the last call, keyed by the type of the arguments
+			cache_keys = None
+			if self.overload_cache and arg_count > 0 and len(protos_with_arg_count) > 1:
+				cache_keys = [self.get_overload_cache_key(arg_idx, ctx) for arg_idx in range(arg_count)]
+				if None in cache_keys:
+					cache_keys = None
+				# a cached selection must be the one the complete dispatch would make for any value with the same key
+				elif any([arg['conv'].check_depends_on_value(self) for proto in protos_with_arg_count for arg in proto['argsin']]):
+					cache_keys = None
+
+			def output_cache_store(proto):
+				proto_idx = next(idx for idx, proto_with_arg_count in enumerate(protos_with_arg_count) if proto_with_arg_count is proto)
+				return ''.join(['_overload_cache_key[%d] = _overload_key[%d];\n' % (arg_idx, arg_idx) for arg_idx in range(arg_count)]) + '_overload_cache_proto = %d;\n' % proto_idx
+
+			def output_arg_check_and_dispatch(protos, arg_idx, arg_limit, converted_args):
 				parts = []
 				indent = '	' * (arg_idx+(2 if not has_fixed_argc else 1))
 
 				if arg_idx == arg_limit:
 					assert len(protos) == 1  # there should only be exactly one prototype with a single signature
-					parts.append(self._proto_call(self_conv, protos[0], expr_eval, ctx, fixed_arg_count))
+					if cache_keys is not None:
+						parts.append(output_cache_store(protos[0]))
+					parts.append(self._proto_call(self_conv, protos[0], expr_eval, ctx, fixed_arg_count, converted_args))
 					return ''.join(parts)
 
 				protos_per_arg_conv = get_protos_per_arg_conv(protos, arg_idx)
 
 				parts.append(indent)
-				for conv, protos_for_conv in protos_per_arg_conv.items():
-					parts.append('if (%s) {\n' % conv.check_call(self.get_var(arg_idx, ctx)))
-					parts.append(output_arg_check_and_dispatch(protos_for_conv, arg_idx+1, arg_limit))
+				open_blocks = 0
+				for i, (conv, protos_for_conv) in enumerate(protos_per_arg_conv.items()):
+					decl, check, converts = get_arg_check(conv, protos_for_conv, arg_idx)
+
+					if decl:
+						# the check converts the argument, the converted value is used by the prototype call
+						if i > 0:
+							parts.append('{\n' + indent)  # declare the converted value in its own block when chained to a previous check
+							open_blocks += 1
+						parts.append(decl + indent)
+
+					parts.append('if (%s) {\n' % check)
+					parts.append(output_arg_check_and_dispatch(protos_for_conv, arg_idx+1, arg_limit, converted_args + [arg_idx] if converts else converted_args))
 					parts.append(indent + '} else ')
 
 				parts.append('{\n')
@@ -1163,9 +1673,43 @@ class FABGen:
 
 				parts.append(self.set_error('runtime', 'incorrect type for argument %d to %s, expected %s' % (arg_idx+1, desc, format_list_for_comment(expected_types))))
 				parts.append(indent + '}\n')
+				parts.append((indent + '}\n') * open_blocks)
+				return ''.join(parts)
+
+			def output_cached_proto_call(proto):
+				parts, converted_args = [], []
+				for arg_idx, arg in enumerate(proto['argsin']):
+					decl, check, converts = get_arg_check(arg['conv'], [proto], arg_idx)
+					parts.append(decl + 'if (%s) {\n' % check)
+					if converts:
+						converted_args.append(arg_idx)
+
+				parts.append('_overload_cache_hit = true;\n')
+				parts.append(self._proto_call(self_conv, proto, expr_eval, ctx, fixed_arg_count, converted_args))
+				parts.append('}\n' * arg_count)
 				return ''.join(parts)
 
-			parts.append(output_arg_check_and_dispatch(protos_with_arg_count, 0, arg_count))
+			if cache_keys is None:
+				parts.append(output_arg_check_and_dispatch(protos_with_arg_count, 0, arg_count, []))
+			else:
+				# the cached prototype arguments are checked as usual, a miss falls back to the complete dispatch
+				parts.append('static uintptr_t _overload_cache_key[%d] = {0};\n' % arg_count)
+				parts.append('static int _overload_cache_proto = -1;\n')
+				parts.append('const uintptr_t _overload_key[%d] = {%s};\n' % (arg_count, ', '.join(cache_keys)))
+				parts.append('bool _overload_cache_hit = false;\n\n')
+
+				parts.append('if (%s) {\n' % ' && '.join(['_overload_cache_key[%d] == _overload_key[%d]' % (arg_idx, arg_idx) for arg_idx in range(arg_count)]))
+				parts.append('switch (_overload_cache_proto) {\n')
+				for proto_idx, proto in enumerate(protos_with_arg_count):
+					parts.append('case %d: {\n' % proto_idx)
+					parts.append(output_cached_proto_call(proto))
+					parts.append('} break;\n')
+				parts.append('}\n')
+				parts.append('}\n\n')
+
+				parts.append('if (!_overload_cache_hit) {\n')
+				parts.append(output_arg_check_and_dispatch(protos_with_arg_count, 0, arg_count, []))
+				parts.append('}\n')
 
 			if not has_fixed_argc:
 				parts.append('	} else ')
@@ -1180,6 +1724,14 @@ class FABGen:
 		parts.append('\n')
 
 		self._source += ''.join(parts)
+		return protos
+
+	def _get_prepared_protos(self, record):
+		"""Return the prepared prototypes of a function, method or operator record, they are prepared once and stored on the record."""
+		protos = record.get('prepared_protos')
+		if protos is None:
+			protos = record['prepared_protos'] = self._build_protos(record['protos'])
+		return protos
 
 	#
 	def __do_bind_function_overloads(self, name, protos, bound_name=None):
@@ -1189,8 +1741,40 @@ class FABGen:
 			bound_name = get_symbol_default_bound_name(name)
 		proxy_name = apply_api_prefix(bound_name)
 
-		self._bind_proxy(proxy_name, None, protos, 'function %s' % bound_name, expr_eval, 'function')
-		self._bound_functions.append({'name': name, 'bound_name': bound_name, 'proxy_name': proxy_name, 'protos': protos})
+		prepared_protos = self._bind_proxy(proxy_name, None, protos, 'function %s' % bound_name, expr_eval, 'function')
+		record = FunctionRecord(name=name, bound_name=bound_name, proxy_name=proxy_name, protos=protos, prepared_protos=prepared_protos)
+		self._bound_functions.append(record)
+
+		# batch variant mapping the function over arrays of arguments, optional arguments must be provided
+		if any(['vectorize' in proto[2] for proto in protos]):
+			assert len([proto for proto in protos if 'vectorize' in proto[2]]) == 1, 'only one prototype of function %s can be vectorized' % name
+
+			# the vectorized prototype expands to one prepared prototype per optional argument, map the one taking all arguments
+			vectorized_protos = [proto for proto in self._get_prepared_protos(record) if 'vectorize' in proto['features']]
+			proto = max(vectorized_protos, key=lambda proto: len(proto['args']))
+			self.__assert_vectorizable_proto(proto, name)
+
+			vectorize = proto['features']['vectorize']
+			vectorized_bound_name = vectorize if isinstance(vectorize, str) else '%s_vectorized' % bound_name
+			vectorized_proxy_name = apply_api_prefix(vectorized_bound_name)
+
+			if 'route' in proto['features']:
+				expr_eval = proto['features']['route']
+
+			if self._bind_vectorized_function(vectorized_bound_name, vectorized_proxy_name, proto, expr_eval):
+				self._bound_functions.append(FunctionRecord(name=name, bound_name=vectorized_bound_name, proxy_name=vectorized_proxy_name, protos=[], prepared_protos=[]))
+
+	def __assert_vectorizable_proto(self, proto, name):
+		assert len(proto['args']) > 0, 'vectorized function %s takes no argument' % name
+		assert 'arg_out' not in proto['features'] and 'arg_in_out' not in proto['features'], 'vectorized function %s cannot have output arguments' % name
+
+		for arg in proto['args']:
+			ctype = arg['carg'].ctype
+			assert repr(arg['conv'].ctype) in vectorizable_ctypes, 'argument %s of vectorized function %s is not of an arithmetic type' % (arg['carg'].name, name)
+			assert ctype.get_ref() == '' or (ctype.get_ref() == '&' and ctype.const), 'argument %s of vectorized function %s is not passed by value or const reference' % (arg['carg'].name, name)
+
+		rval_conv = proto['rval']['conv']
+		assert rval_conv is None or repr(rval_conv.ctype) in vectorizable_ctypes, 'vectorized function %s does not return an arithmetic type' % name
 
 	def __commit_function_declarations(self):
 		for name, decl in self.__function_declarations.items():
@@ -1286,8 +1870,8 @@ if (%s) {
 		protos = [(type, args[0], args[1]) for args in proto_args]
 		proxy_name = apply_api_prefix('construct_%s' % conv.bound_name)
 
-		self._bind_proxy(proxy_name, conv, protos, '%s constructor' % conv.bound_name, expr_eval, 'constructor')
-		conv.constructor = {'proxy_name': proxy_name, 'protos': protos}
+		prepared_protos = self._bind_proxy(proxy_name, conv, protos, '%s constructor' % conv.bound_name, expr_eval, 'constructor')
+		conv.constructor = FunctionRecord(proxy_name=proxy_name, protos=protos, prepared_protos=prepared_protos)
 
 	#
 	def bind_method(self, conv, name, rval, args, features=[], bound_name=None):
@@ -1300,8 +1884,9 @@ if (%s) {
 			bound_name = get_symbol_default_bound_name(name)
 		proxy_name = apply_api_prefix('method_%s_of_%s' % (bound_name, conv.bound_name))
 
-		self._bind_proxy(proxy_name, conv, protos, 'method %s of %s' % (bound_name, conv.bound_name), expr_eval, 'method')
-		conv.methods.append({'name': name, 'bound_name': bound_name, 'proxy_name': proxy_name, 'protos': protos})
+		prepared_protos = self._bind_proxy(proxy_name, conv, protos, 'method %s of %s' % (bound_name, conv.bound_name), expr_eval, 'method')
+		conv.methods.append(FunctionRecord(name=name, bound_name=bound_name, proxy_name=proxy_name, protos=protos, prepared_protos=prepared_protos))
+		conv.invalidate_collections()
 
 	#
 	def bind_static_method(self, conv, name, rval, args, features=[], bound_name=None):
@@ -1314,8 +1899,9 @@ if (%s) {
 			bound_name = get_symbol_default_bound_name(name)
 		proxy_name = apply_api_prefix('static_method_%s_of_%s' % (bound_name, conv.bound_name))
 
-		self._bind_proxy(proxy_name, conv, protos, 'static method %s of %s' % (bound_name, conv.bound_name), expr_eval, 'static_method')
-		conv.static_methods.append({'name': name, 'bound_name': bound_name, 'proxy_name': proxy_name, 'protos': protos})
+		prepared_protos = self._bind_proxy(proxy_name, conv, protos, 'static method %s of %s' % (bound_name, conv.bound_name), expr_eval, 'static_method')
+		conv.static_methods.append(FunctionRecord(name=name, bound_name=bound_name, proxy_name=proxy_name, protos=protos, prepared_protos=prepared_protos))
+		conv.invalidate_collections()
 
 	#
 	def bind_members(self, conv, members, features=[]):
@@ -1327,7 +1913,7 @@ if (%s) {
 		if is_bitfield:
 			member = member[:-1]
 
-		arg = parse(member, _NamedCType)
+		arg = self.parse_named_ctype(member)
 
 		# getter
 		expr_eval = lambda args: '_self->%s;' % arg.name
@@ -1348,11 +1934,12 @@ if (%s) {
 		else:
 			setter_proxy_name = None
 
-		conv.members.append({'name': arg.name, 'ctype': arg.ctype, 'getter': getter_proxy_name, 'setter': setter_proxy_name, 'is_bitfield': is_bitfield})
+		conv.members.append(MemberRecord(name=arg.name, ctype=arg.ctype, getter=getter_proxy_name, setter=setter_proxy_name, is_bitfield=is_bitfield))
+		conv.invalidate_collections()
 
 	#
 	def bind_static_member(self, conv, member, features=[]):
-		arg = parse(member, _NamedCType)
+		arg = self.parse_named_ctype(member)
 
 		# getter
 		if 'proxy' in features:
@@ -1377,7 +1964,8 @@ if (%s) {
 		else:
 			setter_proxy_name = None
 
-		conv.static_members.append({'name': arg.name, 'ctype': arg.ctype, 'getter': getter_proxy_name, 'setter': setter_proxy_name})
+		conv.static_members.append(MemberRecord(name=arg.name, ctype=arg.ctype, getter=getter_proxy_name, setter=setter_proxy_name))
+		conv.invalidate_collections()
 
 	def bind_static_members(self, conv, members, features=[]):
 		for member in members:
@@ -1410,7 +1998,7 @@ if (%s) {
 		else:
 			setter_proxy_name = None
 
-		self._bound_variables.append({'name': arg.name, 'bound_name': bound_name, 'ctype': arg.ctype, 'getter': getter_proxy_name, 'setter': setter_proxy_name, 'group': group})
+		self._bound_variables.append(VariableRecord(name=arg.name, bound_name=bound_name, ctype=arg.ctype, getter=getter_proxy_name, setter=setter_proxy_name, group=group))
 
 	def bind_variables(self, vars, features=[], group=None):
 		for var in vars:
@@ -1435,8 +2023,8 @@ if (%s) {
 		expr_eval = lambda args: '*_self %s %s;' % (op, ', '.join(args))
 		proxy_name = apply_api_prefix('%s_operator_of_%s' % (get_clean_symbol_name(op), conv.bound_name))
 
-		self._bind_proxy(proxy_name, conv, protos, '%s operator of %s' % (op, conv.bound_name), expr_eval, 'arithmetic_op', 1)
-		conv.arithmetic_ops.append({'op': op, 'proxy_name': proxy_name, 'protos': protos})
+		prepared_protos = self._bind_proxy(proxy_name, conv, protos, '%s operator of %s' % (op, conv.bound_name), expr_eval, 'arithmetic_op', 1)
+		conv.arithmetic_ops.append(OperatorRecord(op=op, proxy_name=proxy_name, protos=protos, prepared_protos=prepared_protos))
 
 	def bind_arithmetic_ops(self, conv, ops, rval, args, features=[]):
 		for op in ops:
@@ -1457,8 +2045,8 @@ if (%s) {
 		proxy_name = apply_api_prefix('%s_operator_of_%s' % (get_clean_symbol_name(op), conv.bound_name))
 		protos = [('void', arg[0], arg[1]) for arg in args]
 
-		self._bind_proxy(proxy_name, conv, protos, '%s operator of %s' % (op, conv.bound_name), expr_eval, 'inplace_arithmetic_op', 1)
-		conv.arithmetic_ops.append({'op': op, 'proxy_name': proxy_name, 'protos': protos})
+		prepared_protos = self._bind_proxy(proxy_name, conv, protos, '%s operator of %s' % (op, conv.bound_name), expr_eval, 'inplace_arithmetic_op', 1)
+		conv.arithmetic_ops.append(OperatorRecord(op=op, proxy_name=proxy_name, protos=protos, prepared_protos=prepared_protos))
 
 	def bind_inplace_arithmetic_ops(self, conv, ops, args, features=[]):
 		for op in ops:
@@ -1479,8 +2067,8 @@ if (%s) {
 		proxy_name = apply_api_prefix('%s_operator_of_%s' % (get_clean_symbol_name(op), conv.bound_name))
 		protos = [('bool', arg[0], arg[1]) for arg in args]
 
-		self._bind_proxy(proxy_name, conv, protos, '%s operator of %s' % (op, conv.bound_name), expr_eval, 'comparison_op', 1)
-		conv.comparison_ops.append({'op': op, 'proxy_name': proxy_name, 'protos': protos})
+		prepared_protos = self._bind_proxy(proxy_name, conv, protos, '%s operator of %s' % (op, conv.bound_name), expr_eval, 'comparison_op', 1)
+		conv.comparison_ops.append(OperatorRecord(op=op, proxy_name=proxy_name, protos=protos, prepared_protos=prepared_protos))
 
 	def bind_comparison_ops(self, conv, ops, args, features=[]):
 		for op in ops:
@@ -1492,51 +2080,90 @@ if (%s) {
 
 	#
 	def get_type_tag_cast_function(self):
+		"""Output the type tag cast system: an open addressing hash table of the declared casts indexed by their input and output type tags."""
 		out = '// type_tag based cast system\n'
 
-		def output_type_tag_cast_tree(expr):
-			out = []
-
-			i = 0
-			for conv in self._bound_types:
-				if len(conv._casts) == 0:
-					continue
-
-				out.append('	' if i == 0 else ' else ')
-				out.append('if (in_type_tag == %s) {\n' % conv.type_tag)
+		# collect casts, the first cast declared for a pair of type tags is used
+		casts = OrderedDict()
+		for conv in self._bound_types:
+			for cast in conv._casts:
+				key = (get_type_tag_value(conv), get_type_tag_value(cast[0]))
+				if key not in casts:
+					casts[key] = (conv, cast)
+
+		# cast functions
+		for (in_conv, (out_conv, cast_delegate)) in casts.values():
+			out += 'static void *_type_tag_cast_%s_to_%s(void *in_ptr) {\n' % (in_conv.bound_name, out_conv.bound_name)
+			out += '	void *out_ptr = NULL;\n'
+			out += '	' + cast_delegate('in_ptr', 'out_ptr')
+			out += '	return out_ptr;\n'
+			out += '}\n\n'
+
+		# hash table, kept at most half full so that probe sequences stay short
+		size = 1
+		while size < len(casts) * 2:
+			size *= 2
+
+		table = [None] * size
+		for key, cast in casts.items():
+			i = get_type_tag_cast_slot(key[0], key[1], size)
+			while table[i] is not None:
+				i = (i + 1) % size
+			table[i] = (key, cast)
 
-				for j, cast in enumerate(conv._casts):
-					out.append('	' if j == 0 else ' else ')
-					out.append('if (out_type_tag == %s) {\n' % cast[0].type_tag)
-					out.append(expr(cast))
-					out.append('}\n')
+		out += '''\
+struct _type_tag_cast_entry {
+	uint32_t in_type_tag, out_type_tag;
+	void *(*cast)(void *in_ptr);
+};
 
-				out.append('}\n')
-				i += 1
+static const _type_tag_cast_entry _type_tag_casts[%d] = {
+''' % size
 
-			return ''.join(out)
+		for entry in table:
+			if entry is None:
+				out += '	{0, 0, NULL},\n'
+			else:
+				(in_type_tag, out_type_tag), (in_conv, (out_conv, cast_delegate)) = entry
+				out += '	{%s, %s, &_type_tag_cast_%s_to_%s},\n' % (hex(in_type_tag), hex(out_type_tag), in_conv.bound_name, out_conv.bound_name)
 
-		# can cast
 		out += '''\
-static bool _type_tag_can_cast(uint32_t in_type_tag, uint32_t out_type_tag) {
+};
+
+static inline const _type_tag_cast_entry *_type_tag_find_cast(uint32_t in_type_tag, uint32_t out_type_tag) {
+	for (uint32_t i = (in_type_tag ^ (out_type_tag * %sU)) & %d;; i = (i + 1) & %d) {
+		const _type_tag_cast_entry &entry = _type_tag_casts[i];
+		if (entry.cast == NULL)
+			return NULL;
+		if (entry.in_type_tag == in_type_tag && entry.out_type_tag == out_type_tag)
+			return &entry;
+	}
+}
+
+%sbool _type_tag_can_cast(uint32_t in_type_tag, uint32_t out_type_tag) {
 	if (out_type_tag == in_type_tag)
 		return true;
+	return _type_tag_find_cast(in_type_tag, out_type_tag) != NULL;
+}
 
-	%s
-	return false;
-}\n\n''' % output_type_tag_cast_tree(lambda cast: '	return true;\n')
-
-		# cast
-		out += '''\
-static void *_type_tag_cast(void *in_ptr, uint32_t in_type_tag, uint32_t out_type_tag) {
+%svoid *_type_tag_cast(void *in_ptr, uint32_t in_type_tag, uint32_t out_type_tag) {
 	if (out_type_tag == in_type_tag)
 		return in_ptr;
+	const _type_tag_cast_entry *entry = _type_tag_find_cast(in_type_tag, out_type_tag);
+	return entry ? entry->cast(in_ptr) : NULL;
+}
 
-	void *out_ptr = NULL;
-	%s
-
-	return out_ptr;
-}\n\n''' % output_type_tag_cast_tree(lambda cast: cast[1]('in_ptr', 'out_ptr'))
+%sbool _type_tag_try_cast(void *in_ptr, uint32_t in_type_tag, uint32_t out_type_tag, void **out_ptr) {
+	if (out_type_tag == in_type_tag) {
+		*out_ptr = in_ptr;
+		return true;
+	}
+	const _type_tag_cast_entry *entry = _type_tag_find_cast(in_type_tag, out_type_tag);
+	if (!entry)
+		return false;
+	*out_ptr = entry->cast(in_ptr);
+	return true;
+}\n\n''' % (hex(type_tag_hash_multiplier), size - 1, size - 1, self.get_shared_linkage(), self.get_shared_linkage(), self.get_shared_linkage())
 
 		return out
 
@@ -1577,6 +2204,8 @@ static void *_type_tag_cast(void *in_ptr, uint32_t in_type_tag, uint32_t out_typ
 		out += ' - %d member\n' % member_count
 		out += ' - %d static member\n' % static_member_count
 
+		out += ' - %d/%d C type parse cache hits/misses\n' % (ctype_parse_stats['hits'], ctype_parse_stats['misses'])
+
 		return out
 
 	def __print_stats(self):  # pragma: no cover
@@ -1627,6 +2256,10 @@ size_t %s(%s *(*get_c_type_info)(const char *type)) {
 '''
 
 	def finalize(self):
+		# back to the main translation unit
+		while len(self.__class_segments) > 0:
+			self._source = self.__class_segments.pop()[1]
+
 		# insert includes
 		system_includes = ''
 		if len(self.__system_includes) > 0:
@@ -1636,7 +2269,7 @@ size_t %s(%s *(*get_c_type_info)(const char *type)) {
 		if len(self.__user_includes) > 0:
 			user_includes = ''.join(['#include "%s"\n' % path for path in self.__user_includes])
 
-		self._source = self._source.replace('{{{__WRAPPER_INCLUDES__}}}', system_includes + user_includes)
+		self._internal_header.set_placeholder('WRAPPER_INCLUDES', system_includes + user_includes)
 
 		# cast to
 		self._source += self.get_type_tag_cast_function()
@@ -1653,10 +2286,159 @@ size_t %s(%s *(*get_c_type_info)(const char *type)) {
 		self.output_linker_api()
 
 	def get_output(self):
-		return {
-			'bind_%s.h' % self.get_language(): self._header,
-			'bind_%s.cpp' % self.get_language(): self._source
+		output = {
+			'bind_%s.h' % self.get_language(): str(self._header),
+			'bind_%s.cpp' % self.get_language(): str(self._source)
 		}
 
+		if len(self._shard_sources) > 0:
+			output[self.get_internal_header_name()] = str(self._internal_header)
+			# empty shards are output as well (they only include the internal header), the list of output files only depends on the shard count
+			for i, source in enumerate(self._shard_sources):
+				output['bind_%s_%d.cpp' % (self.get_language(), i)] = str(source)
+
+		return output
+
 	def _build_protos(self, protos):
 		return self.__prepare_protos(self.__expand_protos(protos))
+
+
+# binding record
+class BindingRecord:
+	"""Log of the generator calls made by a binding script, replayed in order on other generators.
+
+	The log holds the raw calls and their arguments, not the prepared declarations, so replaying it runs the generator
+	again. It only replays on other languages when the script does not depend on the generator it runs against: any
+	call to get_language, backend specific converter, call from a script callback or direct converter modification
+	ties the log to the language it was recorded with. Binding scripts branching on the language, as most real-world
+	scripts do, are run again for each language.
+	"""
+	def __init__(self):
+		self.entries = []  # (kind, target, args, kwargs, result)
+		self.language = None  # language the log is tied to, None if it replays on any generator
+
+	def can_replay(self, gen):
+		return self.language is None or self.language == gen.get_language()
+
+	def replay(self, gen):
+		assert self.can_replay(gen), 'binding record is specific to %s' % self.language
+
+		memo = {}  # recorded converter id -> replayed converter
+
+		for kind, target, args, kwargs, result in self.entries:
+			args, kwargs = copy.deepcopy((args, kwargs), memo)
+
+			if kind == 'call':
+				replayed = getattr(gen, target)(*args, **kwargs)
+			elif kind == 'helper':
+				replayed = target(gen, *args, **kwargs)
+			elif kind == 'setattr':
+				replayed = setattr(gen, target, args[0])
+			elif kind == 'delattr':
+				replayed = delattr(gen, target)
+
+			if isinstance(result, TypeConverter):
+				memo[id(result)] = replayed
+
+
+def _get_conv_state(conv):
+	slots = [k for cls in type(conv).__mro__ for k in getattr(cls, '__slots__', ()) if not k.startswith('__')]
+	attrs = [(k, getattr(conv, k)) for k in slots if hasattr(conv, k)] + list(getattr(conv, '__dict__', {}).items())  # converters declared by binding scripts may not be slotted
+	# memoized collections are not part of the converter declaration
+	return [(k, id(v), len(v) if isinstance(v, (list, dict)) else None) for k, v in attrs if k not in ['_declaration_version', '_collections']]
+
+
+class BindingRecorder:
+	"""Forward the calls of a binding script to a generator while logging them to a binding record."""
+	def __init__(self, gen):
+		self.__dict__['_gen'] = gen
+		self.__dict__['record'] = BindingRecord()
+		self.__dict__['_depth'] = 0
+		self.__dict__['_conv_states'] = {}  # id -> (converter, state after the last generator call)
+
+	def __set_language_specific(self):
+		if self.record.language is None:
+			self.record.language = self._gen.get_language()
+
+	def __is_language_specific(self, value, visited):
+		if id(value) in visited:
+			return False
+		visited.add(id(value))
+
+		if isinstance(value, TypeConverter):
+			return id(value) not in self._conv_states
+		if isinstance(value, type):
+			return issubclass(value, TypeConverter)
+		if isinstance(value, (list, tuple)):
+			return any([self.__is_language_specific(v, visited) for v in value])
+		if isinstance(value, (dict, Record)):
+			return any([self.__is_language_specific(v, visited) for v in value.values()])
+		if hasattr(value, '__dict__') and not callable(value):
+			return self.__is_language_specific(value.__dict__, visited)
+		return False
+
+	def __check_convs(self, convs):
+		for conv in convs:
+			if _get_conv_state(conv) != self._conv_states[id(conv)][1]:
+				self.__set_language_specific()  # converter modified outside of the generator
+
+	def __update_convs(self, convs):
+		for conv in convs:
+			self._conv_states[id(conv)] = (conv, _get_conv_state(conv))
+
+	def __run(self, kind, target, args, kwargs, call):
+		if self._depth > 0:
+			self.__set_language_specific()  # generator called back from a script callback
+			return call()
+
+		if self.__is_language_specific((args, kwargs), set()):
+			self.__set_language_specific()
+
+		convs = [v for v in list(args) + list(kwargs.values()) if isinstance(v, TypeConverter) and id(v) in self._conv_states]
+		self.__check_convs(convs)
+
+		self.__dict__['_depth'] += 1
+		try:
+			result = call()
+		finally:
+			self.__dict__['_depth'] -= 1
+
+		if isinstance(result, TypeConverter):
+			convs.append(result)
+		self.__update_convs(convs)
+
+		self.record.entries.append((kind, target, args, kwargs, result))
+		return result
+
+	def __getattr__(self, name):
+		attr = getattr(self._gen, name)
+		if not callable(attr):
+			return attr
+
+		if name == 'get_language':
+			self.__set_language_specific()
+
+		return lambda *args, **kwargs: self.__run('call', name, args, kwargs, lambda: attr(*args, **kwargs))
+
+	def __setattr__(self, name, value):
+		self.__run('setattr', name, (value,), {}, lambda: setattr(self._gen, name, value))
+
+	def __delattr__(self, name):
+		self.__run('delattr', name, (), {}, lambda: delattr(self._gen, name))
+
+	def run_helper(self, helper, args, kwargs):
+		return self.__run('helper', helper, args, kwargs, lambda: helper(self._gen, *args, **kwargs))
+
+	def finish(self):
+		"""Return the binding record, checking for converters modified after their last declaration."""
+		self.__check_convs([conv for conv, state in self._conv_states.values()])
+		return self.record
+
+
+def binding_helper(helper):
+	"""Record a library helper as a single declaration so that it runs against the replaying generator."""
+	def call(gen, *args, **kwargs):
+		if isinstance(gen, BindingRecorder):
+			return gen.run_helper(helper, args, kwargs)
+		return helper(gen, *args, **kwargs)
+	return call
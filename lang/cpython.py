@@ -4,8 +4,42 @@
 import gen
 
 
+# PEP 3118 format codes of the C types that can be exposed through the buffer protocol
+buffer_format_codes = {
+	'char': 'b', 'signed char': 'b', 'unsigned char': 'B', 'short': 'h', 'unsigned short': 'H', 'int': 'i', 'unsigned int': 'I',
+	'long': 'l', 'unsigned long': 'L', 'long long': 'q', 'unsigned long long': 'Q',
+	'int8_t': 'b', 'uint8_t': 'B', 'int16_t': 'h', 'uint16_t': 'H', 'int32_t': 'i', 'uint32_t': 'I', 'int64_t': 'q', 'uint64_t': 'Q',
+	'size_t': 'N', 'float': 'f', 'double': 'd'
+}
+
+
+def get_buffer_fields(conv):
+	"""Return the (format code, member name) fields of a type exposed through the buffer protocol, None if it cannot be exposed."""
+	if repr(conv.ctype) in buffer_format_codes:
+		return [(buffer_format_codes[repr(conv.ctype)], None)]
+
+	if conv.is_type_class():
+		members = conv.get_all_members()
+		if len(members) > 0 and all([not member.is_bitfield and repr(member.ctype) in buffer_format_codes for member in members]):
+			return [(buffer_format_codes[repr(member.ctype)], member.name) for member in members]
+
+	return None
+
+
+def get_array_typecode(code):
+	"""Return the C expression of the array.array typecode storing values of a buffer format code."""
+	if code == 'N':  # array.array has no size_t typecode, use the unsigned type of the same size
+		return '(sizeof(size_t) == sizeof(unsigned long long) ? "Q" : "L")'
+	return '"%s"' % code
+
+
 #
 class PythonTypeConverterCommon(gen.TypeConverter):
+	__slots__ = ()
+	def borrows_object(self):
+		"""Return True if the values converted to C point into the Python object they were converted from."""
+		return False
+
 	def get_type_api(self, module_name):
 		out = '// type API for %s\n' % self.ctype
 		if self.c_storage_class:
@@ -16,6 +50,11 @@ class PythonTypeConverterCommon(gen.TypeConverter):
 		else:
 			out += 'void %s(PyObject *o, void *obj);\n' % self.to_c_func
 		out += 'PyObject *%s(void *obj, OwnershipPolicy);\n' % self.from_c_func
+		if self.has_check_to_c():
+			if self.c_storage_class:
+				out += 'bool %s(PyObject *o, void *obj, %s &storage);\n' % (self.check_to_c_func, self.c_storage_class)
+			else:
+				out += 'bool %s(PyObject *o, void *obj);\n' % self.check_to_c_func
 		out += '\n'
 		return out
 
@@ -35,12 +74,22 @@ class PythonTypeConverterCommon(gen.TypeConverter):
 	def check_call(self, in_var):
 		return "%s(%s)" % (self.check_func, in_var)
 
+	def check_to_c_call(self, in_var, out_var_p):
+		if self.c_storage_class:
+			c_storage_var = 'storage_%s' % out_var_p.replace('&', '_')
+			return '%s %s;\n' % (self.c_storage_class, c_storage_var), '%s(%s, (void *)%s, %s)' % (self.check_to_c_func, in_var, out_var_p, c_storage_var)
+		return '', '%s(%s, (void *)%s)' % (self.check_to_c_func, in_var, out_var_p)
+
 
 #
 class PythonClassTypeDefaultConverter(PythonTypeConverterCommon):
+	__slots__ = ()
 	def is_type_class(self):
 		return True
 
+	def has_check_to_c(self):
+		return True
+
 	def get_type_glue(self, gen, module_name):
 		out = ''
 
@@ -103,14 +152,89 @@ class PythonClassTypeDefaultConverter(PythonTypeConverterCommon):
 			out += '	return 0;\n'
 			out += '}\n\n'
 
+		# buffer protocol support
+		has_buffer = has_sequence and gen.buffer_protocol and getattr(seq, 'buffer', False) and get_buffer_fields(seq.wrapped_conv) is not None
+
+		if has_buffer:
+			out += '// buffer protocol for %s\n' % self.bound_name
+			fields = get_buffer_fields(seq.wrapped_conv)
+
+			if fields[0][1] is None:
+				out += 'static const char *%s_buffer_format() { return "%s"; }\n\n' % (self.bound_name, fields[0][0])
+			else:
+				# structured format, padding is made explicit so that the format item size matches the C++ type size
+				out += '''\
+static const char *%s_buffer_format() {
+	static std::string format;
+	if (format.empty()) {
+		using T = %s;
+		struct field { const char *code; size_t offset, size; const char *name; } fields[] = {%s};
+		std::sort(std::begin(fields), std::end(fields), [](const field &a, const field &b) { return a.offset < b.offset; });
+
+		size_t offset = 0;
+		format = "T{";
+		for (const auto &f : fields) {
+			if (f.offset > offset)
+				format += std::to_string(f.offset - offset) + "x";
+			format += std::string(f.code) + ":" + f.name + ":";
+			offset = f.offset + f.size;
+		}
+		if (sizeof(T) > offset)
+			format += std::to_string(sizeof(T) - offset) + "x";
+		format += "}";
+	}
+	return format.c_str();
+}
+\n''' % (self.bound_name, seq.wrapped_conv.ctype, ', '.join(['{"%s", offsetof(T, %s), sizeof(T::%s), "%s"}' % (code, name, name, name) for code, name in fields]))
+
+			out += '''\
+static int %s_bf_getbuffer(PyObject *self, Py_buffer *view, int flags) {
+	using T = %s;
+	if (!std::is_trivially_copyable<T>::value) {
+		PyErr_SetString(PyExc_BufferError, "%s elements are not trivially copyable");
+		view->obj = NULL;
+		return -1;
+	}
+''' % (self.bound_name, seq.wrapped_conv.ctype, self.bound_name)
+			out += gen._prepare_to_c_self(self, '_self')
+			out += '	Py_ssize_t size = -1;\n'
+			out += seq.get_size('_self', 'size')
+			out += '	T *data = NULL;\n'
+			out += seq.get_data('_self', 'data')
+			out += '''
+	Py_ssize_t *shape_strides = (Py_ssize_t *)PyMem_Malloc(2 * sizeof(Py_ssize_t)); // released by %s_bf_releasebuffer
+	if (!shape_strides) {
+		PyErr_NoMemory();
+		view->obj = NULL;
+		return -1;
+	}
+	shape_strides[0] = size;
+	shape_strides[1] = sizeof(T);
+
+	view->obj = self;
+	Py_INCREF(self);
+	view->buf = (void *)data;
+	view->len = size * sizeof(T);
+	view->readonly = 0;
+	view->itemsize = sizeof(T);
+	view->format = (flags & PyBUF_FORMAT) ? (char *)%s_buffer_format() : NULL;
+	view->ndim = 1;
+	view->shape = (flags & PyBUF_ND) == PyBUF_ND ? &shape_strides[0] : NULL;
+	view->strides = (flags & PyBUF_STRIDES) == PyBUF_STRIDES ? &shape_strides[1] : NULL;
+	view->suboffsets = NULL;
+	view->internal = shape_strides;
+	return 0;
+}
+
+static void %s_bf_releasebuffer(PyObject *self, Py_buffer *view) { PyMem_Free(view->internal); }
+\n''' % (self.bound_name, self.bound_name, self.bound_name)
+
 		# type
 		out += '// type %s\n' % self.bound_name
-		out += 'static PyObject *%s_type;\n\n' % self.bound_name
+		out += '%sPyObject *%s_type;\n\n' % (gen.get_shared_linkage(), self.bound_name)
 
 		# constructor
 		out += 'static PyObject *%s_tp_new(PyTypeObject *subtype, PyObject *args, PyObject *kwds) {\n' % self.bound_name
-		if self._inline:
-			out += '	assert(sizeof(%s) <= 16);\n\n' % self.ctype
 		if self.constructor:
 			out += '	return %s(NULL, args);\n' % self.constructor['proxy_name']
 		else:
@@ -132,7 +256,7 @@ class PythonClassTypeDefaultConverter(PythonTypeConverterCommon):
 		static_members = self.get_all_static_members()
 
 		if len(static_members) > 0:
-			out += 'static void bind_%s_static_members(PyObject *o) {\n' % self.bound_name
+			out += '%svoid bind_%s_static_members(PyObject *o) {\n' % (gen.get_shared_linkage(), self.bound_name)
 			out += '	PyObject *tmp;\n'
 			for i, attr in enumerate(static_members):
 				if attr['getter']:
@@ -145,9 +269,9 @@ class PythonClassTypeDefaultConverter(PythonTypeConverterCommon):
 		# methods
 		out += 'static PyMethodDef %s_tp_methods[] = {\n' % self.bound_name
 		for method in self.get_all_methods():
-			out += '	{(char *)"%s", (PyCFunction)%s, METH_VARARGS},\n' % (method['bound_name'], method['proxy_name'])
+			out += '	{(char *)"%s", (PyCFunction)%s, %s},\n' % (method['bound_name'], method['proxy_name'], gen.get_proxy_call_flags(method['proxy_name']))
 		for method in self.get_all_static_methods():
-			out += '	{(char *)"%s", (PyCFunction)%s, METH_VARARGS|METH_STATIC},\n' % (method['bound_name'], method['proxy_name'])
+			out += '	{(char *)"%s", (PyCFunction)%s, %s|METH_STATIC},\n' % (method['bound_name'], method['proxy_name'], gen.get_proxy_call_flags(method['proxy_name']))
 		out += '	{NULL} /* Sentinel */\n'
 		out += '};\n\n'
 
@@ -197,6 +321,13 @@ static PyObject *%s_default_Py_%s(PyObject *o1, PyObject *o2) {
 		out += '	Py_RETURN_NOTIMPLEMENTED;\n'
 		out += '}\n\n'
 
+		# free list
+		out += '%swrapped_Object_pool %s_pool = {"%s", NULL, 0, %d, 0, 0};\n\n' % (gen.get_shared_linkage(), self.bound_name, self.bound_name, gen.object_pool_size)
+		out += 'static void %s_tp_dealloc(PyObject *self) { dealloc_wrapped_Object(self, &%s_pool); }\n\n' % (self.bound_name, self.bound_name)
+
+		# copied values are constructed in the wrapper object storage for inline types
+		is_inline = gen._is_stored_inline(self)
+
 		# slots
 		def get_operator_slot(slot, op):
 			op = self.get_operator(op)
@@ -205,7 +336,7 @@ static PyObject *%s_default_Py_%s(PyObject *o1, PyObject *o2) {
 		out += 'static PyType_Slot %s_slots[] = {\n' % self.bound_name
 		out += '	{Py_tp_new, (void *)&%s_tp_new},\n' % self.bound_name
 		out += '	{Py_tp_doc, (void *)"%s"},\n' % gen.get_symbol_doc(self.bound_name)
-		out += '	{Py_tp_dealloc, (void *)&wrapped_Object_tp_dealloc},\n'
+		out += '	{Py_tp_dealloc, (void *)&%s_tp_dealloc},\n' % self.bound_name
 		out += '	{Py_tp_getset, (void *)&%s_tp_getset},\n' % self.bound_name
 		out += '	{Py_tp_methods, (void *)&%s_tp_methods},\n' % self.bound_name
 		out += '	{Py_tp_richcompare, (void *)&%s_tp_richcompare},\n' % self.bound_name
@@ -219,19 +350,22 @@ static PyObject *%s_default_Py_%s(PyObject *o1, PyObject *o2) {
 			out += '	{Py_sq_length, (void *)&%s_sq_length},\n' % self.bound_name
 			out += '	{Py_sq_item, (void *)&%s_sq_item},\n' % self.bound_name
 			out += '	{Py_sq_ass_item, (void *)&%s_sq_ass_item},\n' % self.bound_name
+		if has_buffer:
+			out += '	{Py_bf_getbuffer, (void *)&%s_bf_getbuffer},\n' % self.bound_name
+			out += '	{Py_bf_releasebuffer, (void *)&%s_bf_releasebuffer},\n' % self.bound_name
 		out += '''	{0, NULL}
 };
 \n'''
 
 		# specification
-		out += '''static PyType_Spec %s_spec = {
+		out += '''%sPyType_Spec %s_spec = {
 	"%s", /* name */
-	sizeof(wrapped_Object), /* basicsize */
+	%s, /* basicsize */
 	0, /* itemsize*/
 	Py_TPFLAGS_DEFAULT, /* flags */
 	%s_slots
 };
-\n''' % (self.bound_name, self.bound_name, self.bound_name)
+\n''' % (gen.get_shared_linkage(), self.bound_name, self.bound_name, 'sizeof(inline_wrapped_Object<%s>)' % self.ctype if is_inline else 'sizeof(wrapped_Object)', self.bound_name)
 
 		# delete delegate
 		out += 'static void delete_%s(void *o) { delete (%s *)o; }\n\n' % (self.bound_name, self.ctype)
@@ -252,8 +386,16 @@ static PyObject *%s_default_Py_%s(PyObject *o1, PyObject *o2) {
 }
 \n''' % (self.to_c_func, self.type_tag)
 
+		# check and convert to C
+		out += '''bool %s(PyObject *o, void *obj) {
+	wrapped_Object *w = cast_to_wrapped_Object_safe(o);
+	if (!w)
+		return false;
+	return _type_tag_try_cast(w->obj, w->type_tag, %s, (void **)obj);
+}
+\n''' % (self.check_to_c_func, self.type_tag)
+
 		# from C
-		is_inline = False
 		if self._non_copyable:
 			if self._moveable:
 				copy_code = 'obj = new %s(std::move(*(%s *)obj));' % (self.ctype, self.ctype)
@@ -261,9 +403,8 @@ static PyObject *%s_default_Py_%s(PyObject *o1, PyObject *o2) {
 				copy_code = '''PyErr_SetString(PyExc_RuntimeError, "type %s is non-copyable and non-moveable");
 		return NULL;''' % self.bound_name
 		else:
-			if self._inline:
-				is_inline = True
-				copy_code = 'obj = new((void *)pyobj->inline_obj) %s(*(%s *)obj);' % (self.ctype, self.ctype)
+			if is_inline:
+				copy_code = 'obj = new((void *)((inline_wrapped_Object<%s> *)pyobj)->inline_obj) %s(*(%s *)obj);' % (self.ctype, self.ctype, self.ctype)
 			else:
 				copy_code = 'obj = new %s(*(%s *)obj);' % (self.ctype, self.ctype)
 
@@ -280,7 +421,7 @@ static void delete_inline_%s(void *o) {
 }\n\n''' % (self.bound_name, self.ctype)
 
 		out += '''PyObject *%s(void *obj, OwnershipPolicy own) {
-	wrapped_Object *pyobj = PyObject_New(wrapped_Object, (PyTypeObject *)%s_type);
+	wrapped_Object *pyobj = new_wrapped_Object((PyTypeObject *)%s_type, &%s_pool);
 	if (own == Copy) {
 		%s
 	}
@@ -291,10 +432,18 @@ static void delete_inline_%s(void *o) {
 	_IncModuleRefCount();
 	return (PyObject *)pyobj;
 }
-\n''' % (self.from_c_func, self.bound_name, copy_code, self.type_tag, delete_code)
+\n''' % (self.from_c_func, self.bound_name, self.bound_name, copy_code, self.type_tag, delete_code)
 
 		return out
 
+	def get_type_internal_api(self, module_name):
+		out = 'extern PyObject *%s_type;\n' % self.bound_name
+		out += 'extern PyType_Spec %s_spec;\n' % self.bound_name
+		out += 'extern wrapped_Object_pool %s_pool;\n' % self.bound_name
+		if len(self.get_all_static_members()) > 0:
+			out += 'void bind_%s_static_members(PyObject *o);\n' % self.bound_name
+		return out + '\n'
+
 	def finalize_type(self):
 		out = '	%s_type = PyType_FromSpec(&%s_spec);\n' % (self.bound_name, self.bound_name)
 		if len(self.get_all_static_members()) > 0:
@@ -305,6 +454,7 @@ static void delete_inline_%s(void *o) {
 
 #
 class PythonPtrTypeDefaultConverter(PythonTypeConverterCommon):
+	__slots__ = ()
 	def get_type_glue(self, gen, module_name):
 		out = '''bool %s(PyObject *o) {
 	if (PyLong_Check(o))
@@ -330,6 +480,7 @@ class PythonPtrTypeDefaultConverter(PythonTypeConverterCommon):
 
 
 class PythonExternTypeConverter(PythonTypeConverterCommon):
+	__slots__ = ('module',)
 	def __init__(self, type, to_c_storage_type, bound_name, module):
 		super().__init__(type, to_c_storage_type, bound_name)
 		self.module = module
@@ -353,6 +504,19 @@ class PythonExternTypeConverter(PythonTypeConverterCommon):
 	def check_call(self, in_var):
 		return "(*%s)(%s)" % (self.check_func, in_var)
 
+	def get_type_internal_api(self, module_name):
+		out = '// extern type API for %s\n' % self.ctype
+		if self.c_storage_class:
+			out += 'struct %s;\n' % self.c_storage_class
+		out += 'extern bool (*%s)(PyObject *o);\n' % self.check_func
+		if self.c_storage_class:
+			out += 'extern void (*%s)(PyObject *o, void *obj, %s &storage);\n' % (self.to_c_func, self.c_storage_class)
+		else:
+			out += 'extern void (*%s)(PyObject *o, void *obj);\n' % self.to_c_func
+		out += 'extern PyObject *(*%s)(void *obj, OwnershipPolicy);\n' % self.from_c_func
+		out += '\n'
+		return out
+
 	def get_type_glue(self, gen, module_name):
 		out = '// extern type API for %s\n' % self.ctype
 		if self.c_storage_class:
@@ -383,9 +547,16 @@ class CPythonGenerator(gen.FABGen):
 	default_ptr_converter = PythonPtrTypeDefaultConverter
 	default_extern_converter = PythonExternTypeConverter
 
+	supports_shards = True
+
 	def __init__(self):
 		super().__init__()
 		self.check_self_type_in_ops = True
+		self.limited_api_version = 0x03020000  # minimum version of the limited API targeted, 0x030A0000+ borrows the UTF-8 buffer of string arguments
+		self.fastcall = False  # use METH_FASTCALL/METH_O/METH_NOARGS proxies, requires CPython 3.10+
+		self.buffer_protocol = False  # expose the storage of sequence types with a buffer feature through the buffer protocol, requires CPython 3.11+
+		self.inline_copies = False  # construct the copied values and constructed objects of all copyable classes in their wrapper object (as classes flagged _inline do)
+		self.object_pool_size = 0  # default number of released wrapper objects kept for reuse by each class, 0 disables the free lists and their module functions
 
 	def get_language(self):
 		return "CPython"
@@ -393,17 +564,44 @@ class CPythonGenerator(gen.FABGen):
 	def output_includes(self):
 		super().output_includes()
 
-		self._source += '''#define Py_LIMITED_API 0x03020000 // ensure a single build for Python 3.x (with x>2)
+		self.add_include('cstddef', True)
+		self.add_include('vector', True)
+
+		if self.buffer_protocol:
+			self.add_include('algorithm', True)
+			self.add_include('cstring', True)
+			self.add_include('iterator', True)
+			self.add_include('string', True)
+			self.add_include('type_traits', True)
+
+		self._internal_header += '''#define Py_LIMITED_API 0x%08X // ensure a single build for Python 3.%d+
 #include "Python.h"
-\n'''
+\n''' % (self.get_limited_api_version(), (self.get_limited_api_version() >> 16) & 0xff)
+
+	def get_limited_api_version(self):
+		"""Return the version of the limited API targeted by the generated code, raised by the options that require it."""
+		version = self.limited_api_version
+		if self.fastcall:
+			version = max(version, 0x030A0000)  # METH_FASTCALL
+		if self.buffer_protocol:
+			version = max(version, 0x030B0000)  # Py_bf_getbuffer, PyObject_GetBuffer
+		return version
 
 	def start(self, module_name):
 		super().start(module_name)
 
+		self.__proxy_call_flags = {}  # proxy name -> calling convention
+
+		if len(self._shard_sources) > 0:
+			self._internal_header += 'extern int64_t _obj_alive_count;\nextern PyObject *_module_py_object;\n\n'
+
 		self._source += '''\
-static int64_t _obj_alive_count = 0; // used to prevent the module object from being GCed before an object it created
-static PyObject *_module_py_object = NULL;
+%sint64_t _obj_alive_count = 0; // used to prevent the module object from being GCed before an object it created
+%sPyObject *_module_py_object = NULL;
 
+''' % (self.get_shared_linkage(), self.get_shared_linkage())
+
+		self._internal_header += '''\
 static inline void _IncModuleRefCount() {
 	if (_obj_alive_count == 0)
 		Py_INCREF(_module_py_object);
@@ -417,7 +615,7 @@ static inline void _DecModuleRefCount() {
 }
 \n'''
 
-		self._source += '''\
+		self._internal_header += '''\
 struct type_tag_info {
 	uint32_t type_tag;
 	const char *c_type;
@@ -428,9 +626,7 @@ struct type_tag_info {
 };
 \n'''
 
-		self._source += 'static type_tag_info *get_bound_type_info(uint32_t type_tag);\n\n'
-
-		self._source += '''\
+		self._internal_header += '''\
 typedef struct {
 	PyObject_HEAD;
 
@@ -438,11 +634,18 @@ typedef struct {
 	uint32_t type_tag; // wrapped pointer type tag
 
 	void *obj;
-	char inline_obj[16]; // storage for inline objects
 
 	void (*on_delete)(void *);
 } wrapped_Object;
 
+// wrapper object storing a copied value of an inline type, its type basicsize is sized to fit T
+template <typename T> struct inline_wrapped_Object {
+	static_assert(alignof(T) <= alignof(std::max_align_t), "over-aligned types cannot be stored inline");
+
+	wrapped_Object base;
+	alignas(T) char inline_obj[sizeof(T)];
+};
+
 static void init_wrapped_Object(wrapped_Object *o, uint32_t type_tag, void *obj) {
 	o->magic_u32 = 0x46414221;
 	o->type_tag = type_tag;
@@ -461,19 +664,47 @@ static inline wrapped_Object *cast_to_wrapped_Object_safe(PyObject *o) {
 
 static inline wrapped_Object *cast_to_wrapped_Object_unsafe(PyObject *o) { return (wrapped_Object *)o; }
 
-static void wrapped_Object_tp_dealloc(PyObject *self) {
+// bounded free list of the released wrapper objects of a class, free objects are chained through their obj member
+struct wrapped_Object_pool {
+	const char *bound_name;
+
+	wrapped_Object *head;
+	size_t size, max_size;
+
+	uint64_t hits, misses;
+};
+
+static inline wrapped_Object *new_wrapped_Object(PyTypeObject *type, wrapped_Object_pool *pool) {
+	wrapped_Object *w = pool->head;
+	if (w) {
+		pool->head = (wrapped_Object *)w->obj;
+		--pool->size;
+		++pool->hits;
+		return (wrapped_Object *)PyObject_Init((PyObject *)w, type);
+	}
+	++pool->misses;
+	return PyObject_New(wrapped_Object, type);
+}
+
+static void dealloc_wrapped_Object(PyObject *self, wrapped_Object_pool *pool) {
 	wrapped_Object *w = cast_to_wrapped_Object_unsafe(self);
 
 	if (w->on_delete)
 		w->on_delete(w->obj);
 
-	PyObject_Del(self); // tp_free should be used but PyType_GetSlot is 3.4+
+	if (pool->size < pool->max_size) {
+		w->obj = pool->head;
+		pool->head = w;
+		++pool->size;
+	} else {
+		PyObject_Del(self); // tp_free should be used but PyType_GetSlot is 3.4+
+	}
 
 	_DecModuleRefCount();
 }
 \n'''
 
-		self._source += '''\
+		self._internal_header += '''\
 static inline bool CheckArgsTuple(PyObject *args) {
 	if (!PyTuple_Check(args)) {
 		PyErr_SetString(PyExc_RuntimeError, "invalid arguments object (expected a tuple)");
@@ -483,7 +714,148 @@ static inline bool CheckArgsTuple(PyObject *args) {
 }
 \n'''
 
-		self._source += '''\
+		if self.buffer_protocol:
+			self._internal_header += '''\
+// check that a one-dimensional buffer holds values of a scalar type, formats of the same kind and size match (eg. 'l' and 'q' on LP64)
+static bool _buffer_format_matches(const Py_buffer &view, char code, size_t size) {
+	if (view.ndim != 1 || view.itemsize != (Py_ssize_t)size)
+		return false;
+
+	const char *format = view.format ? view.format : "B";
+	const uint16_t endian_probe = 1;
+	if (*format == '@' || *format == '=' || (*format == '<' && *(const char *)&endian_probe == 1))
+		++format;
+	if (format[0] == 0 || format[1] != 0)
+		return false;
+
+	static const char *kinds[] = {"bhilqn", "BHILQN", "fd"};
+	for (const char *kind : kinds)
+		if (strchr(kind, code) && strchr(kind, format[0]))
+			return true;
+	return false;
+}
+
+// buffer view released when going out of scope
+class PythonBufferView {
+public:
+	~PythonBufferView() {
+		if (valid)
+			PyBuffer_Release(&view);
+	}
+
+	// get a view of a one-dimensional contiguous buffer of values of a scalar type
+	bool Get(PyObject *o, char code, size_t size, int flags = 0) {
+		if (!PyObject_CheckBuffer(o))
+			return false;
+		if (PyObject_GetBuffer(o, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT | flags) != 0) {
+			PyErr_Clear();
+			return false;
+		}
+		valid = true;
+		return _buffer_format_matches(view, code, size);
+	}
+
+	Py_buffer view;
+	bool valid = false;
+};
+\n'''
+
+		self._internal_header += '''\
+// build an array.array from raw values, no value is boxed
+static inline PyObject *_new_array_from_values(const char *typecode, const void *data, size_t size) {
+	static PyObject *array_type = NULL;
+	if (!array_type) {
+		PyObject *array_module = PyImport_ImportModule("array");
+		if (!array_module)
+			return NULL;
+		array_type = PyObject_GetAttrString(array_module, "array");
+		Py_DECREF(array_module);
+		if (!array_type)
+			return NULL;
+	}
+
+	PyObject *bytes = PyBytes_FromStringAndSize((const char *)data, (Py_ssize_t)size);
+	if (!bytes)
+		return NULL;
+	PyObject *out = PyObject_CallFunction(array_type, "sO", typecode, bytes);
+	Py_DECREF(bytes);
+	return out;
+}
+
+// argument of a vectorized function, a batch of values read from a sequence%s or a single value
+template <typename T> class PythonVectorizedArg {
+public:
+	bool Set(PyObject *o, bool (*check)(PyObject *), void (*to_c)(PyObject *, void *), char code) {
+		if (check(o)) {
+			values.resize(1);
+			to_c(o, &values[0]);
+			data = values.data();
+			size = 1;
+			return true;
+		}
+%s
+		// lists and tuples are accessed directly, other sequences are converted to a list first
+		PyObject *fast = PySequence_Fast(o, "expected a sequence");
+		if (!fast) {
+			PyErr_Clear();
+			return false;
+		}
+
+		bool is_list = PyList_Check(fast) ? true : false;
+		size = (size_t)(is_list ? PyList_Size(fast) : PyTuple_Size(fast));
+		values.resize(size);
+		for (size_t i = 0; i < size; ++i) {
+			PyObject *itm = is_list ? PyList_GetItem(fast, i) : PyTuple_GetItem(fast, i); // borrowed
+			if (!check(itm)) {
+				Py_DECREF(fast);
+				return false;
+			}
+			to_c(itm, &values[i]);
+		}
+		Py_DECREF(fast);
+
+		data = values.data();
+		return true;
+	}
+
+	// batches of a single value are broadcast
+	T operator[](size_t i) const { return data[size == 1 ? 0 : i]; }
+
+	size_t size = 0;
+
+private:
+	const T *data = nullptr;
+	std::vector<T> values;
+%s};
+\n''' % ((', a buffer', '''
+		// contiguous buffer of matching scalar values, read in place
+		if (view.Get(o, code, sizeof(T))) {
+			data = (const T *)view.view.buf;
+			size = (size_t)(view.view.len / view.view.itemsize);
+			return true;
+		}
+''', '	PythonBufferView view;\n') if self.buffer_protocol else ('', '', ''))
+
+		self._internal_header += '''\
+// release the GIL until Restore is called or the object goes out of scope (eg. when the native call throws)
+class PythonAllowThreads {
+public:
+	PythonAllowThreads() : state(PyEval_SaveThread()) {}
+	~PythonAllowThreads() { Restore(); }
+
+	void Restore() {
+		if (state) {
+			PyEval_RestoreThread(state);
+			state = NULL;
+		}
+	}
+
+private:
+	PyThreadState *state;
+};
+\n'''
+
+		self._internal_header += '''\
 class PythonValueRef {
 public:
 	PythonValueRef(PyObject *o_) : o(o_) { Py_XINCREF(o); }
@@ -496,7 +868,7 @@ private:
 };
 \n'''
 
-		self._source += self.get_binding_api_declaration()
+		self._internal_header += self.get_binding_api_declaration()
 		self._header += self.get_binding_api_declaration()
 
 	#
@@ -519,17 +891,50 @@ private:
 		return 'arg_pyobj[%d]' % i
 
 	#
-	def open_proxy(self, name, max_arg_count, ctx):
-		out = ''
+	def prepare_proxy(self, name, arg_counts, ctx):
+		if self.fastcall and ctx in ['function', 'method', 'static_method']:
+			if arg_counts == [0]:
+				self.__proxy_call_flags[name] = 'METH_NOARGS'
+			elif arg_counts == [1]:
+				self.__proxy_call_flags[name] = 'METH_O'
+			else:
+				self.__proxy_call_flags[name] = 'METH_FASTCALL'
+
+	def get_proxy_call_flags(self, name):
+		"""Return the calling convention of a function or method proxy."""
+		return self.__proxy_call_flags.get(name, 'METH_VARARGS')
+
+	def get_proxy_signature(self, name, ctx):
+		flags = self.get_proxy_call_flags(name)
+
+		if flags == 'METH_NOARGS':
+			return 'PyObject *%s(PyObject *self, PyObject *)' % name
+		elif flags == 'METH_O':
+			return 'PyObject *%s(PyObject *self, PyObject *arg)' % name
+		elif flags == 'METH_FASTCALL':
+			return 'PyObject *%s(PyObject *self, PyObject *const *args, Py_ssize_t nargs)' % name
 
 		if ctx == 'getter':
-			out += 'static PyObject *%s(PyObject *self, void *closure) {\n' % name
+			return 'PyObject *%s(PyObject *self, void *closure)' % name
 		elif ctx == 'setter':
-			out += 'static int %s(PyObject *self, PyObject *val, void *closure) {\n' % name
+			return 'int %s(PyObject *self, PyObject *val, void *closure)' % name
 		elif ctx in ['arithmetic_op', 'inplace_arithmetic_op', 'comparison_op']:
-			out += 'static PyObject *%s(PyObject *o1, PyObject *o2) {\n' % name
-		else:
-			out += 'static PyObject *%s(PyObject *self, PyObject *args) {\n' % name
+			return 'PyObject *%s(PyObject *o1, PyObject *o2)' % name
+		return 'PyObject *%s(PyObject *self, PyObject *args)' % name
+
+	def open_proxy(self, name, max_arg_count, ctx):
+		out = '%s%s {\n' % (self.get_shared_linkage(), self.get_proxy_signature(name, ctx))
+
+		flags = self.get_proxy_call_flags(name)
+
+		if flags == 'METH_NOARGS':
+			out += '	const Py_ssize_t arg_count = 0;\n\n'
+		elif flags == 'METH_O':
+			out += '	const Py_ssize_t arg_count = 1;\n	PyObject *arg_pyobj[1] = {arg};\n\n'
+		elif flags == 'METH_FASTCALL':
+			out += '	Py_ssize_t arg_count = nargs;\n'
+			out += '	PyObject *const *arg_pyobj = args;\n\n'
+		elif ctx not in ['getter', 'setter', 'arithmetic_op', 'inplace_arithmetic_op', 'comparison_op']:
 			out += '''	if (!CheckArgsTuple(args))
 		return NULL;
 	Py_ssize_t arg_count = PyTuple_Size(args);
@@ -551,6 +956,9 @@ private:
 			return '}\n'
 		return '	return NULL;\n}\n'
 
+	def get_overload_cache_key(self, idx, ctx):
+		return '(uintptr_t)Py_TYPE(%s)' % self.get_var(idx, ctx)
+
 	def proxy_call_error(self, msg, ctx):
 		out = self.set_error('runtime', msg)
 
@@ -612,6 +1020,81 @@ private:
 		src += 'Py_INCREF(%s);\n' % out_var
 		return src
 
+	def _is_stored_inline(self, conv):
+		return not conv._non_copyable and (conv._inline or self.inline_copies)
+
+	def _prepare_c_call(self, features):
+		if 'nogil' in features:
+			return 'PythonAllowThreads _allow_threads;\n'
+		return ''
+
+	def _clean_c_call(self, features):
+		if 'nogil' in features:
+			return '_allow_threads.Restore();\n'
+		return ''
+
+	def _bind_vectorized_function(self, bound_name, proxy_name, proto, expr_eval):
+		desc = 'function %s' % bound_name
+		arg_count = len(proto['args'])
+		rval_conv = proto['rval']['conv']
+
+		# results are written to an optional output buffer passed after the arguments
+		with_out = rval_conv is not None and self.buffer_protocol
+		arg_counts = [arg_count, arg_count + 1] if with_out else [arg_count]
+
+		self.prepare_proxy(proxy_name, arg_counts, 'function')
+		if len(self._shard_sources) > 0:
+			self._internal_header += self.get_proxy_signature(proxy_name, 'function') + ';\n'
+
+		self._source += '// %s, maps a function over batches of arguments\n' % desc
+		self._source += self.open_proxy(proxy_name, max(arg_counts), 'function')
+
+		self._source += '	if (%s) {\n' % ' && '.join(['arg_count != %d' % count for count in arg_counts])
+		self._source += self.proxy_call_error('incorrect number of arguments to %s, expected %s' % (desc, ' or '.join([str(count) for count in arg_counts])), 'function')
+		self._source += '	}\n\n'
+
+		for idx, arg in enumerate(proto['args']):
+			conv = arg['conv']
+			self._source += '	PythonVectorizedArg<%s> arg%d;\n' % (conv.ctype, idx)
+			self._source += "	if (!arg%d.Set(arg_pyobj[%d], %s, %s, '%s')) {\n" % (idx, idx, conv.check_func, conv.to_c_func, buffer_format_codes[repr(conv.ctype)])
+			self._source += self.proxy_call_error('incorrect type for argument %d to %s, expected %s or a batch of %s values' % (idx + 1, desc, conv.bound_name, conv.bound_name), 'function')
+			self._source += '	}\n'
+		self._source += '\n'
+
+		self._source += self._vectorized_batch_size(proto, desc)
+
+		if rval_conv is None:
+			self._source += self._vectorized_call(proto, expr_eval)
+			self._source += '	Py_RETURN_NONE;\n}\n\n'
+			return True
+
+		rval_ctype = rval_conv.ctype
+		code = buffer_format_codes[repr(rval_ctype)]
+
+		if with_out:
+			self._source += '''\
+	if (arg_count > %d) {
+		PyObject *out = arg_pyobj[%d];
+
+		PythonBufferView out_view;
+		if (!out_view.Get(out, '%s', sizeof(%s), PyBUF_WRITABLE) || (size_t)(out_view.view.len / out_view.view.itemsize) != size) {
+%s		}
+
+		%s *rvals = (%s *)out_view.view.buf;
+''' % (arg_count, arg_count, code, rval_ctype, self.proxy_call_error('incorrect output to %s, expected a writable buffer of %s values of the batch size' % (desc, rval_conv.bound_name), 'function'), rval_ctype, rval_ctype)
+			self._source += self._vectorized_call(proto, expr_eval)
+			self._source += '''
+		Py_INCREF(out);
+		return out;
+	}
+
+'''
+
+		self._source += '	std::vector<%s> rvals(size);\n' % rval_ctype
+		self._source += self._vectorized_call(proto, expr_eval)
+		self._source += '	return _new_array_from_values(%s, rvals.data(), size * sizeof(%s));\n}\n\n' % (get_array_typecode(code), rval_ctype)
+		return True
+
 	#
 	def _get_rbind_call_custom_args(self):
 		return 'PyObject *func'
@@ -637,7 +1120,7 @@ PyObject *rbind_rval = PyObject_CallObject(func, rbind_args);
 		for f in self._bound_functions:
 			bound_name = f['bound_name']
 
-			protos = self._build_protos(f['protos'])
+			protos = self._get_prepared_protos(f)
 			protos_docstrings = []
 
 			for proto in protos:
@@ -653,6 +1136,35 @@ PyObject *rbind_rval = PyObject_CallObject(func, rbind_args);
 
 			docstrings[bound_name] = '\\n'.join(protos_docstrings) + '\\n\\n' + self.get_symbol_doc(bound_name)
 
+		# wrapper object pools, their functions are only added to the module when the pools are enabled
+		if self.object_pool_size > 0:
+			self._source += '''\
+static PyObject *py_object_pool_stats(PyObject *self, PyObject *args) {
+	PyObject *stats = PyDict_New();
+	for (size_t i = 0; i < %s(); ++i) {
+		%s pool = %s(i);
+		PyObject *pool_stats = Py_BuildValue("{s:n,s:n,s:K,s:K}", "size", (Py_ssize_t)pool.size, "max_size", (Py_ssize_t)pool.max_size, "hits", (unsigned long long)pool.hits, "misses", (unsigned long long)pool.misses);
+		PyDict_SetItemString(stats, pool.bound_name, pool_stats);
+		Py_DECREF(pool_stats);
+	}
+	return stats;
+}
+
+static PyObject *py_set_object_pool_size(PyObject *self, PyObject *arg) {
+	size_t size = PyLong_AsSize_t(arg);
+	if (PyErr_Occurred())
+		return NULL;
+	%s(size);
+	Py_RETURN_NONE;
+}
+
+static PyObject *py_trim_object_pools(PyObject *self, PyObject *args) {
+	%s();
+	Py_RETURN_NONE;
+}
+\n''' % (gen.apply_api_prefix('get_object_pool_count'), gen.apply_api_prefix('object_pool_stats'), gen.apply_api_prefix('get_object_pool_stats'),
+				gen.apply_api_prefix('set_object_pool_size'), gen.apply_api_prefix('trim_object_pools'))
+
 		# output module functions
 		table_name = '%s_Methods' % self._name
 		self._source += "static PyMethodDef %s[] = {\n" % table_name
@@ -660,7 +1172,13 @@ PyObject *rbind_rval = PyObject_CallObject(func, rbind_args);
 		rows = []
 		for f in self._bound_functions:
 			bound_name = f['bound_name']
-			rows.append('	{"%s", %s, METH_VARARGS, "%s"}' % (bound_name, f['proxy_name'], docstrings[bound_name] if bound_name in docstrings else ''))
+			flags = self.get_proxy_call_flags(f['proxy_name'])
+			proxy = f['proxy_name'] if flags == 'METH_VARARGS' else '(PyCFunction)%s' % f['proxy_name']
+			rows.append('	{"%s", %s, %s, "%s"}' % (bound_name, proxy, flags, docstrings[bound_name] if bound_name in docstrings else ''))
+		if self.object_pool_size > 0:
+			rows.append('	{"object_pool_stats", py_object_pool_stats, METH_NOARGS, "object_pool_stats() -> dict\\n\\nReturn the wrapper object pool statistics of each class."}')
+			rows.append('	{"set_object_pool_size", py_set_object_pool_size, METH_O, "set_object_pool_size(size: int) -> None\\n\\nSet the number of released wrapper objects kept for reuse by each class, 0 disables the pools."}')
+			rows.append('	{"trim_object_pools", py_trim_object_pools, METH_NOARGS, "trim_object_pools() -> None\\n\\nRelease the wrapper objects kept for reuse."}')
 		rows.append('	{NULL, NULL, 0, NULL} /* Sentinel */')
 
 		self._source += ',\n'.join(rows) + '\n'
@@ -671,6 +1189,9 @@ PyObject *rbind_rval = PyObject_CallObject(func, rbind_args);
 		self._source += 'void PyFree_%s(void *) {\n' % self._name
 		self._source += '	// custom free code\n'
 		self._source += self._custom_free_code
+		if self.object_pool_size > 0:
+			self._source += '	// release the pooled wrapper objects\n'
+			self._source += '	%s();\n' % gen.apply_api_prefix('trim_object_pools')
 		self._source += '}\n\n'
 
 	def output_module_definition(self, methods_table):
@@ -761,6 +1282,33 @@ struct %s {
 		out += '// returns the typetag of a Python object, nullptr if not a Fabgen object\n'
 		out += 'uint32_t %s(PyObject *o);\n\n' % gen.apply_api_prefix('get_wrapped_object_type_tag')
 
+		if self.object_pool_size > 0:
+			out += self._get_object_pool_api_declaration()
+
+		return out
+
+	def _get_object_pool_api_declaration(self):
+		out = '''\
+struct %s {
+	const char *bound_name;
+
+	size_t size; // released wrapper objects kept for reuse
+	size_t max_size;
+
+	uint64_t hits; // wrapper objects reused
+	uint64_t misses; // wrapper objects allocated
+};\n
+''' % gen.apply_api_prefix('object_pool_stats')
+
+		out += '// return the number of wrapper object pools (one per bound class)\n'
+		out += 'size_t %s();\n' % gen.apply_api_prefix('get_object_pool_count')
+		out += '// return the statistics of a wrapper object pool\n'
+		out += '%s %s(size_t index);\n' % (gen.apply_api_prefix('object_pool_stats'), gen.apply_api_prefix('get_object_pool_stats'))
+		out += '// set the number of released wrapper objects kept by each pool, 0 disables the pools\n'
+		out += 'void %s(size_t size);\n' % gen.apply_api_prefix('set_object_pool_size')
+		out += '// release the wrapper objects kept by the pools\n'
+		out += 'void %s();\n\n' % gen.apply_api_prefix('trim_object_pools')
+
 		return out
 
 	def output_binding_api(self):
@@ -802,6 +1350,44 @@ uint32_t %s(PyObject *o) {
 	return w ? w->type_tag : 0;
 }\n\n''' % gen.apply_api_prefix('get_wrapped_object_type_tag')
 
+		if self.object_pool_size > 0:
+			self._output_object_pool_api()
+
+	def _output_object_pool_api(self):
+		pools = ['&%s_pool' % type.bound_name for type in self._bound_types if isinstance(type, PythonClassTypeDefaultConverter)]
+
+		self._source += 'static wrapped_Object_pool *__wrapped_Object_pools[] = {%s};\n\n' % ', '.join(pools + ['NULL'])
+
+		self._source += '''\
+static void trim_wrapped_Object_pool(wrapped_Object_pool *pool, size_t size) {
+	while (pool->size > size) {
+		wrapped_Object *w = pool->head;
+		pool->head = (wrapped_Object *)w->obj;
+		--pool->size;
+		PyObject_Del(w);
+	}
+}
+
+size_t %s() { return %d; }
+
+%s %s(size_t index) {
+	const wrapped_Object_pool *pool = __wrapped_Object_pools[index];
+	return {pool->bound_name, pool->size, pool->max_size, pool->hits, pool->misses};
+}
+
+void %s(size_t size) {
+	for (size_t i = 0; i < %d; ++i) {
+		__wrapped_Object_pools[i]->max_size = size;
+		trim_wrapped_Object_pool(__wrapped_Object_pools[i], size);
+	}
+}
+
+void %s() {
+	for (size_t i = 0; i < %d; ++i)
+		trim_wrapped_Object_pool(__wrapped_Object_pools[i], 0);
+}\n\n''' % (gen.apply_api_prefix('get_object_pool_count'), len(pools), gen.apply_api_prefix('object_pool_stats'), gen.apply_api_prefix('get_object_pool_stats'),
+			gen.apply_api_prefix('set_object_pool_size'), len(pools), gen.apply_api_prefix('trim_object_pools'), len(pools))
+
 	def finalize(self):
 		self._source += '// Module definitions starts here.\n\n'
 
@@ -3,7 +3,6 @@
 
 import os
 from os import stat_result
-from pypeg2 import parse
 import json
 import re
 import sys
@@ -56,6 +55,7 @@ def clean_name_with_title(name):
 
 
 class GoTypeConverterCommon(gen.TypeConverter):
+	__slots__ = ('base_type', 'go_to_c_type', 'go_type')
 	def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 		super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 		self.base_type = type
@@ -82,6 +82,7 @@ class GoTypeConverterCommon(gen.TypeConverter):
 
 
 class DummyTypeConverter(gen.TypeConverter):
+	__slots__ = ()
 	def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 		super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 
@@ -102,6 +103,7 @@ class DummyTypeConverter(gen.TypeConverter):
 
 
 class GoPtrTypeConverter(gen.TypeConverter):
+	__slots__ = ()
 	def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 		super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 
@@ -124,6 +126,7 @@ class GoPtrTypeConverter(gen.TypeConverter):
 #
 
 class GoClassTypeDefaultConverter(GoTypeConverterCommon):
+	__slots__ = ()
 	def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 		super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 
@@ -148,6 +151,7 @@ class GoClassTypeDefaultConverter(GoTypeConverterCommon):
 
 
 class GoExternTypeConverter(GoTypeConverterCommon):
+	__slots__ = ('module',)
 	def __init__(self, type, to_c_storage_type, bound_name, module):
 		super().__init__(type, to_c_storage_type, bound_name)
 		self.module = module
@@ -228,7 +232,7 @@ class GoGenerator(gen.FABGen):
 		return ""
 
 	def _bind_proxy(self, name, self_conv, protos, desc, expr_eval, ctx, fixed_arg_count=None):
-		return ""
+		return None  # prototypes are prepared on extraction
 
 	def close_proxy(self, ctx):
 		return ""
@@ -305,13 +309,7 @@ uint32_t %s(void* p) {
 
 	#
 	def get_output(self):
-		return {"wrapper.cpp": self.go_c, "wrapper.h": self.go_h, "bind.go": self.go_bind, "translate_file.json": self.go_translate_file}
-
-	def _get_type(self, name):
-		for type in self._bound_types:
-			if type:
-				return type
-		return None
+		return {"wrapper.cpp": str(self.go_c), "wrapper.h": str(self.go_h), "bind.go": str(self.go_bind), "translate_file.json": self.go_translate_file}
 
 	def _get_conv(self, conv_name):
 		if conv_name in self._FABGen__type_convs:
@@ -319,10 +317,7 @@ uint32_t %s(void* p) {
 		return None
 
 	def _get_conv_from_bound_name(self, bound_name):
-		for name, conv in self._FABGen__type_convs.items():
-			if conv.bound_name == bound_name:
-				return conv
-		return None
+		return self.get_conv_from_bound_name(bound_name)
 
 	def __get_is_type_class_or_pointer_with_class(self, conv):
 		if conv.is_type_class() or \
@@ -1068,7 +1063,7 @@ uint32_t %s(void* p) {
 
 		uid = classname + bound_name if classname else bound_name
 
-		protos = self._build_protos(method["protos"])
+		protos = self._get_prepared_protos(method)
 		for id_proto, proto in enumerate(protos):
 			retval = ""
 
@@ -1156,9 +1151,9 @@ uint32_t %s(void* p) {
 							if self.__get_is_type_class_or_pointer_with_class(arg["conv"]):
 								arg_bound_name = clean_name_with_title(f"new_{arg_bound_name.replace('*', '')}")
 								# find the constructor without arg
-								for arg_conv in self._bound_types:
-									if str(arg_conv.ctype) == str(arg["conv"].ctype) and hasattr(arg_conv, "constructor") and arg_conv.constructor is not None:
-										proto_args = self._build_protos(arg_conv.constructor["protos"])
+								for arg_conv in self.get_bound_types_from_ctype(arg["conv"].ctype):
+									if hasattr(arg_conv, "constructor") and arg_conv.constructor is not None:
+										proto_args = self._get_prepared_protos(arg_conv.constructor)
 										break
 								else:
 									proto_args = None
@@ -1294,7 +1289,7 @@ uint32_t %s(void* p) {
 
 		uid = classname + bound_name if classname else bound_name
 
-		protos = self._build_protos(method["protos"])
+		protos = self._get_prepared_protos(method)
 		for id_proto, proto in enumerate(protos):
 			retval = "void"
 
@@ -1459,12 +1454,11 @@ uint32_t %s(void* p) {
 			if self.__get_is_type_class_or_pointer_with_class(val["conv"]):
 				# find the constructor without arg
 				type_conv = None
-				for arg_conv in self._bound_types:
-					if str(arg_conv.ctype) == str(val["conv"].ctype):
-						type_conv = arg_conv
-						if hasattr(arg_conv, "constructor") and arg_conv.constructor is not None:
-							proto_args = self._build_protos(arg_conv.constructor["protos"])
-							break
+				for arg_conv in self.get_bound_types_from_ctype(val["conv"].ctype):
+					type_conv = arg_conv
+					if hasattr(arg_conv, "constructor") and arg_conv.constructor is not None:
+						proto_args = self._get_prepared_protos(arg_conv.constructor)
+						break
 				else:
 					proto_args = None
 				
@@ -1473,7 +1467,7 @@ uint32_t %s(void* p) {
 					self.bind_constructor(type_conv, [])
 
 		# check all protos
-		protos = self._build_protos(method["protos"])
+		protos = self._get_prepared_protos(method)
 		for proto in protos:
 			# convert arg in to c
 			if len(proto["args"]):
@@ -1570,7 +1564,8 @@ uint32_t %s(void* p) {
 			return go
 
 		# .h
-		go_h = '#pragma once\n' \
+		go_h = gen.OutputBuffer()
+		go_h += '#pragma once\n' \
 				'#ifdef __cplusplus\n'\
 				'extern "C" {\n'\
 				'#endif\n'
@@ -1610,7 +1605,7 @@ uint32_t %s(void* p) {
 				args_boundname = []
 				for arg in args:
 					if len(arg):
-						ctype = parse(arg, gen._CType)
+						ctype = self.parse_ctype(arg)
 						conv = self.select_ctype_conv(ctype)
 						args_boundname.append(self.__get_arg_bound_name_to_c({"conv": conv, "carg": type('carg', (object,), {'ctype':ctype})()}))
 
@@ -1679,7 +1674,8 @@ uint32_t %s(void* p) {
 
 
 		# cpp
-		go_c = '// go wrapper c\n' \
+		go_c = gen.OutputBuffer()
+		go_c += '// go wrapper c\n' \
 				'#include \"wrapper.h\"\n' \
 				'#include <memory>\n'
 				
@@ -1767,7 +1763,8 @@ uint32_t %s(void* p) {
 		self.go_c = go_c
 
 		# .go
-		go_bind = f"package {clean_name_with_title(self._name)}\n" \
+		go_bind = gen.OutputBuffer()
+		go_bind += f"package {clean_name_with_title(self._name)}\n" \
 				'// #include "wrapper.h"\n' \
 				'// #cgo CFLAGS: -I . -Wall -Wno-unused-variable -Wno-unused-function -O3\n' \
 				'// #cgo CXXFLAGS: -std=c++14 -O3\n'
@@ -1938,7 +1935,7 @@ uint32_t %s(void* p) {
 			if is_constructor:
 				name_go = "new_" + name_go
 
-			protos = self._build_protos(method["protos"])
+			protos = self._get_prepared_protos(method)
 			return_protos_name = []
 			for id_proto, proto in enumerate(protos):
 				method_name_go = f"{clean_name_with_title(name_go)}"
@@ -2000,7 +1997,6 @@ uint32_t %s(void* p) {
 		# enum
 		for bound_name, enum in self._enums.items():
 			go_translate_file[bound_name] = bound_name
-			go_bind += "var (\n"
 			for id, name in enumerate(enum.keys()):
 				go_translate_file[name] = clean_name(name)
 		
@@ -6,6 +6,7 @@ import gen
 
 #
 class LuaTypeConverterCommon(gen.TypeConverter):
+	__slots__ = ()
 	def get_type_api(self, module_name):
 		out = '// type API for %s\n' % self.ctype
 		if self.c_storage_class:
@@ -16,6 +17,11 @@ class LuaTypeConverterCommon(gen.TypeConverter):
 		else:
 			out += 'void %s(lua_State *L, int idx, void *obj);\n' % self.to_c_func
 		out += 'int %s(lua_State *L, void *obj, OwnershipPolicy);\n' % self.from_c_func
+		if self.has_check_to_c():
+			if self.c_storage_class:
+				out += 'bool %s(lua_State *L, int idx, void *obj, %s &storage);\n' % (self.check_to_c_func, self.c_storage_class)
+			else:
+				out += 'bool %s(lua_State *L, int idx, void *obj);\n' % self.check_to_c_func
 		out += '\n'
 		return out
 
@@ -35,6 +41,12 @@ class LuaTypeConverterCommon(gen.TypeConverter):
 	def check_call(self, in_var):
 		return "%s(L, %s)" % (self.check_func, in_var)
 
+	def check_to_c_call(self, in_var, out_var_p):
+		if self.c_storage_class:
+			c_storage_var = 'storage_%s' % out_var_p.replace('&', '_')
+			return '%s %s;\n' % (self.c_storage_class, c_storage_var), '%s(L, %s, (void *)%s, %s)' % (self.check_to_c_func, in_var, out_var_p, c_storage_var)
+		return '', '%s(L, %s, (void *)%s)' % (self.check_to_c_func, in_var, out_var_p)
+
 
 #
 def build_index_map(name, values, filter, gen_output):
@@ -48,9 +60,13 @@ def build_index_map(name, values, filter, gen_output):
 
 #
 class LuaClassTypeConverter(LuaTypeConverterCommon):
+	__slots__ = ()
 	def is_type_class(self):
 		return True
 
+	def has_check_to_c(self):
+		return True
+
 	def get_type_glue(self, gen, module_name):
 		out = ''
 
@@ -297,7 +313,7 @@ static int __debugger_extand_%s_class(lua_State *L) {\n' % self.bound_name
 		out += '	{NULL, NULL}};\n\n'
 
 		# type registration
-		out += 'static void register_%s(lua_State *L) {\n' % self.bound_name
+		out += '%svoid register_%s(lua_State *L) {\n' % (gen.get_shared_linkage(), self.bound_name)
 		if self._inline:
 			out += '	assert(sizeof(%s) <= 16);\n\n' % self.ctype
 		out += '''\
@@ -331,6 +347,14 @@ static int __debugger_extand_%s_class(lua_State *L) {\n' % self.bound_name
 	*(void **)obj = _type_tag_cast(w->obj, w->type_tag, %s);
 }\n''' % (self.to_c_func, self.type_tag)
 
+		# check and convert to C
+		out += '''bool %s(lua_State *L, int idx, void *obj) {
+	wrapped_Object *w = cast_to_wrapped_Object_safe(L, idx);
+	if (!w)
+		return false;
+	return _type_tag_try_cast(w->obj, w->type_tag, %s, (void **)obj);
+}\n''' % (self.check_to_c_func, self.type_tag)
+
 		# from C
 		is_inline = False
 
@@ -372,6 +396,9 @@ static void delete_inline_%s(void *o) {
 
 		return out
 
+	def get_type_internal_api(self, module_name):
+		return 'void register_%s(lua_State *L);\n\n' % self.bound_name
+
 	def finalize_type(self):
 		out = ''
 		return out
@@ -379,6 +406,7 @@ static void delete_inline_%s(void *o) {
 
 #
 class LuaPtrTypeConverter(LuaTypeConverterCommon):
+	__slots__ = ()
 	def get_type_glue(self, gen, module_name):
 		out = '''bool %s(lua_State *L, int idx) {
 	if (lua_isinteger(L, idx))
@@ -402,6 +430,7 @@ class LuaPtrTypeConverter(LuaTypeConverterCommon):
 
 #
 class LuaExternTypeConverter(LuaTypeConverterCommon):
+	__slots__ = ('module',)
 	def __init__(self, type, to_c_storage_type, bound_name, module):
 		super().__init__(type, to_c_storage_type, bound_name)
 		self.module = module
@@ -425,6 +454,19 @@ class LuaExternTypeConverter(LuaTypeConverterCommon):
 	def check_call(self, in_var):
 		return "(*%s)(L, %s)" % (self.check_func, in_var)
 
+	def get_type_internal_api(self, module_name):
+		out = '// extern type API for %s\n' % self.ctype
+		if self.c_storage_class:
+			out += 'struct %s;\n' % self.c_storage_class
+		out += 'extern bool (*%s)(lua_State *L, int idx);\n' % self.check_func
+		if self.c_storage_class:
+			out += 'extern void (*%s)(lua_State *L, int idx, void *obj, %s &storage);\n' % (self.to_c_func, self.c_storage_class)
+		else:
+			out += 'extern void (*%s)(lua_State *L, int idx, void *obj);\n' % self.to_c_func
+		out += 'extern int (*%s)(lua_State *L, void *obj, OwnershipPolicy);\n' % self.from_c_func
+		out += '\n'
+		return out
+
 	def get_type_glue(self, gen, module_name):
 		out = '// extern type API for %s\n' % self.ctype
 		if self.c_storage_class:
@@ -445,6 +487,8 @@ class LuaGenerator(gen.FABGen):
 	default_class_converter = LuaClassTypeConverter
 	default_extern_converter = LuaExternTypeConverter
 
+	supports_shards = True
+
 	def __init__(self):
 		super().__init__()
 		self.check_self_type_in_ops = True
@@ -455,7 +499,9 @@ class LuaGenerator(gen.FABGen):
 	def output_includes(self):
 		super().output_includes()
 
-		self._source += '''extern "C" {
+		self.add_include('vector', True)
+
+		self._internal_header += '''extern "C" {
 #include "lauxlib.h"
 #include "lua.h"
 }
@@ -466,7 +512,7 @@ class LuaGenerator(gen.FABGen):
 
 		self._header += 'struct lua_State;\n\n'
 
-		self._source += '''\
+		self._internal_header += '''\
 typedef struct {
 	uint32_t magic_u32; // wrapped_Object marker
 	uint32_t type_tag; // wrapped pointer type tag
@@ -495,6 +541,17 @@ static wrapped_Object *cast_to_wrapped_Object_safe(lua_State *L, int idx) {
 
 static wrapped_Object *cast_to_wrapped_Object_unsafe(lua_State *L, int idx) { return (wrapped_Object *)lua_touserdata(L, idx); }
 
+// identify the type of a value on the stack, the type tag of wrapped objects or the Lua type of other values
+static inline uintptr_t get_overload_cache_key(lua_State *L, int idx) {
+	if (wrapped_Object *w = cast_to_wrapped_Object_safe(L, idx))
+		return w->type_tag;
+	int type = lua_type(L, idx);
+	// integers and numeric strings pass checks other numbers and strings fail (lua_isinteger, lua_isnumber)
+	if ((type == LUA_TNUMBER && lua_isinteger(L, idx)) || (type == LUA_TSTRING && lua_isnumber(L, idx)))
+		return (uintptr_t)type | 0x100;
+	return (uintptr_t)type;
+}
+
 static int wrapped_Object_gc(lua_State *L) {
 	wrapped_Object *w = cast_to_wrapped_Object_unsafe(L, 1);
 
@@ -505,7 +562,7 @@ static int wrapped_Object_gc(lua_State *L) {
 }
 \n'''
 
-		self._source += '''
+		self._internal_header += '''
 // helper class to store a reference to an Lua value on the stack
 class LuaValueRef {
 public:
@@ -526,7 +583,46 @@ private:
 };
 \n'''
 
-		self._source += self.get_binding_api_declaration()
+		self._internal_header += '''\
+// argument of a vectorized function, a batch of values read from a table or a single value
+template <typename T> class LuaVectorizedArg {
+public:
+	bool Set(lua_State *L, int idx, bool (*check)(lua_State *, int), void (*to_c)(lua_State *, int, void *)) {
+		if (check(L, idx)) {
+			values.resize(1);
+			to_c(L, idx, &values[0]);
+			size = 1;
+			return true;
+		}
+
+		if (!lua_istable(L, idx))
+			return false;
+
+		size = lua_rawlen(L, idx);
+		values.resize(size);
+		for (size_t i = 0; i < size; ++i) {
+			lua_rawgeti(L, idx, lua_Integer(i + 1));
+			bool valid = check(L, -1);
+			if (valid)
+				to_c(L, -1, &values[i]);
+			lua_pop(L, 1);
+			if (!valid)
+				return false;
+		}
+		return true;
+	}
+
+	// batches of a single value are broadcast
+	T operator[](size_t i) const { return values[size == 1 ? 0 : i]; }
+
+	size_t size{0};
+
+private:
+	std::vector<T> values;
+};
+\n'''
+
+		self._internal_header += self.get_binding_api_declaration()
 		self._header += self.get_binding_api_declaration()
 
 	#
@@ -546,8 +642,11 @@ private:
 		return str(i)
 
 	#
+	def get_proxy_signature(self, name, ctx):
+		return 'int %s(lua_State *L)' % name
+
 	def open_proxy(self, name, max_arg_count, ctx):
-		out = 'static int %s(lua_State *L) {\n' % name
+		out = '%s%s {\n' % (self.get_shared_linkage(), self.get_proxy_signature(name, ctx))
 		if ctx in ['method']:
 			out += '	int arg_count = lua_gettop(L) - 1, rval_count = 0;\n\n'
 		else:
@@ -559,9 +658,64 @@ private:
 	def close_proxy(self, ctx):
 		return '	return rval_count;\n}\n'
 
+	def get_overload_cache_key(self, idx, ctx):
+		return 'get_overload_cache_key(L, %s)' % self.get_var(idx, ctx)
+
 	def proxy_call_error(self, msg, ctx):
 		return self.set_error('runtime', msg)
 
+	def _bind_vectorized_function(self, bound_name, proxy_name, proto, expr_eval):
+		desc = 'function %s' % bound_name
+		arg_count = len(proto['args'])
+		rval_conv = proto['rval']['conv']
+
+		# results are written to an optional output table passed after the arguments
+		arg_counts = [arg_count, arg_count + 1] if rval_conv is not None else [arg_count]
+
+		if len(self._shard_sources) > 0:
+			self._internal_header += self.get_proxy_signature(proxy_name, 'function') + ';\n'
+
+		self._source += '// %s, maps a function over batches of arguments\n' % desc
+		self._source += self.open_proxy(proxy_name, max(arg_counts), 'function')
+
+		self._source += '	if (%s) {\n' % ' && '.join(['arg_count != %d' % count for count in arg_counts])
+		self._source += self.proxy_call_error('incorrect number of arguments to %s, expected %s' % (desc, ' or '.join([str(count) for count in arg_counts])), 'function')
+		self._source += '	}\n\n'
+
+		for idx, arg in enumerate(proto['args']):
+			conv = arg['conv']
+			self._source += '	LuaVectorizedArg<%s> arg%d;\n' % (conv.ctype, idx)
+			self._source += '	if (!arg%d.Set(L, %d, %s, %s)) {\n' % (idx, idx + 1, conv.check_func, conv.to_c_func)
+			self._source += self.proxy_call_error('incorrect type for argument %d to %s, expected %s or a table of %s values' % (idx + 1, desc, conv.bound_name, conv.bound_name), 'function')
+			self._source += '	}\n'
+		self._source += '\n'
+
+		self._source += self._vectorized_batch_size(proto, desc)
+
+		if rval_conv is None:
+			self._source += self._vectorized_call(proto, expr_eval)
+			self._source += '	return 0;\n}\n\n'
+			return True
+
+		self._source += '	std::vector<%s> rvals(size);\n' % rval_conv.ctype
+		self._source += self._vectorized_call(proto, expr_eval)
+		self._source += '''
+	if (arg_count > %d) {
+		luaL_checktype(L, %d, LUA_TTABLE);
+		lua_pushvalue(L, %d);
+	} else {
+		lua_createtable(L, (int)size, 0);
+	}
+
+	for (size_t i = 0; i < size; ++i) {
+		%s(L, &rvals[i], Copy);
+		lua_rawseti(L, -2, lua_Integer(i + 1));
+	}
+	return 1;
+}
+\n''' % (arg_count, arg_count + 1, arg_count + 1, rval_conv.from_c_func)
+		return True
+
 	# function call return values
 	def return_void_from_c(self):
 		return 'return 0;'
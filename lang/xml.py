@@ -12,6 +12,7 @@ import gen
 
 
 class DummyTypeConverter(gen.TypeConverter):
+	__slots__ = ()
 	def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 		super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 
@@ -32,6 +33,7 @@ class DummyTypeConverter(gen.TypeConverter):
 
 
 class DummyExternTypeConverter(gen.TypeConverter):
+	__slots__ = ('module',)
 	def __init__(self, type, to_c_storage_type=None, bound_name=None, module=None):
 		super().__init__(type, to_c_storage_type, bound_name, None, None)
 
@@ -116,7 +118,7 @@ class XMLGenerator(gen.FABGen):
 		return ''
 
 	def _bind_proxy(self, name, self_conv, protos, desc, expr_eval, ctx, fixed_arg_count=None):
-		return ''
+		return None  # prototypes are prepared on extraction
 
 	def close_proxy(self, ctx):
 		return ''
@@ -141,7 +143,7 @@ class XMLGenerator(gen.FABGen):
 
 	#
 	def get_output(self):
-		return {'api.xml': self.xml}
+		return {'api.xml': str(self.xml)}
 
 	def __extract_method(self, classname, method, static=False, name=None, bound_name=None, is_global=False):
 		xml = ""
@@ -153,7 +155,7 @@ class XMLGenerator(gen.FABGen):
 
 		uid = classname + '_' + bound_name if classname else bound_name
 
-		protos = self._build_protos(method['protos'])
+		protos = self._get_prepared_protos(method)
 		for proto in protos:
 			retval = 'void'
 
@@ -203,7 +205,8 @@ class XMLGenerator(gen.FABGen):
 	def finalize(self):
 		super().finalize()
 		
-		xml = '<?xml version="1.0" ?>\n<api>\n'
+		xml = gen.OutputBuffer()
+		xml += '<?xml version="1.0" ?>\n<api>\n'
 		for conv in self._bound_types:
 			if conv.nobind:
 				continue
@@ -1,6 +1,10 @@
 # FABGen - The FABulous binding Generator for CPython and Lua
 #	Copyright (C) 2018 Emmanuel Julien
 
+import gen as gen_module
+
+
+@gen_module.binding_helper
 def bind_defaults(gen):
 	if gen.get_language() == 'CPython':
 		import lib.cpython.std
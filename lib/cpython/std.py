@@ -6,28 +6,43 @@ import lang.cpython
 
 def bind_std(gen):
 	class PyObjectPtrTypeConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return true; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *(void **)obj = o; }\n' % self.to_c_func +\
-			'PyObject *%s(void *o, OwnershipPolicy) { return *(PyObject **)o; }\n' % self.from_c_func
+			'PyObject *%s(void *o, OwnershipPolicy) { return *(PyObject **)o; }\n' % self.from_c_func +\
+			'bool %s(PyObject *o, void *obj) { *(void **)obj = o; return true; }\n' % self.check_to_c_func
 
 	gen.bind_type(PyObjectPtrTypeConverter('PyObject *'))
 
 	gen.add_include('cstdint', True)
 
 	class PythonBoolConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyBool_Check(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = o == Py_True; }\n' % (self.to_c_func, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyBool_FromLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyBool_FromLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyBool_Check(o)) return false; *((%s*)obj) = o == Py_True; return true; }\n' % (self.check_to_c_func, self.ctype)
 
 	gen.bind_type(PythonBoolConverter('bool'))
 
 	class PythonIntConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyLong_CheckExact(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = (%s)PyLong_AsLong(o); }\n' % (self.to_c_func, self.ctype, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyLong_CheckExact(o)) return false; *((%s*)obj) = (%s)PyLong_AsLong(o); return true; }\n' % (self.check_to_c_func, self.ctype, self.ctype)
 
 	gen.bind_type(PythonIntConverter('char'))
 	gen.bind_type(PythonIntConverter('short'))
@@ -40,10 +55,15 @@ def bind_std(gen):
 	gen.bind_type(PythonIntConverter('char32_t'))
 
 	class PythonUnsignedIntConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyLong_CheckExact(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = (%s)PyLong_AsUnsignedLong(o); }\n' % (self.to_c_func, self.ctype, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromUnsignedLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromUnsignedLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyLong_CheckExact(o)) return false; *((%s*)obj) = (%s)PyLong_AsUnsignedLong(o); return true; }\n' % (self.check_to_c_func, self.ctype, self.ctype)
 
 	gen.bind_type(PythonUnsignedIntConverter('unsigned char'))
 	gen.bind_type(PythonUnsignedIntConverter('unsigned short'))
@@ -54,60 +74,141 @@ def bind_std(gen):
 	gen.bind_type(PythonUnsignedIntConverter('uint32_t'))
 
 	class PythonInt64Converter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyLong_CheckExact(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = PyLong_AsLongLong(o); }\n' % (self.to_c_func, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromLongLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromLongLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyLong_CheckExact(o)) return false; *((%s*)obj) = PyLong_AsLongLong(o); return true; }\n' % (self.check_to_c_func, self.ctype)
 
 	gen.bind_type(PythonInt64Converter('int64_t'))
 
 	class PythonUnsignedInt64Converter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyLong_CheckExact(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = PyLong_AsUnsignedLongLong(o); }\n' % (self.to_c_func, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromUnsignedLongLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromUnsignedLongLong(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyLong_CheckExact(o)) return false; *((%s*)obj) = PyLong_AsUnsignedLongLong(o); return true; }\n' % (self.check_to_c_func, self.ctype)
 
 	gen.bind_type(PythonUnsignedInt64Converter('uint64_t'))
 
 	class PythonVoidPtrConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyLong_CheckExact(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = (%s)PyLong_AsVoidPtr(o); }\n' % (self.to_c_func, self.ctype, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromVoidPtr((void *)(*((%s*)obj))); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromVoidPtr((void *)(*((%s*)obj))); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyLong_CheckExact(o)) return false; *((%s*)obj) = (%s)PyLong_AsVoidPtr(o); return true; }\n' % (self.check_to_c_func, self.ctype, self.ctype)
 
 	gen.bind_type(PythonVoidPtrConverter('intptr_t'))
 
 	class PythonSize_tConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyLong_CheckExact(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = PyLong_AsSize_t(o); }\n' % (self.to_c_func, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromSize_t(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyLong_FromSize_t(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyLong_CheckExact(o)) return false; *((%s*)obj) = PyLong_AsSize_t(o); return true; }\n' % (self.check_to_c_func, self.ctype)
 
 	gen.bind_type(PythonSize_tConverter('size_t'))
 
 	class PythonFloatConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(PyObject *o) { return PyFloat_Check(o) || PyLong_Check(o) ? true : false; }\n' % self.check_func +\
 			'void %s(PyObject *o, void *obj) { *((%s*)obj) = (%s)PyFloat_AsDouble(o); }\n' % (self.to_c_func, self.ctype, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyFloat_FromDouble(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyFloat_FromDouble(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(PyObject *o, void *obj) { if (!PyFloat_Check(o) && !PyLong_Check(o)) return false; *((%s*)obj) = (%s)PyFloat_AsDouble(o); return true; }\n' % (self.check_to_c_func, self.ctype, self.ctype)
 
 	gen.bind_type(PythonFloatConverter('float'))
 	gen.bind_type(PythonFloatConverter('double'))
 
 	class PythonConstCharPtrConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
 		def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None):
 			super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, True)
 
+		def has_check_to_c(self):
+			return True
+
+		def get_c_storage_class_definition(self):
+			return 'struct %s { std::string s; };\n' % self.c_storage_class
+
 		def get_type_glue(self, gen, module_name):
-			return 'struct %s { std::string s; };\n' % self.c_storage_class +\
-			'bool %s(PyObject *o) { return PyUnicode_Check(o) ? true : false; }\n' % self.check_func +\
+			return 'bool %s(PyObject *o) { return PyUnicode_Check(o) ? true : false; }\n' % self.check_func +\
 			'''void %s(PyObject *o, void *obj, %s &storage) {
 	PyObject *utf8_pyobj = PyUnicode_AsUTF8String(o);
-	storage.s = PyBytes_AsString(utf8_pyobj);
+	if (utf8_pyobj) {
+		storage.s = PyBytes_AsString(utf8_pyobj);
+		Py_DECREF(utf8_pyobj);
+	} else {
+		PyErr_Clear(); // cannot be encoded, converted to an empty string
+		storage.s.clear();
+	}
 	*((%s*)obj) = storage.s.data();
-	Py_DECREF(utf8_pyobj);
 }
 ''' % (self.to_c_func, self.c_storage_class, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyUnicode_FromString(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype)
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyUnicode_FromString(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'''bool %s(PyObject *o, void *obj, %s &storage) {
+	if (!PyUnicode_Check(o))
+		return false;
+	%s(o, obj, storage);
+	return true;
+}
+''' % (self.check_to_c_func, self.c_storage_class, self.to_c_func)
+
+	class PythonBorrowedConstCharPtrConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def borrows_object(self):
+			return True
+
+		def has_check_to_c(self):
+			return True
+
+		def check_depends_on_value(self, gen):
+			return True  # str which cannot be encoded to UTF-8 are rejected
+
+		def get_type_glue(self, gen, module_name):
+			return 'bool %s(PyObject *o) { return PyUnicode_Check(o) ? true : false; }\n' % self.check_func +\
+			'''void %s(PyObject *o, void *obj) {
+	const char *utf8 = PyUnicode_AsUTF8AndSize(o, NULL); // cached by and alive as long as o
+	if (!utf8)
+		PyErr_Clear(); // cannot be encoded, converted to an empty string
+	*((%s*)obj) = utf8 ? utf8 : "";
+}
+''' % (self.to_c_func, self.ctype) +\
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyUnicode_FromString(*((%s*)obj)); }\n' % (self.from_c_func, self.ctype) +\
+			'''bool %s(PyObject *o, void *obj) {
+	if (!PyUnicode_Check(o))
+		return false;
+	const char *utf8 = PyUnicode_AsUTF8AndSize(o, NULL);
+	if (!utf8) {
+		PyErr_Clear();
+		return false;
+	}
+	*((%s*)obj) = utf8;
+	return true;
+}
+''' % (self.check_to_c_func, self.ctype)
 
-	gen.bind_type(PythonConstCharPtrConverter('const char *'))
+	# borrow the UTF-8 buffer of str arguments where the limited API exposes it, copy it to a storage otherwise
+	if gen.get_limited_api_version() >= 0x030A0000:
+		gen.bind_type(PythonBorrowedConstCharPtrConverter('const char *'))
+	else:
+		gen.bind_type(PythonConstCharPtrConverter('const char *'))
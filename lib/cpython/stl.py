@@ -10,21 +10,52 @@ def bind_stl(gen):
 	gen.add_include('string', True)
 
 	class PythonStringConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
-			return 'bool %s(PyObject *o) { return PyUnicode_Check(o) ? true : false; }\n' % self.check_func +\
-			'''void %s(PyObject *o, void *obj) {
+			if gen.get_limited_api_version() >= 0x030A0000:
+				# copy from the UTF-8 buffer cached by the str object
+				to_c = '''void %s(PyObject *o, void *obj) {
+Py_ssize_t size;
+const char *utf8 = PyUnicode_AsUTF8AndSize(o, &size);
+if (utf8)
+	((%s*)obj)->assign(utf8, size);
+else
+	PyErr_Clear(); // cannot be encoded, converted to an empty string
+}
+''' % (self.to_c_func, self.ctype)
+			else:
+				to_c = '''void %s(PyObject *o, void *obj) {
 PyObject *utf8_pyobj = PyUnicode_AsUTF8String(o);
-*((%s*)obj) = PyBytes_AsString(utf8_pyobj);
-Py_DECREF(utf8_pyobj);
+if (utf8_pyobj) {
+	*((%s*)obj) = PyBytes_AsString(utf8_pyobj);
+	Py_DECREF(utf8_pyobj);
+} else {
+	PyErr_Clear(); // cannot be encoded, converted to an empty string
+	((%s*)obj)->clear();
+}
+}
+''' % (self.to_c_func, self.ctype, self.ctype)
+
+			return 'bool %s(PyObject *o) { return PyUnicode_Check(o) ? true : false; }\n' % self.check_func +\
+			to_c +\
+			'PyObject *%s(void *obj, OwnershipPolicy) { return PyUnicode_FromString(((%s*)obj)->c_str()); }\n' % (self.from_c_func, self.ctype) +\
+			'''bool %s(PyObject *o, void *obj) {
+if (!PyUnicode_Check(o))
+	return false;
+%s(o, obj);
+return true;
 }
-''' % (self.to_c_func, self.ctype) +\
-			'PyObject *%s(void *obj, OwnershipPolicy) { return PyUnicode_FromString(((%s*)obj)->c_str()); }\n' % (self.from_c_func, self.ctype)
+''' % (self.check_to_c_func, self.to_c_func)
 
 	gen.bind_type(PythonStringConverter('std::string'))
 
 
 def bind_function_T(gen, type, bound_name=None):
 	class PythonStdFunctionConverter(lang.cpython.PythonTypeConverterCommon):
+		__slots__ = ()
 		def get_type_glue(self, gen, module_name):
 			func = self.ctype.scoped_typename.parts[-1].template.function
 
@@ -75,39 +106,117 @@ PyObject *%s(void *obj, OwnershipPolicy) {
 
 
 class PySequenceToStdVectorConverter(lang.cpython.PythonTypeConverterCommon):
-	def __init__(self, type, T_conv):
+	__slots__ = ('T_conv', 'as_array')
+	def __init__(self, type, T_conv, as_array=False):
 		native_type = 'std::vector<%s>' % T_conv.ctype
-		super().__init__(type, native_type, None, native_type)
+		# elements pointing into the converted items or requiring a storage are kept alive by the vector storage
+		needs_c_storage_class = T_conv.ctype.is_pointer() or T_conv.borrows_object() or T_conv.c_storage_class is not None
+		super().__init__(type, native_type, None, native_type, needs_c_storage_class)
 		self.T_conv = T_conv
+		self.as_array = as_array  # return vectors of arithmetic types as array.array objects instead of lists
+
+	def check_depends_on_value(self, gen):
+		return repr(self.T_conv.ctype) in lang.cpython.buffer_format_codes and gen.buffer_protocol  # buffers are checked for their format
+
+	def get_c_storage_class_definition(self):
+		if not self.c_storage_class:
+			return ''
+
+		out = 'struct %s {\n' % self.c_storage_class
+		out += '	~%s() { Py_XDECREF(fast); }\n\n' % self.c_storage_class
+		out += '	PyObject *fast = NULL; // list or tuple holding the converted items\n'
+		if self.T_conv.c_storage_class:
+			out += '	std::vector<%s> items;\n' % self.T_conv.c_storage_class
+		out += '};\n'
+		return out
 
 	def get_type_glue(self, gen, module_name):
-		out = 'bool %s(PyObject *o) { return PySequence_Check(o) ? true : false; }\n' % self.check_func
+		code = lang.cpython.buffer_format_codes.get(repr(self.T_conv.ctype))
+		from_buffer = code is not None and gen.buffer_protocol  # PyObject_GetBuffer requires CPython 3.11+
+
+		if from_buffer:
+			# buffers which are not sequences are only accepted if they hold matching values
+			out = '''bool %s(PyObject *o) {
+	if (PySequence_Check(o))
+		return true;
+	PythonBufferView view;
+	return view.Get(o, '%s', sizeof(%s));
+}
+''' % (self.check_func, code, self.T_conv.ctype)
+		else:
+			out = 'bool %s(PyObject *o) { return PySequence_Check(o) ? true : false; }\n' % self.check_func
+
+		storage_arg = (', %s &storage' % self.c_storage_class) if self.c_storage_class else ''
 
-		type_ = ('%s*' % self.T_conv.ctype) if self.T_conv.ctype.is_pointer() else self.T_conv.to_c_storage_ctype
-		
-		out += '''void %s(PyObject *o, void *obj) {
+		out += '''void %s(PyObject *o, void *obj%s) {
 	std::vector<%s> *sv = (std::vector<%s> *)obj;
+\n''' % (self.to_c_func, storage_arg, self.T_conv.ctype, self.T_conv.ctype)
+
+		if from_buffer:
+			out += '''\
+	// contiguous buffer of matching scalar values, single copy
+	if (PyObject_CheckBuffer(o)) {
+		Py_buffer view;
+		if (PyObject_GetBuffer(o, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) == 0) {
+			bool matches = _buffer_format_matches(view, '%s', sizeof(%s));
+			if (matches) {
+				sv->resize(view.len / view.itemsize);
+				if (view.len > 0)
+					memcpy(sv->data(), view.buf, view.len);
+			}
+			PyBuffer_Release(&view);
+			if (matches)
+				return;
+		} else {
+			PyErr_Clear();
+		}
+	}
+\n''' % (code, self.T_conv.ctype)
+
+		if self.T_conv.c_storage_class:
+			resize_items, item_storage_arg = '	storage.items.resize(size);\n', ', storage.items[i]'
+		else:
+			resize_items, item_storage_arg = '', ''
+
+		if self.c_storage_class:
+			release_fast = '	storage.fast = fast; // released with the storage, once the vector is no longer used\n'
+		else:
+			release_fast = '	Py_DECREF(fast);\n'
+
+		out += '''\
+	// lists and tuples are accessed directly, other sequences are converted to a list first
+	PyObject *fast = PySequence_Fast(o, "expected a sequence");
+	if (!fast) {
+		PyErr_Clear();
+		sv->clear();
+		return;
+	}
 
-	Py_ssize_t size = PySequence_Length(o);
+	bool is_list = PyList_Check(fast) ? true : false;
+	Py_ssize_t size = is_list ? PyList_Size(fast) : PyTuple_Size(fast);
 	sv->resize(size);
-	for (Py_ssize_t i = 0; i < size; ++i) {
-		PyObject *itm = PySequence_GetItem(o, i);
+%s	for (Py_ssize_t i = 0; i < size; ++i) {
+		PyObject *itm = is_list ? PyList_GetItem(fast, i) : PyTuple_GetItem(fast, i); // borrowed
 		%s v;
-		%s(itm, &v);
+		%s(itm, &v%s);
 		(*sv)[i] = %s;
-		Py_DECREF(itm);
 	}
-}\n''' % (self.to_c_func, self.T_conv.ctype, self.T_conv.ctype, type_, self.T_conv.to_c_func, self.T_conv.prepare_var_from_conv('v', ''))
+%s}\n''' % (resize_items, self.T_conv.to_c_storage_ctype, self.T_conv.to_c_func, item_storage_arg, self.T_conv.prepare_var_from_conv('v', self.T_conv.ctype.get_ref()), release_fast)
 
 		out += '''PyObject *%s(void *obj, OwnershipPolicy) {
 	std::vector<%s> *sv = (std::vector<%s> *)obj;
+\n''' % (self.from_c_func, self.T_conv.ctype, self.T_conv.ctype)
 
+		if self.as_array and code is not None:
+			out += '	return _new_array_from_values(%s, sv->data(), sv->size() * sizeof(%s));\n}\n' % (lang.cpython.get_array_typecode(code), self.T_conv.ctype)
+		else:
+			out += '''\
 	size_t size = sv->size();
 	PyObject *out = PyList_New(size);
 	for (size_t i = 0; i < size; ++i) {
-		PyObject *p = %s(&sv->at(i), Copy);
+		PyObject *p = %s(&(*sv)[i], Copy);
 		PyList_SetItem(out, i, p);
 	}
 	return out;
-}\n''' % (self.from_c_func, self.T_conv.ctype, self.T_conv.ctype, self.T_conv.from_c_func)
+}\n''' % self.T_conv.from_c_func
 		return out
@@ -6,6 +6,7 @@ import lang.go
 
 def bind_std(gen):
 	class GoConstCharPtrConverter(lang.go.GoTypeConverterCommon):
+		__slots__ = ()
 		def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 			super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 			self.go_to_c_type = "*C.char"
@@ -32,6 +33,7 @@ def bind_std(gen):
 	gen.bind_type(GoConstCharPtrConverter("const char *"))
 
 	class GoBasicTypeConverter(lang.go.GoTypeConverterCommon):
+		__slots__ = ()
 		def __init__(self, type, c_type, go_type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 			super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 			self.go_to_c_type = c_type
@@ -88,6 +90,7 @@ def bind_std(gen):
 	gen.bind_type(GoBasicTypeConverter("double", "C.double", "float64"))	
 	
 	class GoBoolConverter(lang.go.GoTypeConverterCommon):
+		__slots__ = ()
 		def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 			super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 			self.go_to_c_type = "C.bool"
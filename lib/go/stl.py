@@ -9,6 +9,7 @@ def bind_stl(gen):
 	gen.add_include('string', True)
 	
 	class GoStringConverter(lang.go.GoTypeConverterCommon):
+		__slots__ = ()
 		def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None, needs_c_storage_class=False):
 			super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, needs_c_storage_class)
 			self.go_to_c_type = "*C.char"
@@ -37,6 +38,7 @@ def bind_stl(gen):
 
 def bind_function_T(gen, type, bound_name=None):
 	class GoStdFunctionConverter(lang.go.GoTypeConverterCommon):
+		__slots__ = ()
 		def get_type_glue(self, gen, module_name):
 			return ""
 
@@ -44,6 +46,7 @@ def bind_function_T(gen, type, bound_name=None):
 
 
 class GoSliceToStdVectorConverter(lang.go.GoTypeConverterCommon):
+	__slots__ = ('T_conv',)
 	def __init__(self, type, T_conv):
 		native_type = f"std::vector<{T_conv.ctype}>"
 		super().__init__(type, native_type, None, native_type)
@@ -8,18 +8,28 @@ def bind_std(gen):
 	gen.add_include('cstdint', True)
 
 	class LuaBoolConverter(lang.lua.LuaTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(lua_State *L, int idx) { return lua_isboolean(L, idx) ? true : false; }\n' % self.check_func +\
 			'void %s(lua_State *L, int idx, void *obj) { *((%s*)obj) = lua_toboolean(L, idx) == 1; }\n' % (self.to_c_func, self.ctype) +\
-			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushboolean(L, *((%s*)obj) ? 1 : 0); return 1; }\n' % (self.from_c_func, self.ctype)
+			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushboolean(L, *((%s*)obj) ? 1 : 0); return 1; }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(lua_State *L, int idx, void *obj) { if (!lua_isboolean(L, idx)) return false; *((%s*)obj) = lua_toboolean(L, idx) == 1; return true; }\n' % (self.check_to_c_func, self.ctype)
 
 	gen.bind_type(LuaBoolConverter('bool'))
 
 	class LuaIntConverter(lang.lua.LuaTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(lua_State *L, int idx) { return lua_isinteger(L, idx); }\n' % self.check_func +\
 			'void %s(lua_State *L, int idx, void *obj) { *((%s*)obj) = (%s)lua_tointeger(L, idx); }\n' % (self.to_c_func, self.ctype, self.ctype) +\
-			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushinteger(L, *((%s*)obj)); return 1; }\n' % (self.from_c_func, self.ctype)
+			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushinteger(L, *((%s*)obj)); return 1; }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(lua_State *L, int idx, void *obj) { if (!lua_isinteger(L, idx)) return false; *((%s*)obj) = (%s)lua_tointeger(L, idx); return true; }\n' % (self.check_to_c_func, self.ctype, self.ctype)
 
 	gen.bind_type(LuaIntConverter('char'))
 	gen.bind_type(LuaIntConverter('short'))
@@ -43,26 +53,46 @@ def bind_std(gen):
 	gen.bind_type(LuaIntConverter('size_t'))
 
 	class LuaDoubleConverter(lang.lua.LuaTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(lua_State *L, int idx) { return lua_isnumber(L, idx); }\n' % self.check_func +\
 			'void %s(lua_State *L, int idx, void *obj) { *((%s*)obj) = (%s)lua_tonumber(L, idx); }\n' % (self.to_c_func, self.ctype, self.ctype) +\
-			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushnumber(L, *((%s*)obj)); return 1; }\n' % (self.from_c_func, self.ctype)
+			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushnumber(L, *((%s*)obj)); return 1; }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(lua_State *L, int idx, void *obj) { int isnum; lua_Number v = lua_tonumberx(L, idx, &isnum); if (!isnum) return false; *((%s*)obj) = (%s)v; return true; }\n' % (self.check_to_c_func, self.ctype, self.ctype)
 
 	gen.bind_type(LuaDoubleConverter('float'))
 	gen.bind_type(LuaDoubleConverter('double'))
 
 	class LuaConstCharPtrConverter(lang.lua.LuaTypeConverterCommon):
+		__slots__ = ()
 		def __init__(self, type, to_c_storage_type=None, bound_name=None, from_c_storage_type=None):
 			super().__init__(type, to_c_storage_type, bound_name, from_c_storage_type, True)
 
+		def has_check_to_c(self):
+			return True
+
+		def get_c_storage_class_definition(self):
+			return 'struct %s { std::string s; };\n' % self.c_storage_class
+
 		def get_type_glue(self, gen, module_name):
-			return 'struct %s { std::string s; };\n' % self.c_storage_class +\
-			'bool %s(lua_State *L, int idx) { return lua_isstring(L, idx); }\n' % self.check_func +\
+			return 'bool %s(lua_State *L, int idx) { return lua_isstring(L, idx); }\n' % self.check_func +\
 			'''void %s(lua_State *L, int idx, void *obj, %s &storage) {
 	storage.s = lua_tostring(L, idx);
 	*((%s*)obj) = storage.s.data();
 }
 ''' % (self.to_c_func, self.c_storage_class, self.ctype) +\
-			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushstring(L, (*(%s*)obj)); return 1; }\n' % (self.from_c_func, self.ctype)
+			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushstring(L, (*(%s*)obj)); return 1; }\n' % (self.from_c_func, self.ctype) +\
+			'''bool %s(lua_State *L, int idx, void *obj, %s &storage) {
+	const char *s = lua_tostring(L, idx);
+	if (!s)
+		return false;
+	storage.s = s;
+	*((%s*)obj) = storage.s.data();
+	return true;
+}
+''' % (self.check_to_c_func, self.c_storage_class, self.ctype)
 
 	gen.bind_type(LuaConstCharPtrConverter('const char *'))
@@ -9,16 +9,22 @@ def bind_stl(gen):
 	gen.add_include('string', True)
 
 	class LuaStringConverter(lang.lua.LuaTypeConverterCommon):
+		__slots__ = ()
+		def has_check_to_c(self):
+			return True
+
 		def get_type_glue(self, gen, module_name):
 			return 'bool %s(lua_State *L, int idx) { return lua_type(L, idx) == LUA_TSTRING; }\n' % self.check_func +\
 			'void %s(lua_State *L, int idx, void *obj) { *((%s*)obj) = lua_tostring(L, idx); }\n' % (self.to_c_func, self.ctype) +\
-			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushstring(L, ((%s*)obj)->c_str()); return 1; }\n' % (self.from_c_func, self.ctype)
+			'int %s(lua_State *L, void *obj, OwnershipPolicy) { lua_pushstring(L, ((%s*)obj)->c_str()); return 1; }\n' % (self.from_c_func, self.ctype) +\
+			'bool %s(lua_State *L, int idx, void *obj) { if (lua_type(L, idx) != LUA_TSTRING) return false; *((%s*)obj) = lua_tostring(L, idx); return true; }\n' % (self.check_to_c_func, self.ctype)
 
 	gen.bind_type(LuaStringConverter('std::string'))
 
 
 def bind_function_T(gen, type, bound_name=None):
 	class LuaStdFunctionConverter(lang.lua.LuaTypeConverterCommon):
+		__slots__ = ()
 		def get_type_glue(self, gen, module_name):
 			function = self.ctype.scoped_typename.parts[-1].template.function
 
@@ -72,11 +78,15 @@ int %s(lua_State *L, void *obj, OwnershipPolicy) {
 
 
 class LuaTableToStdVectorConverter(lang.lua.LuaTypeConverterCommon):
+	__slots__ = ('T_conv',)
 	def __init__(self, type, T_conv):
 		native_type = 'std::vector<%s>' % T_conv.ctype
 		super().__init__(type, native_type, None, native_type)
 		self.T_conv = T_conv
 
+	def check_depends_on_value(self, gen):
+		return True  # every table entry is checked
+
 	def get_type_glue(self, gen, module_name):
 		out = '''bool %s(lua_State *L, int idx) {
 	if (!lua_istable(L, idx))
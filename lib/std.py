@@ -2,12 +2,16 @@
 #	Copyright (C) 2018 Emmanuel Julien
 
 class VectorSequenceFeature:
-	def __init__(self, wrapped_conv):
+	def __init__(self, wrapped_conv, buffer=True):
 		self.wrapped_conv = wrapped_conv
+		self.buffer = buffer  # expose the contiguous storage through the buffer protocol when the generator supports it
 
 	def get_size(self, self_var, out_var):
 		return '%s = %s->size();\n' % (out_var, self_var)
 
+	def get_data(self, self_var, out_var):
+		return '%s = %s->data();\n' % (out_var, self_var)
+
 	def get_item(self, self_var, idx, out_var, error_var):
 		out = 'if ((%s->size() > 0) && (size_t(%s) < %s->size()))\n' % (self_var, idx, self_var)
 		out += '	%s = (*%s)[%s];\n' % (out_var, self_var, idx)
@@ -1,6 +1,8 @@
 # FABGen - The FABulous binding Generator for CPython and Lua
 #	Copyright (C) 2018 Emmanuel Julien
 
+import gen as gen_module
+
 
 class SharedPtrProxyFeature:
 	def __init__(self, wrapped_conv):
@@ -37,6 +39,7 @@ def bind_future_T(gen, T, bound_name=None):
 	return future
 
 
+@gen_module.binding_helper
 def bind_function_T(gen, type, bound_name=None):
 	gen.add_include('functional', is_system=True)
 	gen.add_include('memory', is_system=True)
@@ -90,6 +90,10 @@ def run_test(gen, name, testbed):
 		shutil.rmtree(work_path, ignore_errors=True)
 
 
+def get_object_files(sources):
+	return [os.path.splitext(source)[0] + '.o' for source in sources]
+
+
 def run_tests(gen, names, testbed):
 	print("Starting tests with generator %s" % gen.get_language())
 
@@ -179,7 +183,7 @@ class CPythonTestBed:
 			cflags = subprocess.check_output('python3-config --cflags', shell=True).decode('utf-8').strip()
 			cflags = cflags.replace('\n', ' ')
 
-			build_cmd = 'gcc ' + cflags + ' -g -O0 -fPIC -std=c++14 -c %s -o my_test.o' % ' '.join(sources)
+			build_cmd = 'gcc ' + cflags + ' -g -O0 -fPIC -std=c++14 -c %s' % ' '.join(sources)
 
 			try:
 				subprocess.check_output(build_cmd, shell=True, stderr=subprocess.STDOUT)
@@ -190,7 +194,7 @@ class CPythonTestBed:
 			ldflags = subprocess.check_output('python3-config --ldflags', shell=True).decode('utf-8').strip()
 			ldflags = ldflags.replace('\n', ' ')
 
-			link_cmd = 'g++ -shared my_test.o ' + ldflags + ' -o my_test.so'
+			link_cmd = 'g++ -shared %s ' % ' '.join(get_object_files(sources)) + ldflags + ' -o my_test.so'
 
 			try:
 				subprocess.check_output(link_cmd, shell=True, stderr=subprocess.STDOUT)
@@ -298,7 +302,7 @@ class LuaTestBed:
 			os.chdir(work_path)
 			shutil.copy(os.path.join(args.lua_base_path, 'bin', 'lua'), work_path)
 
-			build_cmd = 'gcc -I' + os.path.join(args.lua_base_path, 'include') + ' -g -O0 -fPIC -std=c++14 -c %s -o my_test.o' % ' '.join(sources)
+			build_cmd = 'gcc -I' + os.path.join(args.lua_base_path, 'include') + ' -g -O0 -fPIC -std=c++14 -c %s' % ' '.join(sources)
 
 			try:
 				subprocess.check_output(build_cmd, shell=True, stderr=subprocess.STDOUT)
@@ -306,7 +310,7 @@ class LuaTestBed:
 				print("Build error: ", e.output.decode('utf-8'))
 				return False
 
-			link_cmd = 'g++ -shared my_test.o -L' + os.path.join(args.lua_base_path, 'lib') + ' -o my_test.so -pthread'
+			link_cmd = 'g++ -shared %s -L' % ' '.join(get_object_files(sources)) + os.path.join(args.lua_base_path, 'lib') + ' -o my_test.so -pthread'
 
 			try:
 				subprocess.check_output(link_cmd, shell=True, stderr=subprocess.STDOUT)
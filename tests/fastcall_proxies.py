@@ -0,0 +1,157 @@
+import lib
+
+
+def bind_test(gen):
+	# METH_FASTCALL/METH_O/METH_NOARGS proxies (CPython only, ignored by the other generators)
+	gen.fastcall = True
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+int get_int() { return 8; }
+int twice(int v) { return v * 2; }
+int add(int a, int b) { return a + b; }
+
+int get() { return 0; }
+int get(int v) { return v / 2; }
+int get(int v, int k) { return v * k; }
+
+void get_arg_out(int v, int &out) { out = v + 1; }
+
+struct simple_struct {
+	int get_int() const { return 4; }
+	int scale(int k) const { return 4 * k; }
+	int scale(int k, int b) const { return 4 * k + b; }
+	int offset(int v) const { return v + 4; }
+
+	static int static_add(int a, int b) { return a + b; }
+	static int static_none() { return 12; }
+};
+''', True, False)
+
+	gen.bind_function('get_int', 'int', [])
+	gen.bind_function('twice', 'int', ['int v'])
+	gen.bind_function('add', 'int', ['int a', 'int b'])
+	gen.bind_function_overloads('get', [
+		('int', [], []),
+		('int', ['int v'], []),
+		('int', ['int v', 'int k'], [])
+	])
+	gen.bind_function('get_arg_out', 'void', ['int v', 'int &out'], {'arg_out': ['out']})
+
+	simple_struct = gen.begin_class('simple_struct')
+	gen.bind_constructor(simple_struct, [])
+	gen.bind_method(simple_struct, 'get_int', 'int', [])
+	gen.bind_method_overloads(simple_struct, 'scale', [('int', ['int k'], []), ('int', ['int k', 'int b'], [])])
+	gen.bind_method(simple_struct, 'offset', 'int', ['int v'])
+	gen.bind_static_method(simple_struct, 'static_add', 'int', ['int a', 'int b'])
+	gen.bind_static_method(simple_struct, 'static_none', 'int', [])
+	gen.end_class(simple_struct)
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.fastcall = False
+
+	return output
+
+
+test_python = '''\
+import my_test
+
+assert my_test.get_int() == 8  # METH_NOARGS
+assert my_test.twice(3) == 6  # METH_O
+assert my_test.add(2, 5) == 7  # METH_FASTCALL
+
+# overload over several argument counts
+assert my_test.get() == 0
+assert my_test.get(2) == 1
+assert my_test.get(4, 3) == 12
+
+# output argument
+assert my_test.get_arg_out(4) == 5
+
+# methods
+s = my_test.simple_struct()
+assert s.get_int() == 4
+assert s.offset(2) == 6
+assert s.scale(2) == 8
+assert s.scale(2, 1) == 9
+
+# static methods
+assert my_test.simple_struct.static_add(3, 4) == 7
+assert my_test.simple_struct.static_none() == 12
+
+# argument count errors
+for call in [lambda: my_test.get_int(1), lambda: my_test.twice(), lambda: my_test.add(1), lambda: s.offset(), lambda: s.scale(1, 2, 3)]:
+	try:
+		call()
+		assert False
+	except TypeError:
+		pass  # rejected by CPython for METH_NOARGS/METH_O
+	except RuntimeError:
+		pass  # rejected by the proxy
+
+# argument type error
+try:
+	my_test.twice('a')
+	assert False
+except RuntimeError:
+	pass
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+assert(my_test.get_int() == 8)
+assert(my_test.twice(3) == 6)
+assert(my_test.add(2, 5) == 7)
+
+assert(my_test.get() == 0)
+assert(my_test.get(2) == 1)
+assert(my_test.get(4, 3) == 12)
+
+assert(my_test.get_arg_out(4) == 5)
+
+s = my_test.simple_struct()
+assert(s:get_int() == 4)
+assert(s:offset(2) == 6)
+assert(s:scale(2) == 8)
+assert(s:scale(2, 1) == 9)
+
+assert(my_test.simple_struct.static_add(3, 4) == 7)
+assert(my_test.simple_struct.static_none() == 12)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	assert.Equal(t, GetInt(), int32(8), "should be the same.")
+	assert.Equal(t, Twice(3), int32(6), "should be the same.")
+	assert.Equal(t, Add(2, 5), int32(7), "should be the same.")
+
+	assert.Equal(t, Get(), int32(0), "should be the same.")
+	assert.Equal(t, GetWithV(2), int32(1), "should be the same.")
+	assert.Equal(t, GetWithVK(4, 3), int32(12), "should be the same.")
+
+	s := NewSimpleStruct()
+	assert.Equal(t, s.GetInt(), int32(4), "should be the same.")
+	assert.Equal(t, s.Offset(2), int32(6), "should be the same.")
+	assert.Equal(t, s.Scale(2), int32(8), "should be the same.")
+	assert.Equal(t, s.ScaleWithB(2, 1), int32(9), "should be the same.")
+
+	assert.Equal(t, s.StaticAdd(3, 4), int32(7), "should be the same.")
+	assert.Equal(t, s.StaticNone(), int32(12), "should be the same.")
+}
+'''
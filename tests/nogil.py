@@ -0,0 +1,141 @@
+import lib
+
+
+def bind_test(gen):
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+#include <atomic>
+#include <chrono>
+#include <stdexcept>
+#include <thread>
+
+// busy wait, keeps a core busy for the given duration
+static int spin(int ms) {
+	int count = 0;
+	auto t_end = std::chrono::steady_clock::now() + std::chrono::milliseconds(ms);
+	while (std::chrono::steady_clock::now() < t_end)
+		++count;
+	return ms;
+}
+
+static int spin_locked(int ms) { return spin(ms); }
+
+static std::atomic<bool> waiting{false}, signaled{false};
+
+// wait until signaled from another thread, give up after the timeout
+static bool wait_for_signal(int timeout_ms) {
+	auto t_end = std::chrono::steady_clock::now() + std::chrono::milliseconds(timeout_ms);
+	waiting = true;
+	while (!signaled && std::chrono::steady_clock::now() < t_end)
+		std::this_thread::yield();
+	waiting = false;
+	return signaled.exchange(false);
+}
+
+static bool wait_for_signal_locked(int timeout_ms) { return wait_for_signal(timeout_ms); }
+
+static bool is_waiting() { return waiting; }
+static void notify() { signaled = true; }
+
+static int throw_after_spin(int ms) {
+	spin(ms);
+	throw std::runtime_error("spin failed");
+}
+
+struct worker {
+	worker() { spin(1); }
+	int run(int ms) const { return spin(ms); }
+	bool wait(int timeout_ms) const { return wait_for_signal(timeout_ms); }
+};
+''', True, False)
+
+	gen.add_include('chrono', True)
+	gen.add_include('thread', True)
+
+	worker = gen.begin_class('worker')
+	gen.bind_constructor(worker, [], {'nogil': True})
+	gen.bind_method(worker, 'run', 'int', ['int ms'], {'nogil': True})
+	gen.bind_method(worker, 'wait', 'bool', ['int timeout_ms'], {'nogil': True})
+	gen.end_class(worker)
+
+	gen.bind_function('spin', 'int', ['int ms'], {'nogil': True})
+	gen.bind_function('spin_locked', 'int', ['int ms'])
+	gen.bind_function('wait_for_signal', 'bool', ['int timeout_ms'], {'nogil': True})
+	gen.bind_function('wait_for_signal_locked', 'bool', ['int timeout_ms'])
+	gen.bind_function('is_waiting', 'bool', [])
+	gen.bind_function('notify', 'void', [])
+	gen.bind_function('throw_after_spin', 'int', ['int ms'], {'nogil': True, 'exception': 'native exception raised'})
+
+	gen.finalize()
+	return gen.get_output()
+
+
+test_python = '''\
+import threading
+import time
+
+import my_test
+
+assert my_test.spin(1) == 1
+assert my_test.worker().run(1) == 1
+
+# the GIL is acquired again when the native call throws
+try:
+	my_test.throw_after_spin(1)
+	assert False
+except RuntimeError:
+	pass
+
+
+# a Python thread can only signal a native call waiting for it if the call released the GIL
+def signal_when_waiting(done):
+	while not done.is_set():
+		if my_test.is_waiting():
+			my_test.notify()
+			return
+		time.sleep(0.001)
+
+
+def is_signaled(wait, timeout_ms):
+	done = threading.Event()
+	thread = threading.Thread(target=signal_when_waiting, args=(done,))
+	thread.start()
+	signaled = wait(timeout_ms)
+	done.set()
+	thread.join()
+	return signaled
+
+
+assert is_signaled(my_test.wait_for_signal, 10000)
+assert is_signaled(my_test.worker().wait, 10000)
+assert not is_signaled(my_test.wait_for_signal_locked, 100)
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+assert(my_test.spin(1) == 1)
+assert(my_test.spin_locked(1) == 1)
+assert(my_test.worker():run(1) == 1)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	assert.Equal(t, Spin(1), int32(1), "should be the same.")
+	assert.Equal(t, SpinLocked(1), int32(1), "should be the same.")
+	assert.Equal(t, NewWorker().Run(1), int32(1), "should be the same.")
+}
+'''
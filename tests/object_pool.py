@@ -0,0 +1,142 @@
+import lib
+
+
+def bind_test(gen):
+	# bounded free lists of wrapper objects (CPython only, ignored by the other generators)
+	gen.object_pool_size = 4
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+static int alive_count = 0;
+
+struct simple_struct {
+	simple_struct() : v(1) { ++alive_count; }
+	simple_struct(const simple_struct &s) : v(s.v) { ++alive_count; }
+	~simple_struct() { --alive_count; }
+
+	simple_struct operator+(const simple_struct &s) const { simple_struct r; r.v = v + s.v; return r; }
+
+	int v;
+};
+
+struct small_struct { int a{3}; };
+
+static int get_alive_count() { return alive_count; }
+''', True, False)
+
+	simple_struct = gen.begin_class('simple_struct')
+	gen.bind_constructor(simple_struct, [])
+	gen.bind_arithmetic_op(simple_struct, '+', 'simple_struct', ['const simple_struct &s'])
+	gen.bind_member(simple_struct, 'int v')
+	gen.end_class(simple_struct)
+
+	small_struct = gen.begin_class('small_struct', features={'inline': True})
+	gen.bind_constructor(small_struct, [])
+	gen.bind_member(small_struct, 'int a')
+	gen.end_class(small_struct)
+
+	gen.bind_function('get_alive_count', 'int', [])
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.object_pool_size = 0
+
+	return output
+
+
+test_python = '''\
+import my_test
+
+a = my_test.simple_struct()
+b = a
+
+# short-lived results reuse the released wrapper objects
+for i in range(16):
+	b = b + a
+
+assert b.v == 17
+assert my_test.get_alive_count() == 2
+
+stats = my_test.object_pool_stats()
+assert stats['simple_struct']['max_size'] == 4
+assert stats['simple_struct']['size'] == 1
+assert stats['simple_struct']['hits'] == 14
+assert stats['simple_struct']['misses'] == 3
+
+# inline objects are destroyed before their wrapper is pooled
+s = [my_test.small_struct() for i in range(8)]
+assert all(v.a == 3 for v in s)
+s = None
+
+stats = my_test.object_pool_stats()
+assert stats['small_struct']['size'] == 4
+
+s = my_test.small_struct()
+assert s.a == 3
+assert my_test.object_pool_stats()['small_struct']['hits'] == 1
+
+# trim the pools
+my_test.trim_object_pools()
+stats = my_test.object_pool_stats()
+assert stats['simple_struct']['size'] == 0
+assert stats['small_struct']['size'] == 0
+
+# disable the pools
+my_test.set_object_pool_size(0)
+
+a, b = None, None
+assert my_test.get_alive_count() == 0
+assert my_test.object_pool_stats()['simple_struct']['size'] == 0
+
+try:
+	my_test.set_object_pool_size(-1)
+	assert False
+except OverflowError:
+	pass
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+a = my_test.simple_struct()
+b = a
+
+for i=1,16 do
+	b = b + a
+end
+
+assert(b.v == 17)
+
+s = my_test.small_struct()
+assert(s.a == 3)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	a := NewSimpleStruct()
+	b := a
+
+	for i := 0; i < 16; i++ {
+		b = b.Add(a)
+	}
+
+	assert.Equal(t, b.GetV(), int32(17), "should be the same.")
+
+	s := NewSmallStruct()
+	assert.Equal(t, s.GetA(), int32(3), "should be the same.")
+}
+'''
@@ -0,0 +1,125 @@
+import lib
+
+
+def bind_test(gen):
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+struct vec { float x{2}; };
+struct mat { float k{3}; };
+
+int pick(int v) { return 1; }
+int pick(float v) { return 2; }
+int pick(const vec &v) { return 3; }
+int pick(const mat &m) { return 4; }
+
+float scale(const vec &v, float k) { return v.x * k; }
+float scale(const vec &v, const mat &m) { return v.x * m.k; }
+float scale(const mat &m, float k) { return m.k * k; }
+
+int classify(float v) { return 1; }
+int classify(const char *s) { return 2; }
+''', True, False)
+
+	vec = gen.begin_class('vec')
+	gen.bind_constructor(vec, [])
+	gen.end_class(vec)
+
+	mat = gen.begin_class('mat')
+	gen.bind_constructor(mat, [])
+	gen.end_class(mat)
+
+	gen.bind_function_overloads('pick', [('int', ['int v'], []), ('int', ['float v'], []), ('int', ['const vec &v'], []), ('int', ['const mat &m'], [])])
+	gen.bind_function_overloads('scale', [('float', ['const vec &v', 'float k'], []), ('float', ['const vec &v', 'const mat &m'], []), ('float', ['const mat &m', 'float k'], [])])
+	gen.bind_function_overloads('classify', [('int', ['float v'], []), ('int', ['const char *s'], [])])
+
+	gen.finalize()
+	return gen.get_output()
+
+
+test_python = '''\
+import my_test
+
+v, m = my_test.vec(), my_test.mat()
+
+# alternate the selected prototypes so that the cached selection misses and hits
+for i in range(4):
+	assert my_test.pick(v) == 3
+	assert my_test.pick(v) == 3
+	assert my_test.pick(m) == 4
+	assert my_test.pick(1.5) == 2
+	assert my_test.pick(1) == 1
+	assert my_test.pick(1) == 1
+
+	assert my_test.scale(v, 2) == 4
+	assert my_test.scale(v, m) == 6
+	assert my_test.scale(v, m) == 6
+	assert my_test.scale(m, 2) == 6
+
+	assert my_test.classify('a') == 2
+	assert my_test.classify(1.5) == 1
+
+# a cached selection does not bypass the argument checks
+try:
+	my_test.scale(v, 'a')
+	assert False
+except RuntimeError:
+	pass
+
+assert my_test.scale(v, m) == 6
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+v, m = my_test.vec(), my_test.mat()
+
+for i=1,4 do
+	assert(my_test.pick(v) == 3)
+	assert(my_test.pick(m) == 4)
+
+	-- integers and floats share the same Lua type but select different prototypes
+	assert(my_test.pick(1) == 1)
+	assert(my_test.pick(1.5) == 2)
+	assert(my_test.pick(1) == 1)
+
+	assert(my_test.scale(v, 2) == 4)
+	assert(my_test.scale(v, m) == 6)
+	assert(my_test.scale(m, 2) == 6)
+
+	-- numeric strings are accepted as numbers
+	assert(my_test.classify('a') == 2)
+	assert(my_test.classify('1.5') == 1)
+	assert(my_test.classify('a') == 2)
+end
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	v, m := NewVec(), NewMat()
+
+	assert.Equal(t, Pick(1), int32(1), "should be the same.")
+	assert.Equal(t, PickWithV(1.5), int32(2), "should be the same.")
+	assert.Equal(t, PickWithVecV(v), int32(3), "should be the same.")
+	assert.Equal(t, PickWithM(m), int32(4), "should be the same.")
+
+	assert.Equal(t, Scale(v, 2), float32(4), "should be the same.")
+	assert.Equal(t, ScaleWithM(v, m), float32(6), "should be the same.")
+	assert.Equal(t, ScaleWithMatM(m, 2), float32(6), "should be the same.")
+
+	assert.Equal(t, Classify(1.5), int32(1), "should be the same.")
+	assert.Equal(t, ClassifyWithS("a"), int32(2), "should be the same.")
+}
+'''
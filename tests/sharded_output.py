@@ -0,0 +1,128 @@
+import lib
+
+
+def bind_test(gen):
+	# spread each class over its own translation unit, the last one receives no class
+	gen.shards = 4
+	gen.get_class_shard_hook = lambda conv: ['base_class', 'derived_class', 'other_class'].index(conv.bound_name)
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper, it is visible from all translation units
+	gen.add_include('string', True)
+
+	gen.insert_code('''\
+struct base_class {
+	int base_method() { return 4; }
+	int u{6};
+};
+
+struct derived_class : base_class {
+	int derived_method() { return 8; }
+	int count_chars(const char *s) { return int(std::string(s).size()); }
+};
+
+struct other_class {
+	other_class() = default;
+	other_class(int v_) : v(v_) {}
+	int v{3};
+};
+
+inline int read_u(base_class &o) { return o.u; }
+''', True, False)
+
+	base_conv = gen.begin_class('base_class')
+	gen.bind_constructor(base_conv, [])
+	gen.bind_method(base_conv, 'base_method', 'int', [])
+	gen.bind_members(base_conv, ['int u'])
+	gen.end_class(base_conv)
+
+	derived_conv = gen.begin_class('derived_class')
+	gen.add_base(derived_conv, base_conv)
+	gen.bind_constructor(derived_conv, [])
+	gen.bind_method(derived_conv, 'derived_method', 'int', [])
+	gen.bind_method(derived_conv, 'count_chars', 'int', ['const char *s'])
+	gen.end_class(derived_conv)
+
+	other_conv = gen.begin_class('other_class')
+	gen.bind_constructor_overloads(other_conv, [([], []), (['int v'], [])])
+	gen.bind_members(other_conv, ['int v'])
+	gen.end_class(other_conv)
+
+	gen.bind_function('read_u', 'int', ['base_class &o'])
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.shards = 1
+	del gen.get_class_shard_hook
+
+	return output
+
+
+test_python = '''\
+import my_test
+
+base = my_test.base_class()
+assert base.base_method() == 4
+assert base.u == 6
+
+derived = my_test.derived_class()
+assert derived.base_method() == 4  # method proxy from another translation unit
+assert derived.derived_method() == 8
+assert derived.count_chars('four') == 4
+assert derived.u == 6  # member proxy from another translation unit
+
+derived.u = 9
+assert my_test.read_u(derived) == 9
+
+assert my_test.other_class().v == 3
+assert my_test.other_class(5).v == 5
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+base = my_test.base_class()
+assert(base:base_method() == 4)
+assert(base.u == 6)
+
+derived = my_test.derived_class()
+assert(derived:base_method() == 4) -- method proxy from another translation unit
+assert(derived:derived_method() == 8)
+assert(derived:count_chars('four') == 4)
+assert(derived.u == 6) -- member proxy from another translation unit
+
+derived.u = 9
+assert(my_test.read_u(derived) == 9)
+
+assert(my_test.other_class().v == 3)
+assert(my_test.other_class(5).v == 5)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	base := NewBaseClass()
+	assert.Equal(t, base.BaseMethod(), int32(4), "should be the same.")
+	assert.Equal(t, base.GetU(), int32(6), "should be the same.")
+
+	derived := NewDerivedClass()
+	assert.Equal(t, derived.BaseMethod(), int32(4), "should be the same.")
+	assert.Equal(t, derived.DerivedMethod(), int32(8), "should be the same.")
+	assert.Equal(t, derived.CountChars("four"), int32(4), "should be the same.")
+
+	assert.Equal(t, NewOtherClass().GetV(), int32(3), "should be the same.")
+	assert.Equal(t, NewOtherClassWithV(5).GetV(), int32(5), "should be the same.")
+}
+'''
@@ -0,0 +1,163 @@
+import lib.std
+import lib
+
+
+def bind_test(gen):
+	# buffer protocol for sequence types (CPython only, ignored by the other generators)
+	gen.buffer_protocol = True
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	gen.add_include('vector', is_system=True)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+struct vec3 {
+	float x, y, z;
+};
+
+struct vertex {
+	vec3 pos;
+	float u, v;
+};
+
+struct sample {
+	char tag;
+	double value;
+	int count;
+};
+
+static std::vector<float> make_floats() { return {0.f, 1.f, 2.f, 3.f}; }
+static std::vector<sample> make_samples() { return {{'a', 1.5, 2}, {'b', 2.5, 4}}; }
+''', True, False)
+
+	float_conv = gen.get_conv('float')
+
+	std_vector_float = gen.begin_class('std::vector<float>', bound_name='FloatVector', features={'sequence': lib.std.VectorSequenceFeature(float_conv)})
+	gen.bind_constructor(std_vector_float, [])
+	gen.bind_method(std_vector_float, 'push_back', 'void', ['float v'])
+	gen.end_class(std_vector_float)
+
+	std_vector_int = gen.begin_class('std::vector<int>', bound_name='IntVector', features={'sequence': lib.std.VectorSequenceFeature(gen.get_conv('int'), buffer=False)})
+	gen.bind_constructor(std_vector_int, [])
+	gen.end_class(std_vector_int)
+
+	vec3 = gen.begin_class('vec3')
+	gen.bind_constructor(vec3, [])
+	gen.bind_members(vec3, ['float x', 'float y', 'float z'])
+	gen.end_class(vec3)
+
+	std_vector_vec3 = gen.begin_class('std::vector<vec3>', bound_name='Vec3Vector', features={'sequence': lib.std.VectorSequenceFeature(vec3)})
+	gen.bind_constructor(std_vector_vec3, [])
+	gen.bind_method(std_vector_vec3, 'push_back', 'void', ['const vec3 &v'])
+	gen.end_class(std_vector_vec3)
+
+	sample = gen.begin_class('sample')
+	gen.bind_members(sample, ['double value', 'char tag', 'int count'])
+	gen.end_class(sample)
+
+	std_vector_sample = gen.begin_class('std::vector<sample>', bound_name='SampleVector', features={'sequence': lib.std.VectorSequenceFeature(sample)})
+	gen.end_class(std_vector_sample)
+
+	# vec3 members are not scalars, vertex vectors are not exposed through the buffer protocol
+	vertex = gen.begin_class('vertex')
+	gen.bind_constructor(vertex, [])
+	gen.bind_members(vertex, ['vec3 pos', 'float u', 'float v'])
+	gen.end_class(vertex)
+
+	std_vector_vertex = gen.begin_class('std::vector<vertex>', bound_name='VertexVector', features={'sequence': lib.std.VectorSequenceFeature(vertex)})
+	gen.bind_constructor(std_vector_vertex, [])
+	gen.end_class(std_vector_vertex)
+
+	gen.bind_function('make_floats', 'std::vector<float>', [])
+	gen.bind_function('make_samples', 'std::vector<sample>', [])
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.buffer_protocol = False
+
+	return output
+
+
+test_python = '''\
+import struct
+
+import my_test
+
+# scalar elements
+v = my_test.make_floats()
+m = memoryview(v)
+assert m.format == 'f'
+assert m.itemsize == 4
+assert m.ndim == 1
+assert m.shape == (4,)
+assert m.strides == (4,)
+assert m.c_contiguous
+assert m.tolist() == [0, 1, 2, 3]
+
+# views share the vector storage
+m[2] = 8
+assert v[2] == 8
+v[3] = 5
+assert m[3] == 5
+m.release()
+
+# structured elements
+v = my_test.Vec3Vector()
+for i in range(3):
+	p = my_test.vec3()
+	p.x, p.y, p.z = i, i * 2, i * 3
+	v.push_back(p)
+
+m = memoryview(v)
+assert m.format == 'T{f:x:f:y:f:z:}'
+assert m.itemsize == 12
+assert m.shape == (3,)
+assert struct.unpack('9f', m.tobytes()) == (0, 0, 0, 1, 2, 3, 2, 4, 6)
+m.release()
+
+# padding is explicit and fields are ordered by offset
+m = memoryview(my_test.make_samples())
+assert m.itemsize == struct.calcsize('cdi0d')
+assert m.format == 'T{b:tag:7xd:value:i:count:4x}'
+m.release()
+
+# vectors without buffer support
+for v in [my_test.IntVector(), my_test.VertexVector()]:
+	try:
+		memoryview(v)
+		assert False
+	except TypeError:
+		pass
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+v = my_test.make_floats()
+assert(#v == 4)
+assert(v[3] == 2)
+
+v = my_test.make_samples()
+assert(#v == 2)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	v := MakeFloats()
+	assert.Equal(t, v.Len(), int32(4), "should be the same.")
+	assert.Equal(t, v.Get(2), float32(2), "should be the same.")
+}
+'''
@@ -0,0 +1,128 @@
+import lib
+
+
+def bind_test(gen):
+	# copy of contiguous buffers requires the buffer protocol (CPython only, ignored by the other generators)
+	gen.buffer_protocol = True
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	gen.add_include('vector', is_system=True)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+static float sum_floats(const std::vector<float> &v) { float s = 0; for (auto f : v) s += f; return s; }
+static size_t count_floats(const std::vector<float> &v) { return v.size(); }
+static int sum_ints(const std::vector<int64_t> &v) { int s = 0; for (auto i : v) s += int(i); return s; }
+static int sum_bytes(const std::vector<uint8_t> &v) { int s = 0; for (auto i : v) s += i; return s; }
+
+static std::vector<float> make_floats(int n) { std::vector<float> v(n); for (int i = 0; i < n; ++i) v[i] = float(i) / 2; return v; }
+static std::vector<int64_t> make_ints(int n) { std::vector<int64_t> v(n); for (int i = 0; i < n; ++i) v[i] = i * 3; return v; }
+''', True, False)
+
+	if gen.get_language() == 'CPython':
+		gen.bind_type(lib.cpython.stl.PySequenceToStdVectorConverter('FloatSequence', gen.get_conv('float'), as_array=True))
+		gen.bind_type(lib.cpython.stl.PySequenceToStdVectorConverter('Int64Sequence', gen.get_conv('int64_t')))
+		gen.bind_type(lib.cpython.stl.PySequenceToStdVectorConverter('ByteSequence', gen.get_conv('uint8_t')))
+	elif gen.get_language() == 'Lua':
+		gen.bind_type(lib.lua.stl.LuaTableToStdVectorConverter('FloatSequence', gen.get_conv('float')))
+		gen.bind_type(lib.lua.stl.LuaTableToStdVectorConverter('Int64Sequence', gen.get_conv('int64_t')))
+		gen.bind_type(lib.lua.stl.LuaTableToStdVectorConverter('ByteSequence', gen.get_conv('uint8_t')))
+	elif gen.get_language() == 'Go':
+		gen.bind_type(lib.go.stl.GoSliceToStdVectorConverter('FloatSequence', gen.get_conv('float')))
+		gen.bind_type(lib.go.stl.GoSliceToStdVectorConverter('Int64Sequence', gen.get_conv('int64_t')))
+		gen.bind_type(lib.go.stl.GoSliceToStdVectorConverter('ByteSequence', gen.get_conv('uint8_t')))
+
+	gen.bind_function('sum_floats', 'float', ['FloatSequence v'])
+	gen.bind_function('count_floats', 'size_t', ['FloatSequence v'])
+	gen.bind_function('sum_ints', 'int', ['Int64Sequence v'])
+	gen.bind_function('sum_bytes', 'int', ['ByteSequence v'])
+
+	# Go slices are not returned by value
+	if gen.get_language() != 'Go':
+		gen.bind_function('make_floats', 'FloatSequence', ['int n'])
+		gen.bind_function('make_ints', 'Int64Sequence', ['int n'])
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.buffer_protocol = False
+
+	return output
+
+
+test_python = '''\
+import array
+import pickle
+
+import my_test
+
+# lists, tuples and other sequences
+assert my_test.sum_floats([1, 2.5, 3]) == 6.5
+assert my_test.sum_floats((1, 2.5, 3)) == 6.5
+assert my_test.sum_floats(range(4)) == 6
+assert my_test.sum_floats([]) == 0
+assert my_test.sum_ints([1, 2, 3]) == 6
+
+# buffers holding values of the same kind and size are copied in one go
+assert my_test.sum_floats(array.array('f', [1, 2, 3.5])) == 6.5
+assert my_test.count_floats(array.array('f', range(1000))) == 1000
+assert my_test.sum_ints(array.array('q', [4, 5, 6])) == 15
+assert my_test.sum_ints(array.array('l', [4, 5, 6])) == 15
+assert my_test.sum_bytes(bytes([1, 2, 3])) == 6
+assert my_test.sum_bytes(bytearray([4, 5])) == 9
+
+# other buffers are converted value by value
+assert my_test.sum_floats(array.array('d', [1, 2, 3.5])) == 6.5
+assert my_test.sum_ints(array.array('i', [4, 5, 6])) == 15
+
+# buffers which are not sequences are rejected unless they hold matching values
+assert my_test.sum_floats(pickle.PickleBuffer(array.array('f', [1, 2]))) == 3
+
+try:
+	my_test.sum_floats(pickle.PickleBuffer(array.array('d', [1, 2])))
+	assert False
+except RuntimeError:
+	pass
+
+# arithmetic vectors are returned as arrays or lists
+f = my_test.make_floats(4)
+assert isinstance(f, array.array)
+assert f.typecode == 'f'
+assert f.tolist() == [0, 0.5, 1, 1.5]
+assert len(my_test.make_floats(0)) == 0
+
+i = my_test.make_ints(3)
+assert i == [0, 3, 6]
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+assert(my_test.sum_floats({1, 2.5, 3}) == 6.5)
+assert(my_test.sum_ints({1, 2, 3}) == 6)
+assert(my_test.sum_bytes({1, 2, 3}) == 6)
+
+f = my_test.make_floats(4)
+assert(#f == 4)
+assert(f[2] == 0.5)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	assert.Equal(t, SumFloats([]float32{1, 2.5, 3}), float32(6.5), "should be the same.")
+	assert.Equal(t, SumInts([]int64{1, 2, 3}), int32(6), "should be the same.")
+	assert.Equal(t, SumBytes([]uint8{1, 2, 3}), int32(6), "should be the same.")
+}
+'''
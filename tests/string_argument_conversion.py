@@ -0,0 +1,121 @@
+import lib
+
+
+def bind_test(gen):
+	# string arguments borrow the UTF-8 buffer of str objects from the CPython 3.10 limited API (ignored by the other generators)
+	gen.limited_api_version = 0x030A0000
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+#include <cstring>
+
+static size_t length_of_const_char_ptr(const char *s) { return strlen(s); }
+static size_t length_of_string(const std::string &s) { return s.size(); }
+
+static bool is_same_buffer(const char *a, const char *b) { return a == b; }
+
+static std::string concat(const char *a, const std::string &b) { return std::string(a) + b; }
+
+static int pick(int v) { return 0; }
+static int pick(const char *s) { return 1; }
+static int pick(const std::string &s, int v) { return 2; }
+
+static std::string join(const std::vector<const char *> &v) { std::string s; for (auto c : v) s += c; return s; }
+''', True, False)
+
+	gen.bind_function('length_of_const_char_ptr', 'size_t', ['const char *s'])
+	gen.bind_function('length_of_string', 'size_t', ['const std::string &s'])
+	gen.bind_function('is_same_buffer', 'bool', ['const char *a', 'const char *b'])
+	gen.bind_function('concat', 'std::string', ['const char *a', 'const std::string &b'])
+	gen.bind_function_overloads('pick', [('int', ['int v'], []), ('int', ['const char *s'], []), ('int', ['const std::string &s', 'int v'], [])])
+
+	if gen.get_language() == 'CPython':
+		gen.bind_type(lib.cpython.stl.PySequenceToStdVectorConverter('StringSequence', gen.get_conv('const char *')))
+		gen.bind_function('join', 'std::string', ['StringSequence v'])
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.limited_api_version = 0x03020000
+
+	return output
+
+
+test_python = '''\
+import my_test
+
+assert my_test.length_of_const_char_ptr('abc') == 3
+assert my_test.length_of_const_char_ptr('') == 0
+assert my_test.length_of_const_char_ptr('\\u00e9t\\u00e9') == 5  # UTF-8 encoded
+
+assert my_test.length_of_string('abc') == 3
+assert my_test.length_of_string('a\\0b') == 3  # embedded null character
+assert my_test.length_of_string('\\u00e9t\\u00e9') == 5
+
+# the buffer cached by the str object is borrowed, not copied
+s = 'resource/name'
+assert my_test.is_same_buffer(s, s)
+assert not my_test.is_same_buffer(s, 'resource/other')
+
+assert my_test.concat('node/', 'path') == 'node/path'
+
+assert my_test.pick(1) == 0
+assert my_test.pick('a') == 1
+assert my_test.pick('a', 1) == 2
+
+# strings that cannot be encoded to UTF-8 are rejected
+try:
+	my_test.pick('\\ud800')
+	assert False
+except RuntimeError:
+	pass
+
+# sequence items are kept alive while their borrowed buffers are in use, including the items of a temporary list
+class Names:
+	def __len__(self):
+		return 10
+
+	def __getitem__(self, i):
+		if i >= 10:
+			raise IndexError
+		return str(i) * 64  # new object on each access
+
+assert my_test.join(('ab', 'cd')) == 'abcd'
+assert my_test.join(Names()) == ''.join(str(i) * 64 for i in range(10))
+
+# items that cannot be encoded are converted to empty strings
+assert my_test.join(['a', '\\ud800', 'b']) == 'ab'
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+assert(my_test.length_of_const_char_ptr('abc') == 3)
+assert(my_test.length_of_string('abc') == 3)
+assert(my_test.concat('node/', 'path') == 'node/path')
+
+assert(my_test.pick(1) == 0)
+assert(my_test.pick('a') == 1)
+assert(my_test.pick('a', 1) == 2)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	assert.Equal(t, LengthOfConstCharPtr("abc"), int32(3), "should be the same.")
+	assert.Equal(t, LengthOfString("abc"), int32(3), "should be the same.")
+	assert.Equal(t, Concat("node/", "path"), "node/path", "should be the same.")
+}
+'''
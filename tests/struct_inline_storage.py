@@ -0,0 +1,160 @@
+import lib
+
+
+def bind_test(gen):
+	# copied values stored in their wrapper object, wrapper objects reused through pools (CPython only, ignored by the other generators)
+	gen.inline_copies = True
+	gen.object_pool_size = 4
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+static int alive_count = 0;
+
+struct large_struct {
+	large_struct() { for (int i = 0; i < 16; ++i) v[i] = i; ++alive_count; }
+	large_struct(const large_struct &s) { for (int i = 0; i < 16; ++i) v[i] = s.v[i]; ++alive_count; }
+	~large_struct() { --alive_count; }
+
+	large_struct operator+(const large_struct &s) const { large_struct r; for (int i = 0; i < 16; ++i) r.v[i] = v[i] + s.v[i]; return r; }
+
+	double get(int i) const { return v[i]; }
+
+	double v[16];
+};
+
+struct alignas(16) aligned_struct {
+	float x{1}, y{2}, z{3};
+};
+
+struct enclosing_struct {
+	aligned_struct a;
+};
+
+static large_struct make_large_struct() { return {}; }
+static aligned_struct copy_aligned_struct(const aligned_struct &a) { return a; }
+
+static bool is_aligned(const aligned_struct &a) { return (reinterpret_cast<uintptr_t>(&a) % alignof(aligned_struct)) == 0; }
+
+static int get_alive_count() { return alive_count; }
+''', True, False)
+
+	large_struct = gen.begin_class('large_struct')
+	gen.bind_constructor(large_struct, [])
+	gen.bind_arithmetic_op(large_struct, '+', 'large_struct', ['const large_struct &s'])
+	gen.bind_method(large_struct, 'get', 'double', ['int i'])
+	gen.end_class(large_struct)
+
+	aligned_struct = gen.begin_class('aligned_struct')
+	gen.bind_constructor(aligned_struct, [])
+	gen.bind_members(aligned_struct, ['float x', 'float y', 'float z'])
+	gen.end_class(aligned_struct)
+
+	enclosing_struct = gen.begin_class('enclosing_struct')
+	gen.bind_constructor(enclosing_struct, [])
+	gen.bind_member(enclosing_struct, 'aligned_struct a')
+	gen.end_class(enclosing_struct)
+
+	gen.bind_function('make_large_struct', 'large_struct', [])
+	gen.bind_function('copy_aligned_struct', 'aligned_struct', ['const aligned_struct &a'])
+	gen.bind_function('is_aligned', 'bool', ['const aligned_struct &a'])
+	gen.bind_function('get_alive_count', 'int', [])
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.inline_copies = False
+	gen.object_pool_size = 0
+
+	return output
+
+
+test_python = '''\
+import my_test
+
+a = my_test.make_large_struct()
+b = a + a
+assert a.get(15) == 15
+assert b.get(15) == 30
+
+c = [b + a for i in range(8)]
+assert all(v.get(4) == 12 for v in c)
+assert my_test.get_alive_count() == 10
+
+c = None
+assert my_test.get_alive_count() == 2
+
+a, b = None, None
+assert my_test.get_alive_count() == 0
+
+# objects built by a constructor are stored inline and their wrapper objects pooled
+c = [my_test.large_struct() for i in range(8)]
+assert my_test.get_alive_count() == 8
+c = None
+assert my_test.get_alive_count() == 0
+
+stats = my_test.object_pool_stats()['large_struct']
+assert stats['size'] == 4
+
+# a pooled inline wrapper object receives the next value
+hits = stats['hits']
+a = my_test.large_struct() + my_test.make_large_struct()
+assert a.get(15) == 30
+assert my_test.object_pool_stats()['large_struct']['hits'] > hits
+
+a = None
+my_test.trim_object_pools()
+assert my_test.object_pool_stats()['large_struct']['size'] == 0
+assert my_test.get_alive_count() == 0
+
+#
+e = my_test.enclosing_struct()
+v = [my_test.copy_aligned_struct(e.a) for i in range(8)]
+assert all(my_test.is_aligned(a) for a in v)
+assert all(a.z == 3 for a in v)
+
+v[0].z = 5
+assert v[0].z == 5
+assert v[1].z == 3
+assert e.a.z == 3
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+a = my_test.make_large_struct()
+b = a + a
+assert(a:get(15) == 15)
+assert(b:get(15) == 30)
+
+e = my_test.enclosing_struct()
+c = my_test.copy_aligned_struct(e.a)
+assert(my_test.is_aligned(c))
+assert(c.z == 3)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	a := MakeLargeStruct()
+	b := a.Add(a)
+	assert.Equal(t, a.Get(15), float64(15), "should be the same.")
+	assert.Equal(t, b.Get(15), float64(30), "should be the same.")
+
+	e := NewEnclosingStruct()
+	c := CopyAlignedStruct(e.GetA())
+	assert.True(t, IsAligned(c), "should be aligned.")
+	assert.Equal(t, c.GetZ(), float32(3), "should be the same.")
+}
+'''
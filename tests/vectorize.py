@@ -0,0 +1,164 @@
+import lib
+
+
+def bind_test(gen):
+	# batches read in place from buffers and written to output buffers require the buffer protocol (CPython only, ignored by the other generators)
+	gen.buffer_protocol = True
+
+	gen.start('my_test')
+
+	lib.bind_defaults(gen)
+
+	# inject test code in the wrapper
+	gen.insert_code('''\
+#include <cmath>
+#include <stdexcept>
+
+static float lerp(float a, float b, float t) { return a + (b - a) * t; }
+static int64_t scale(int64_t v, const int &factor) { return v * factor; }
+
+static double checked_sqrt(double v) {
+	if (v < 0)
+		throw std::domain_error("negative value");
+	return sqrt(v);
+}
+
+static float total = 0;
+
+static void accumulate(float v) { total += v; }
+static float get_total() { return total; }
+''', True, False)
+
+	gen.bind_function('lerp', 'float', ['float a', 'float b', 'float t'], {'vectorize': True})
+	gen.bind_function('scale', 'int64_t', ['int64_t v', 'const int &factor'], {'vectorize': 'scale_batch'})
+	gen.bind_function('checked_sqrt', 'double', ['double v'], {'vectorize': True, 'nogil': True, 'exception': 'negative value'})
+	gen.bind_function('accumulate', 'void', ['float v'], {'vectorize': True})
+	gen.bind_function('get_total', 'float', [])
+
+	gen.finalize()
+	output = gen.get_output()
+
+	gen.buffer_protocol = False
+
+	return output
+
+
+test_python = '''\
+import array
+import time
+
+import my_test
+
+# the scalar function is still bound
+assert my_test.lerp(0, 10, 0.5) == 5
+
+# sequences, single values are broadcast over the batch
+r = my_test.lerp_vectorized([0, 1, 2], (10, 11, 12), 0.5)
+assert isinstance(r, array.array)
+assert r.typecode == 'f'
+assert r.tolist() == [5, 6, 7]
+
+assert my_test.lerp_vectorized(0, 10, range(3)).tolist() == [0, 10, 20]
+assert my_test.lerp_vectorized([0], 10, [0.5, 1]).tolist() == [5, 10]
+assert my_test.lerp_vectorized(0, 10, 0.5).tolist() == [5]
+assert len(my_test.lerp_vectorized([], 10, 0.5)) == 0
+
+# buffers of matching values are read in place, other buffers are converted value by value
+a = array.array('f', range(1000))
+assert my_test.lerp_vectorized(a, array.array('f', [2] * 1000), 0) == a
+assert my_test.lerp_vectorized(array.array('d', [1, 2]), 0, 0).tolist() == [1, 2]
+
+assert my_test.scale_batch(array.array('q', [1, 2, 3]), 3).tolist() == [3, 6, 9]
+assert my_test.scale_batch([1, 2, 3], [3, 2, 1]).typecode == 'q'
+
+# results are written to an output buffer
+out = array.array('f', [0] * 3)
+assert my_test.lerp_vectorized([0, 1, 2], 10, 1, out) is out
+assert out.tolist() == [10, 10, 10]
+
+for invalid_out in [array.array('f', [0] * 2), array.array('d', [0] * 3), b'123456789abc', [0, 0, 0]]:
+	try:
+		my_test.lerp_vectorized([0, 1, 2], 10, 1, invalid_out)
+		assert False
+	except RuntimeError:
+		pass
+
+# batches of different sizes and invalid values are rejected
+for args in [([1, 2], [1, 2, 3], 0), (['a'], 0, 0), ('abc', 0, 0), (0, 0)]:
+	try:
+		my_test.lerp_vectorized(*args)
+		assert False
+	except RuntimeError:
+		pass
+
+# native exceptions interrupt the batch
+assert my_test.checked_sqrt_vectorized([4, 9, 16]).tolist() == [2, 3, 4]
+try:
+	my_test.checked_sqrt_vectorized([4, -1])
+	assert False
+except RuntimeError:
+	pass
+
+# functions returning void
+assert my_test.accumulate_vectorized([1, 2, 3]) is None
+assert my_test.accumulate_vectorized(array.array('f', [0.5, 0.5])) is None
+assert my_test.get_total() == 7
+
+
+# benchmark, a single native call instead of an interpreted loop
+t = array.array('f', [i / 100000 for i in range(100000)])
+
+t_start = time.perf_counter()
+r_loop = array.array('f', [my_test.lerp(0, 10, v) for v in t])
+t_loop = time.perf_counter() - t_start
+
+t_start = time.perf_counter()
+r_vectorized = my_test.lerp_vectorized(0, 10, t)
+t_vectorized = time.perf_counter() - t_start
+
+print('100k calls: %.1f ms looping, %.1f ms vectorized' % (t_loop * 1000, t_vectorized * 1000))
+
+assert r_vectorized == r_loop
+'''
+
+test_lua = '''\
+my_test = require "my_test"
+
+assert(my_test.lerp(0, 10, 0.5) == 5)
+
+r = my_test.lerp_vectorized({0, 1, 2}, {10, 11, 12}, 0.5)
+assert(#r == 3)
+assert(r[1] == 5)
+assert(r[3] == 7)
+
+assert(#my_test.lerp_vectorized(0, 10, 0.5) == 1)
+
+out = {}
+assert(my_test.lerp_vectorized(0, 10, {0, 1}, out) == out)
+assert(out[2] == 10)
+
+assert(my_test.scale_batch({1, 2, 3}, 3)[3] == 9)
+
+assert(not pcall(my_test.lerp_vectorized, {1, 2}, {1, 2, 3}, 0))
+assert(not pcall(my_test.checked_sqrt_vectorized, {4, -1}))
+
+my_test.accumulate_vectorized({1, 2, 3})
+assert(my_test.get_total() == 6)
+'''
+
+test_go = '''\
+package mytest
+
+import (
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+// Test ...
+func Test(t *testing.T) {
+	assert.Equal(t, Lerp(0, 10, 0.5), float32(5), "should be the same.")
+	assert.Equal(t, Scale(2, 3), int64(6), "should be the same.")
+	assert.Equal(t, CheckedSqrt(4), float64(2), "should be the same.")
+}
+'''